@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark labeled-field extraction against the original per-field regex loop,
+and the regex and layout-template field extractors against each other.
+Text comes from the inspection PDFs behind camps_index.json (fetched through the
+PDF store) and any extra local PDFs; regex results are checked for agreement and
+extractor accuracy is measured against hand-checked fields when given.
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import logging
+
+from extract_pdf import (FIELD_PATTERNS, FIELD_FLAGS, FIELD_EXTRACTORS, MAX_PAGES, REQUIRED_FIELDS,
+                         extract_labeled_fields, extract_camp_fields, _field_value, open_pdf)
+from pdf_store import PdfStore, PDF_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+def reference_extract_labeled_fields(text):
+    """The original engine: re.finditer over the whole text for every field and pattern."""
+    fields = {}
+    for field_name, patterns in FIELD_PATTERNS.items():
+        for pattern, _ in patterns:
+            for match in re.finditer(pattern, text, FIELD_FLAGS):
+                value = _field_value(field_name, match)
+                if value is not None:
+                    fields[field_name] = value
+                    break
+            if field_name in fields:
+                break
+    return fields
+
+def pdf_text(pdf_source):
+    """Text of the first MAX_PAGES pages, as a full read would produce it."""
+    text = ""
+    with open_pdf(pdf_source) as pdf:
+        for page in pdf.pages[:MAX_PAGES]:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+def time_calls(func, text, repeat):
+    """Best-of-repeat seconds per call, and the call's result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def compare_extractors(sources, truth, repeat):
+    """
+    Time each field extractor end to end (PDF in, fields out) and score it.
+
+    Accuracy is the share of hand-checked field values reproduced exactly;
+    without truth only required-field coverage is reported. Each extractor
+    runs once untimed first so the template extractor is measured after it
+    has learned the layout.
+    """
+    print(f"\n{'extractor':<10} {'ms/PDF':>8} {'required found':>15} {'accuracy':>9}")
+    for extractor in FIELD_EXTRACTORS:
+        elapsed = 0.0
+        required_found = correct = checked = 0
+        for name, source in sources:
+            extract_camp_fields(source, extractor)
+            best, (fields, _, _) = time_calls(lambda s: extract_camp_fields(s, extractor), source, repeat)
+            elapsed += best
+            required_found += sum(1 for f in REQUIRED_FIELDS if fields.get(f))
+            for field, value in truth.get(name, {}).items():
+                checked += 1
+                correct += fields.get(field) == value
+
+        accuracy = f"{correct / checked * 100:.1f}%" if checked else 'n/a'
+        print(f"{extractor:<10} {elapsed / len(sources) * 1000:>8.1f} "
+              f"{required_found:>7}/{len(sources) * len(REQUIRED_FIELDS):<7} {accuracy:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark camp PDF field extraction engines')
+    parser.add_argument('pdfs', nargs='*', help='Extra local PDFs to include')
+    parser.add_argument('--index', default='camps_index.json', help='Camps index with latest_pdf_url per camp')
+    parser.add_argument('--pdf-cache-dir', default=PDF_CACHE_DIR, help='PDF store to fetch through')
+    parser.add_argument('--offline', action='store_true', help='Only use PDFs already in the PDF store')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed calls per text and engine')
+    parser.add_argument('--truth', help='JSON of expected fields by camp name or PDF path, to score extractor accuracy')
+    parser.add_argument('--extractor-repeat', type=int, default=3, help='Timed end-to-end calls per PDF and extractor')
+    args = parser.parse_args()
+
+    sources = []
+    try:
+        with open(args.index, 'r') as f:
+            camps = json.load(f)
+        store = PdfStore(args.pdf_cache_dir, offline=args.offline)
+        for camp in camps:
+            if camp.get('latest_pdf_url'):
+                path = store.fetch(camp['latest_pdf_url'])
+                if path:
+                    sources.append((camp['name'], path))
+    except FileNotFoundError:
+        logger.warning(f"{args.index} not found; run crawl_index.py first to benchmark the live reports")
+    sources.extend((path, path) for path in args.pdfs)
+
+    if not sources:
+        print("No PDFs to benchmark")
+        sys.exit(1)
+
+    total_reference = total_compiled = 0.0
+    disagreements = 0
+
+    print(f"{'PDF':<50} {'chars':>7} {'loop ms':>8} {'compiled ms':>12} {'speedup':>8}")
+    for name, source in sources:
+        text = pdf_text(source)
+        reference_time, reference_fields = time_calls(reference_extract_labeled_fields, text, args.repeat)
+        compiled_time, compiled_fields = time_calls(extract_labeled_fields, text, args.repeat)
+        total_reference += reference_time
+        total_compiled += compiled_time
+
+        if compiled_fields != reference_fields:
+            disagreements += 1
+            print(f"  MISMATCH in {name}: {reference_fields} != {compiled_fields}")
+
+        print(f"{name[:50]:<50} {len(text):>7,} {reference_time * 1000:>8.2f} {compiled_time * 1000:>12.2f} "
+              f"{reference_time / compiled_time if compiled_time else 0:>7.1f}x")
+
+    print(f"\n{len(sources)} PDFs: loop {total_reference * 1000:.1f} ms, compiled {total_compiled * 1000:.1f} ms "
+          f"({total_reference / total_compiled if total_compiled else 0:.1f}x), {disagreements} disagreements")
+
+    truth = {}
+    if args.truth:
+        with open(args.truth, 'r') as f:
+            truth = json.load(f)
+    compare_extractors(sources, truth, args.extractor_repeat)
+
+    sys.exit(1 if disagreements else 0)
+
+if __name__ == "__main__":
+    main()
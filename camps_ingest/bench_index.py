@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the camps index parser against the original BeautifulSoup
+find_all/get_text walk, on a saved copy of the index page or on generated
+pages of increasing size. Both must find the same camps.
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+import logging
+
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from crawl_index import parse_camps_index
+
+INDEX_URL = 'https://www.childcarenj.gov/Parents/Licensing/camps'
+
+COUNTIES = ['Atlantic', 'Bergen', 'Burlington', 'Camden', 'Cape May', 'Cumberland', 'Essex', 'Gloucester',
+            'Hudson', 'Hunterdon', 'Mercer', 'Middlesex', 'Monmouth', 'Morris', 'Ocean', 'Passaic']
+
+def reference_parse_camps_index(content, index_url):
+    """The original parser: find_all over every row element and get_text on each."""
+    soup = BeautifulSoup(content, 'html.parser')
+    camps = []
+    current_county = None
+
+    content_div = soup.find('div', {'id': 'content'}) or soup.find('div', class_='content') or soup
+
+    for element in content_div.find_all(['h2', 'h3', 'li', 'p', 'div']):
+        text = element.get_text(strip=True)
+
+        county_match = re.match(r'^([A-Za-z\s]+)\s+County\s*$', text, re.IGNORECASE)
+        if county_match:
+            current_county = county_match.group(1).strip()
+            continue
+
+        camp_match = re.match(r'^(?:([A-Za-z\s]+)\s+)?(\d{3,5})\s+(.+?)\s+(\[.+\]|\d{4}.*)$', text)
+        if camp_match:
+            county = (camp_match.group(1) or current_county or 'Unknown').strip()
+            year_links = []
+
+            for link in element.find_all('a'):
+                href = link.get('href')
+                if href and ('.pdf' in href.lower() or 'camp' in href.lower()):
+                    year_match = re.search(r'(\d{4})', link.get_text() + href)
+                    if year_match:
+                        year_links.append({'year': int(year_match.group(1)), 'url': urljoin(index_url, href)})
+
+            if not year_links:
+                next_elem = element.find_next_sibling()
+                while next_elem and len(year_links) < 5:
+                    for link in next_elem.find_all('a'):
+                        href = link.get('href')
+                        if href and ('.pdf' in href.lower() or 'camp' in href.lower()):
+                            year_match = re.search(r'(\d{4})', link.get_text() + href)
+                            if year_match:
+                                year_links.append({'year': int(year_match.group(1)),
+                                                   'url': urljoin(index_url, href)})
+                    next_elem = next_elem.find_next_sibling()
+                    next_text = next_elem.get_text(strip=True) if next_elem else ""
+                    if re.match(r'^\d{3,5}\s+', next_text) or 'County' in next_text:
+                        break
+
+            if year_links:
+                camps.append({'county': county, 'camp_id': camp_match.group(2),
+                              'name': camp_match.group(3).strip(), 'year_links': year_links})
+
+    return camps
+
+def synthetic_index_page(camps, seed=0):
+    """
+    An index page in the style of the live one: county sections of camp rows
+    whose year links sit in the row or in the element after it, inside
+    nested layout divs.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(camps):
+        if i % max(1, camps // len(COUNTIES)) == 0:
+            rows.append(f'<h2>{COUNTIES[(i // max(1, camps // len(COUNTIES))) % len(COUNTIES)]} County</h2>')
+        camp_id = f"{rng.randint(1, 9999):04d}"
+        name = f"Camp {rng.choice(['Lakeview', 'Pine Hill', 'Sunrise', 'YMCA', 'Riverside'])} {i} &amp; Friends"
+        county = COUNTIES[i % len(COUNTIES)]
+        links = ' | '.join(f'<a href="/getattachment/Parents/Licensing/Camps/{county}-{camp_id}-{year}.pdf?lang=en-US">'
+                           f'{year}</a>' for year in sorted(rng.sample(range(2019, 2025), rng.randint(1, 3))))
+        style = i % 3
+        if style == 0:
+            rows.append(f'<li>{camp_id} {name} 2023 {links}</li>')
+        elif style == 1:
+            rows.append(f'<p>{camp_id} {name} 2023</p><p><!-- reports -->{links}</p>')
+        else:
+            rows.append(f'<div class="row"><span>{camp_id} {name} 2024</span> <span>[{links}]</span></div>')
+    body = '\n'.join(rows)
+    return (f'<!DOCTYPE html><html><head><title>Camps</title><script>var x = "<div>1234 no</div>";</script></head>'
+            f'<body><div class="wrapper"><div id="content"><div class="section">{body}</div></div></div>'
+            f'</body></html>').encode('utf-8')
+
+def time_parse(func, content, repeat):
+    """Best-of-repeat seconds and the camps found."""
+    best, camps = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        camps = list(func(content, INDEX_URL))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, camps
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark camps index page parsing')
+    parser.add_argument('pages', nargs='*', help='Saved copies of the index page')
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[],
+                        help='Also benchmark generated pages with these numbers of camps')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed parses per page and parser')
+    args = parser.parse_args()
+
+    # Per-camp log lines would dominate the timings
+    logging.getLogger('crawl_index').setLevel(logging.ERROR)
+
+    pages = []
+    for path in args.pages:
+        with open(path, 'rb') as f:
+            pages.append((path, f.read()))
+    pages.extend((f"synthetic, {n} camps", synthetic_index_page(n)) for n in args.synthetic)
+
+    if not pages:
+        print("No pages to benchmark; pass saved index pages or --synthetic N")
+        sys.exit(1)
+
+    mismatches = 0
+    print(f"{'page':<40} {'KB':>7} {'camps':>6} {'original ms':>12} {'current ms':>15} {'speedup':>8}")
+    for name, content in pages:
+        reference_time, reference_camps = time_parse(reference_parse_camps_index, content, args.repeat)
+        current_time, current_camps = time_parse(parse_camps_index, content, args.repeat)
+        if current_camps != reference_camps:
+            mismatches += 1
+            print(f"  MISMATCH in {name}")
+        print(f"{name[:40]:<40} {len(content) / 1024:>7.0f} {len(reference_camps):>6} {reference_time * 1000:>12.1f} "
+              f"{current_time * 1000:>15.1f} {reference_time / current_time if current_time else 0:>7.1f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
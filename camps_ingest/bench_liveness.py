@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Time latest-year selection for every camp in the index: one probe at a time
+(the original path), concurrent probes, and concurrent probes with a warm
+liveness cache. All three must select the same report for every camp.
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import tempfile
+
+from crawl_index import fetch_camps_index, pick_latest_year, LivenessCache, PROBE_CONCURRENCY
+
+def timed_pick(camps, concurrency, cache=None):
+    """Seconds taken and {camp_id: latest_pdf_url} selected."""
+    start = time.perf_counter()
+    selected = pick_latest_year(copy.deepcopy(camps), concurrency, cache)
+    return time.perf_counter() - start, {camp['camp_id']: camp['latest_pdf_url'] for camp in selected}
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark camp report liveness checks')
+    parser.add_argument('--index-url', default='https://www.childcarenj.gov/Parents/Licensing/camps',
+                        help='URL of camps index page')
+    parser.add_argument('--camps', help='JSON list of camps with year_links to use instead of crawling the index')
+    parser.add_argument('--concurrency', type=int, default=PROBE_CONCURRENCY, help='Concurrent probes')
+    args = parser.parse_args()
+
+    if args.camps:
+        with open(args.camps, 'r') as f:
+            camps = json.load(f)
+    else:
+        camps = fetch_camps_index(args.index_url)
+    if not camps:
+        print("No camps to probe")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_file = os.path.join(cache_dir, 'liveness_cache.json')
+        runs = [
+            ('sequential', *timed_pick(camps, 1)),
+            (f'concurrent x{args.concurrency}', *timed_pick(camps, args.concurrency)),
+        ]
+        # Fill the cache, then time a rerun against it
+        timed_pick(camps, args.concurrency, LivenessCache(cache_file))
+        runs.append((f'concurrent x{args.concurrency}, warm cache',
+                     *timed_pick(camps, args.concurrency, LivenessCache(cache_file))))
+
+    baseline_seconds, baseline = runs[0][1], runs[0][2]
+    print(f"\n{len(camps)} camps")
+    print(f"{'path':<32} {'seconds':>8} {'speedup':>8} {'same picks':>11}")
+    for name, seconds, selected in runs:
+        print(f"{name:<32} {seconds:>8.2f} {baseline_seconds / seconds if seconds else 0:>7.1f}x "
+              f"{'yes' if selected == baseline else 'NO':>11}")
+
+    sys.exit(0 if all(selected == baseline for _, _, selected in runs) else 1)
+
+if __name__ == "__main__":
+    main()
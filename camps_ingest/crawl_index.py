@@ -5,16 +5,169 @@ Parses HTML to find camp entries organized by county.
 """
 
 import re
+import json
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from urllib.parse import urljoin, urlparse
 import time
 import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from shared import get_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# lxml builds the tree several times faster than html.parser; used when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Elements that may hold a county header or a camp row
+ROW_TAGS = ['h2', 'h3', 'li', 'p', 'div']
+
+COUNTY_PATTERN = re.compile(r'^([A-Za-z\s]+)\s+County\s*$', re.IGNORECASE)
+CAMP_PATTERN = re.compile(r'^(?:([A-Za-z\s]+)\s+)?(\d{3,5})\s+(.+?)\s+(\[.+\]|\d{4}.*)$')
+CAMP_START_PATTERN = re.compile(r'^\d{3,5}\s+')
+YEAR_PATTERN = re.compile(r'(\d{4})')
+
+# A camp row without year links of its own stops borrowing them from siblings at this many
+MAX_SIBLING_YEAR_LINKS = 5
+
+LIVENESS_CACHE_FILE = 'camps_ingest/liveness_cache.json'
+
+# Seconds a report URL confirmed live is trusted without probing it again
+LIVENESS_TTL = 24 * 60 * 60
+
+# Simultaneous liveness probes; the shared HTTP client still caps each host
+PROBE_CONCURRENCY = 8
+
+# HEAD responses from servers that may not support HEAD; retried as a ranged GET
+HEAD_UNSUPPORTED = {403, 405, 501}
+
+def _year_links(element, index_url):
+    """Report links under element, as {'year', 'url'} dicts"""
+    year_links = []
+    for link in element.find_all('a'):
+        href = link.get('href')
+        if href and ('.pdf' in href.lower() or 'camp' in href.lower()):
+            # Extract year from link text or URL
+            year_match = YEAR_PATTERN.search(link.get_text() + href)
+            if year_match:
+                year_links.append({'year': int(year_match.group(1)), 'url': urljoin(index_url, href)})
+    return year_links
+
+def _element_texts(root):
+    """
+    get_text(strip=True) of every tag under root, keyed by id(), in one pass.
+    
+    Tags are visited children first, so each tag's text is the join of its
+    children's: a page-text string contributes itself stripped and a child tag
+    its own text. get_text on a nested container walks its whole subtree
+    again; on a page of nested layout divs that made the walk quadratic. Tags
+    holding other kinds of strings (script, style, template, ruby text) keep
+    get_text's own rules and add nothing to their ancestors, as with get_text.
+    """
+    main_types = Tag.MAIN_CONTENT_STRING_TYPES
+    texts = {}
+    for element in reversed(list(root.descendants)):
+        if not isinstance(element, Tag):
+            continue
+        if element.interesting_string_types != main_types:
+            texts[id(element)] = element.get_text(strip=True)
+            continue
+        parts = []
+        for child in element.children:
+            if isinstance(child, Tag):
+                if child.interesting_string_types == main_types:
+                    parts.append(texts[id(child)])
+            elif type(child) in main_types:
+                parts.append(child.strip())
+        texts[id(element)] = ''.join(parts)
+    return texts
+
+def parse_camps_index(markup, index_url):
+    """
+    Parse the camps index page, yielding camps in page order.
+    
+    Camp rows are h2/h3/li/p/div elements inside the page's content div (the
+    first div with id "content", else with class "content", else the whole
+    page), read in document order: a county header sets the county for the
+    rows after it, and a camp row takes its year links from its own <a> tags
+    or, if it has none, from the siblings that follow it. Every element's text
+    is computed in one pass over the content div (see _element_texts);
+    python bench_index.py checks the camps against the original walk.
+    
+    Args:
+        markup: Page HTML as bytes or str
+        index_url: URL of the page, for resolving relative links
+        
+    Yields:
+        dict: Camp with county, camp_id, name and year_links
+    """
+    soup = BeautifulSoup(markup, HTML_PARSER)
+    content_div = soup.find('div', {'id': 'content'}) or soup.find('div', class_='content') or soup
+    
+    texts = _element_texts(content_div)
+    
+    def text_of(element):
+        key = id(element)
+        if key not in texts:
+            texts[key] = element.get_text(strip=True)
+        return texts[key]
+    
+    current_county = None
+    for element in content_div.find_all(ROW_TAGS):
+        text = text_of(element)
+        
+        # Check if this is a county header
+        county_match = COUNTY_PATTERN.match(text)
+        if county_match:
+            current_county = county_match.group(1).strip()
+            logger.info(f"Found county: {current_county}")
+            continue
+        
+        # Check if this line contains camp information
+        # Pattern: Optional County, Camp ID (3-5 digits), Camp Name, Years
+        camp_match = CAMP_PATTERN.match(text)
+        if not camp_match:
+            continue
+        
+        county_in_line, camp_id, name = camp_match.group(1), camp_match.group(2), camp_match.group(3).strip()
+        
+        # Use county from line if present, otherwise use current section county
+        county = (county_in_line or current_county or 'Unknown').strip()
+        
+        year_links = _year_links(element, index_url)
+        
+        # If no links found in this element, look in next siblings
+        if not year_links:
+            next_elem = element.find_next_sibling()
+            while next_elem and len(year_links) < MAX_SIBLING_YEAR_LINKS:
+                year_links.extend(_year_links(next_elem, index_url))
+                next_elem = next_elem.find_next_sibling()
+                # Stop if we hit another camp entry or county
+                next_text = text_of(next_elem) if next_elem else ""
+                if CAMP_START_PATTERN.match(next_text) or 'County' in next_text:
+                    break
+        
+        if year_links:
+            yield {
+                'county': county,
+                'camp_id': camp_id,
+                'name': name,
+                'year_links': year_links
+            }
+            logger.debug(f"Found camp: {county} {camp_id} {name} ({len(year_links)} years)")
+        else:
+            logger.warning(f"No year links found for camp: {county} {camp_id} {name}")
+
 def fetch_camps_index(index_url="https://www.childcarenj.gov/Parents/Licensing/camps"):
     """
     Fetch and parse the NJ Summer Youth Camps index page.
@@ -31,81 +184,10 @@ def fetch_camps_index(index_url="https://www.childcarenj.gov/Parents/Licensing/c
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
-        response = requests.get(index_url, timeout=30, headers=headers)
+        response = get_client().get(index_url, timeout=30, headers=headers)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        camps = []
-        current_county = None
-        
-        # Look for content with camp listings
-        content_div = soup.find('div', {'id': 'content'}) or soup.find('div', class_='content') or soup
-        
-        # Find all text elements that might contain camp information
-        for element in content_div.find_all(['h2', 'h3', 'li', 'p', 'div']):
-            text = element.get_text(strip=True)
-            
-            # Check if this is a county header
-            county_match = re.match(r'^([A-Za-z\s]+)\s+County\s*$', text, re.IGNORECASE)
-            if county_match:
-                current_county = county_match.group(1).strip()
-                logger.info(f"Found county: {current_county}")
-                continue
-            
-            # Check if this line contains camp information
-            # Pattern: Optional County, Camp ID (3-5 digits), Camp Name, Years
-            camp_match = re.match(r'^(?:([A-Za-z\s]+)\s+)?(\d{3,5})\s+(.+?)\s+(\[.+\]|\d{4}.*)$', text)
-            if camp_match:
-                county_in_line = camp_match.group(1)
-                camp_id = camp_match.group(2)
-                name = camp_match.group(3).strip()
-                years_text = camp_match.group(4)
-                
-                # Use county from line if present, otherwise use current section county
-                county = (county_in_line or current_county or 'Unknown').strip()
-                
-                # Extract year links from this element and its siblings
-                year_links = []
-                
-                # Look for links in this element
-                for link in element.find_all('a'):
-                    href = link.get('href')
-                    if href and ('.pdf' in href.lower() or 'camp' in href.lower()):
-                        # Extract year from link text or URL
-                        year_match = re.search(r'(\d{4})', link.get_text() + href)
-                        if year_match:
-                            year = int(year_match.group(1))
-                            full_url = urljoin(index_url, href)
-                            year_links.append({'year': year, 'url': full_url})
-                
-                # If no links found in this element, look in next siblings
-                if not year_links:
-                    next_elem = element.find_next_sibling()
-                    while next_elem and len(year_links) < 5:  # Limit search
-                        for link in next_elem.find_all('a'):
-                            href = link.get('href')
-                            if href and ('.pdf' in href.lower() or 'camp' in href.lower()):
-                                year_match = re.search(r'(\d{4})', link.get_text() + href)
-                                if year_match:
-                                    year = int(year_match.group(1))
-                                    full_url = urljoin(index_url, href)
-                                    year_links.append({'year': year, 'url': full_url})
-                        next_elem = next_elem.find_next_sibling()
-                        # Stop if we hit another camp entry or county
-                        next_text = next_elem.get_text(strip=True) if next_elem else ""
-                        if re.match(r'^\d{3,5}\s+', next_text) or 'County' in next_text:
-                            break
-                
-                if year_links:
-                    camps.append({
-                        'county': county,
-                        'camp_id': camp_id,
-                        'name': name,
-                        'year_links': year_links
-                    })
-                    logger.debug(f"Found camp: {county} {camp_id} {name} ({len(year_links)} years)")
-                else:
-                    logger.warning(f"No year links found for camp: {county} {camp_id} {name}")
+        camps = list(parse_camps_index(response.content, index_url))
         
         logger.info(f"Found {len(camps)} camps total")
         return camps
@@ -117,35 +199,125 @@ def fetch_camps_index(index_url="https://www.childcarenj.gov/Parents/Licensing/c
         logger.error(f"Error parsing index page: {e}")
         return []
 
-def pick_latest_year(camps):
+def probe_url(url, timeout=10):
+    """
+    Check whether a report URL is accessible.
+    Sends a HEAD request, falling back to a one-byte ranged GET when the server
+    rejects HEAD. Returns True if the URL is live.
+    """
+    client = get_client()
+    try:
+        response = client.head(url, timeout=timeout)
+        if response.status_code == 200:
+            return True
+        if response.status_code not in HEAD_UNSUPPORTED:
+            return False
+        
+        response = client.get(url, timeout=timeout, stream=True, allow_redirects=False,
+                              headers={'Range': 'bytes=0-0'})
+        response.close()
+        return response.status_code in (200, 206)
+    except Exception as e:
+        logger.debug(f"Liveness probe failed for {url}: {e}")
+        return False
+
+class LivenessCache:
+    """
+    Report URLs recently confirmed live, with the time of the check.
+    Only live results are kept: a year that is missing now may be published
+    before the next run.
+    """
+    
+    def __init__(self, cache_file=LIVENESS_CACHE_FILE, ttl=LIVENESS_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.checked = self._load()
+        self.hits = 0
+    
+    def _load(self):
+        """Load confirmed URLs from file."""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load liveness cache: {e}")
+        return {}
+    
+    def is_live(self, url):
+        """True if url was confirmed live within the TTL."""
+        with self._lock:
+            checked_at = self.checked.get(url)
+            if checked_at is not None and time.time() - checked_at < self.ttl:
+                self.hits += 1
+                return True
+        return False
+    
+    def mark_live(self, url):
+        with self._lock:
+            self.checked[url] = time.time()
+    
+    def save(self):
+        """Write unexpired entries back to file."""
+        now = time.time()
+        with self._lock:
+            self.checked = {url: t for url, t in self.checked.items() if now - t < self.ttl}
+            directory = os.path.dirname(self.cache_file) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(self.checked, f, indent=2)
+                os.replace(tmp_path, self.cache_file)
+            except Exception as e:
+                logger.error(f"Could not save liveness cache: {e}")
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+def _latest_live_link(camp, cache):
+    """
+    Newest year link of a camp that is accessible, or None.
+    Years are tried newest first, so a cached older year never hides a newly published one.
+    """
+    year_links = camp['year_links']
+    
+    # Sort by year descending
+    year_links.sort(key=lambda x: x['year'], reverse=True)
+    
+    for link in year_links:
+        if cache and cache.is_live(link['url']):
+            return link
+        if probe_url(link['url']):
+            if cache:
+                cache.mark_live(link['url'])
+            return link
+    return None
+
+def pick_latest_year(camps, concurrency=PROBE_CONCURRENCY, cache=None):
     """
     For each camp, pick the latest year link that's accessible.
+    
+    Camps are probed concurrently (concurrency=1 checks them one at a time);
+    URLs confirmed live within the cache's TTL are not probed again.
+    
     Returns camps with single latest_year_link instead of year_links array.
     """
     logger.info("Selecting latest year for each camp...")
+    start = time.perf_counter()
+    
+    camps = [camp for camp in camps if camp['year_links']]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        latest_links = list(executor.map(lambda camp: _latest_live_link(camp, cache), camps))
+    
+    if cache:
+        cache.save()
     
     processed_camps = []
     
-    for camp in camps:
-        year_links = camp['year_links']
-        if not year_links:
-            continue
-            
-        # Sort by year descending
-        year_links.sort(key=lambda x: x['year'], reverse=True)
-        
-        # Try to verify the latest link is accessible
-        latest_link = None
-        for link in year_links:
-            try:
-                # Quick HEAD request to check if URL is accessible
-                response = requests.head(link['url'], timeout=10)
-                if response.status_code == 200:
-                    latest_link = link
-                    break
-            except:
-                continue
-        
+    for camp, latest_link in zip(camps, latest_links):
         if latest_link:
             camp_copy = camp.copy()
             camp_copy['latest_year'] = latest_link['year']
@@ -156,16 +328,16 @@ def pick_latest_year(camps):
         else:
             logger.warning(f"No accessible year links for {camp['name']}")
     
-    logger.info(f"Processed {len(processed_camps)} camps with valid latest year links")
+    cached = f", {cache.hits} confirmed from liveness cache" if cache else ""
+    logger.info(f"Processed {len(processed_camps)} camps with valid latest year links "
+                f"in {time.perf_counter() - start:.1f}s ({concurrency} concurrent probes{cached})")
     return processed_camps
 
 if __name__ == "__main__":
-    import json
-    
     # Crawl index and pick latest years
     camps = fetch_camps_index()
     if camps:
-        processed_camps = pick_latest_year(camps)
+        processed_camps = pick_latest_year(camps, cache=LivenessCache())
         
         # Save to JSON for inspection
         with open('camps_index.json', 'w') as f:
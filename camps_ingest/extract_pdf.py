@@ -5,161 +5,585 @@ Parses labeled fields like CAMP ID, CAMP NAME, ADDRESS, etc.
 """
 
 import re
-import requests
-import pdfplumber
 import tempfile
 import os
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from urllib.parse import urlparse
 
+from shared import get_client, open_pdf, describe_source, SPILL_THRESHOLD
+from field_cache import source_sha256
+from layout_template import TemplateCache, FIELD_LABELS
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def download_pdf(url, timeout=30):
-    """Download PDF from URL and return temporary file path."""
+# Fields a report must yield
+REQUIRED_FIELDS = ['camp_id', 'camp_name', 'street_address', 'city', 'zip']
+
+# Top share of page 1 holding the labeled header block, read before anything else
+HEADER_REGION_FRACTION = 0.4
+
+# Pages searched when the header block does not settle every required field
+MAX_PAGES = 3
+
+# Field extraction engines: regex over the report text, or value boxes from a learned layout template
+FIELD_EXTRACTORS = ['regex', 'template']
+
+# How far into each report parsing had to go, counted in this process: 'template'
+# (the layout template found every field), 'header' (top of page 1 settled every
+# required field for the regex engine), the number of pages read, or 'image_only'
+# (no text layer at all; see ocr.py)
+EXTRACTION_DEPTHS = {'template': 0, 'header': 0, 1: 0, 2: 0, 3: 0, 'image_only': 0}
+
+# Layout templates, loaded once per process
+_template_cache = None
+
+def get_template_cache():
+    global _template_cache
+    if _template_cache is None:
+        _template_cache = TemplateCache()
+    return _template_cache
+
+def download_pdf(url, timeout=30, spill_threshold=SPILL_THRESHOLD):
+    """
+    Download PDF from URL.
+    Reports are kept in memory; one larger than spill_threshold is written to a
+    temporary file instead. Returns the PDF bytes, the temporary file path, or None.
+    """
+    client = get_client()
+    chunks = []
+    size = 0
+    temp_file = None
     try:
-        response = requests.get(url, timeout=timeout)
+        response = client.get(url, timeout=timeout, stream=True)
         response.raise_for_status()
         
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-        temp_file.write(response.content)
-        temp_file.close()
+        for chunk in client.iter_content(response, 64 * 1024):
+            size += len(chunk)
+            if temp_file is None and size > spill_threshold:
+                temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+                temp_file.writelines(chunks)
+                chunks = []
+            if temp_file is not None:
+                temp_file.write(chunk)
+            else:
+                chunks.append(chunk)
         
-        return temp_file.name
+        if temp_file is not None:
+            temp_file.close()
+            return temp_file.name
+        return b''.join(chunks)
     except Exception as e:
         logger.error(f"Error downloading PDF from {url}: {e}")
+        if temp_file is not None:
+            temp_file.close()
+            os.unlink(temp_file.name)
         return None
 
-def extract_labeled_fields(text):
+def fetch_pdf(url, store=None):
     """
-    Extract labeled fields from PDF text using improved NJ DOH patterns.
-    Returns dictionary of extracted fields.
+    Get the PDF at url, from the PDF store when one is given.
+    Returns (the PDF's bytes, a file path, or None; whether it is a temporary file to delete after parsing).
     """
+    if store is not None:
+        return store.fetch(url), False
+    source = download_pdf(url)
+    return source, isinstance(source, str)
+
+# Labels that can start a labeled-field match, with their lowercase spellings.
+# No spelling may be a prefix of another: the regex scanner records one label per position.
+LABELS = {
+    'camp': ('camp',),
+    'id': ('id',),
+    'name': ('name',),
+    'street': ('street',),
+    'address': ('address',),
+    'city': ('city',),
+    'zip': ('zip',),
+    'county': ('county',),
+    'phone': ('phone',),
+    'email': ('e-mail', 'email'),
+    'owner': ('owner',),
+    'director': ('director',),
+    'health': ('health',),
+    'evaluation': ('evaluation',),
+    'inspection': ('inspection',),
+    'inspector': ('inspector',),
+    'date': ('date',)
+}
+
+# Characters IGNORECASE matches to a label letter (or that lowercase to ASCII) although
+# str.lower() does not map them to it; text containing any is indexed with LABEL_SCANNER
+CASE_FOLD_EXCEPTIONS = '\u0130\u0131\u017f\u212a'
+
+# Common field patterns in NJ DOH camp inspection reports, tried in order per field.
+# These PDFs have a specific layout: LABEL VALUE format on separate lines.
+# Each pattern names the labels its matches can start at; None means a match
+# can start anywhere and the whole text is searched.
+FIELD_PATTERNS = {
+    'camp_id': [(r'(\d{4})\s+Camp\s+\d+', None), (r'CAMP\s+ID[:\s]*(\d+)', ('camp',)), (r'ID[:\s]*(\d+)', ('id',))],
+    'camp_name': [(r'Camp\s+(\d+)[^\w]*([^0-9\n]+)(?=\d{4}|INSPECTION|DFD)', ('camp',)), (r'CAMP\s+NAME[:\s]*(.+?)(?=PHONE|ADDRESS|OWNER)', ('camp',)), (r'NAME[:\s]*(.+?)(?=PHONE|ADDRESS|OWNER)', ('name',))],
+    'street_address': [(r'(?:STREET\s+)?ADDRESS[:\s]*(.+?)(?=CITY|ZIP|\d{5})', ('street', 'address')), (r'(\d+\s+[A-Za-z\s]+(?:Avenue|Street|Road|Drive|Lane|Boulevard|Way|Court|Place))', None), (r'ADDRESS[:\s]*(.+?)(?=\n|\r|$)', ('address',))],
+    'city': [(r'CITY[:\s]*([A-Za-z\s]+?)(?=\s*\d{5}|ZIP|COUNTY)', ('city',)), (r'(?:Avenue|Street|Road|Drive|Lane|Boulevard|Way|Court|Place)\s+([A-Za-z\s]+?)\s+\d{5}', None)],
+    'zip': [(r'ZIP[:\s]*(\d{5}(?:-\d{4})?)', ('zip',)), (r'([A-Za-z\s]+)\s+(\d{5})(?:\s|$)', None), (r'\b(\d{5}(?:-\d{4})?)\b', None)],
+    'county': [(r'COUNTY[:\s]*([A-Za-z\s]+?)(?=MAILING|$)', ('county',)), (r'\d{5}\s+([A-Za-z]+)(?:\s+MAILING|\s*$)', None)],
+    'phone': [(r'PHONE\s+NUMBER[:\s]*(.+?)(?=E-?MAIL|$)', ('phone',)), (r'PHONE[:\s]*(.+?)(?=E-?MAIL|$)', ('phone',)), (r'\((\d{3})\)\s*(\d{3}-\d{4})', None)],
+    'email': [(r'E-?MAIL[:\s]*([^\s]+@[^\s]+)', ('email',)), (r'EMAIL[:\s]*([^\s]+@[^\s]+)', ('email',))],
+    'camp_owner': [(r'CAMP\s+OWNER[:\s]*(.+?)(?=PHONE|$)', ('camp',)), (r'OWNER[:\s]*(.+?)(?=PHONE|$)', ('owner',))],
+    'camp_director': [(r'CAMP\s+DIRECTOR\s+NAME[:\s]*(.+?)(?=HEALTH|$)', ('camp',)), (r'DIRECTOR\s+NAME[:\s]*(.+?)(?=HEALTH|$)', ('director',)), (r'DIRECTOR[:\s]*(.+?)(?=HEALTH|$)', ('director',))],
+    'health_director': [(r'HEALTH\s+DIRECTOR\s+NAME[:\s]*(.+?)(?=FOOD|NA|$)', ('health',)), (r'HEALTH\s+DIRECTOR[:\s]*(.+?)(?=FOOD|NA|$)', ('health',))],
+    'evaluation': [(r'EVALUATION[:\s]*([A-Z\s]+?)(?=CAMP|$)', ('evaluation',)), (r'INSPECTION\s+([A-Z\s]+?)(?=CAMP|$)', ('inspection',))],
+    'inspector_name': [(r'INSPECTOR\s+NAME[:\s]*(.+?)(?=REHS|$)', ('inspector',)), (r'INSPECTOR[:\s]*(.+?)(?=REHS|$)', ('inspector',))],
+    'inspection_date': [(r'INSPECTION\s+DATE[:\s]*(.+?)(?=\n|\r|$)', ('inspection',)), (r'DATE[:\s]*(.+?)(?=\n|\r|$)', ('date',))]
+}
+
+FIELD_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Label-less patterns that backtrack heavily on long runs of words, with a cheap
+# pattern every one of their matches contains; the text is only searched if it occurs
+UNANCHORED_GUARDS = {
+    r'([A-Za-z\s]+)\s+(\d{5})(?:\s|$)': r'\s\d{5}(?:\s|$)'
+}
+
+# Values that mean the form was left blank
+PLACEHOLDER_VALUES = {'', 'n/a', 'na', 'none', '____', 'changes', 'previous', 'information'}
+
+# Seconds one extract_labeled_fields call may spend before giving up on the remaining fields
+FIELD_EXTRACTION_BUDGET = 1.0
+
+# Compiled once at import: zero-width lookahead so every label occurrence is found, even inside words
+LABEL_SCANNER = re.compile('(?=' + '|'.join(f"(?P<{label}>{'|'.join(map(re.escape, spellings))})"
+                                            for label, spellings in LABELS.items()) + ')', FIELD_FLAGS)
+COMPILED_FIELD_PATTERNS = {
+    field_name: [(re.compile(pattern, FIELD_FLAGS), labels) for pattern, labels in patterns]
+    for field_name, patterns in FIELD_PATTERNS.items()
+}
+COMPILED_GUARDS = {re.compile(pattern, FIELD_FLAGS): re.compile(guard, FIELD_FLAGS)
+                   for pattern, guard in UNANCHORED_GUARDS.items()}
+WHITESPACE_RUN = re.compile(r'\s+')
+
+def index_labels(text):
+    """
+    Find where every label occurs, including inside words.
+    
+    Searches a lowercased copy with str.find, which finds exactly the offsets a
+    case-insensitive regex would unless the text has one of the few characters
+    whose case folding differs; that text is scanned with LABEL_SCANNER.
+    Returns dict of label -> ascending start offsets.
+    """
+    positions = {label: [] for label in LABELS}
+    
+    if any(c in text for c in CASE_FOLD_EXCEPTIONS):
+        for match in LABEL_SCANNER.finditer(text):
+            positions[match.lastgroup].append(match.start())
+        return positions
+    
+    lowered = text.lower()
+    for label, spellings in LABELS.items():
+        for spelling in spellings:
+            start = lowered.find(spelling)
+            while start != -1:
+                positions[label].append(start)
+                start = lowered.find(spelling, start + 1)
+        if len(spellings) > 1:
+            positions[label].sort()
+    return positions
+
+def _iter_matches(compiled, labels, text, label_index):
+    """
+    Yield the matches re.finditer would, trying only the offsets where the pattern's labels occur.
+    """
+    if labels is None:
+        guard = COMPILED_GUARDS.get(compiled)
+        if guard is None or guard.search(text):
+            yield from compiled.finditer(text)
+        return
+    
+    starts = label_index[labels[0]] if len(labels) == 1 else sorted(set().union(*(label_index[l] for l in labels)))
+    resume_at = 0
+    for start in starts:
+        # finditer never returns overlapping matches
+        if start < resume_at:
+            continue
+        match = compiled.match(text, start)
+        if match:
+            yield match
+            resume_at = match.end() if match.end() > start else start + 1
+
+def _field_value(field_name, match):
+    """Field value from a pattern match, or None if it is blank or implausible."""
+    if field_name == 'zip' and len(match.groups()) > 1:
+        # Handle multi-group ZIP patterns
+        value = match.group(2) if match.group(2) and match.group(2).isdigit() else match.group(1)
+    elif field_name == 'phone' and len(match.groups()) > 1:
+        # Handle multi-group phone patterns
+        value = f"({match.group(1)}) {match.group(2)}"
+    else:
+        value = match.group(1).strip()
+    
+    return clean_field_value(value)
+
+def clean_field_value(value):
+    """Field value with whitespace collapsed, or None if it is blank, a placeholder or implausibly long."""
+    if value and len(value) < 200:  # Reasonable field length
+        value = WHITESPACE_RUN.sub(' ', value).strip()
+        if value.lower() not in PLACEHOLDER_VALUES:
+            return value
+    return None
+
+def _extract_ranked_fields(text, budget=FIELD_EXTRACTION_BUDGET, field_names=None):
+    """
+    Extract labeled fields, noting which of its patterns each field came from.
+    field_names limits the search to those fields (default: all of them).
+    Returns (fields, dict of field -> index of the pattern that matched,
+    whether the budget ran out before every field was tried).
+    """
+    if field_names is None:
+        field_names = list(COMPILED_FIELD_PATTERNS)
+    deadline = time.perf_counter() + budget
+    label_index = index_labels(text)
     fields = {}
+    ranks = {}
     
-    # Common field patterns in NJ DOH camp inspection reports
-    # These PDFs have a specific layout: LABEL VALUE format on separate lines
-    field_patterns = {
-        'camp_id': [r'(\d{4})\s+Camp\s+\d+', r'CAMP\s+ID[:\s]*(\d+)', r'ID[:\s]*(\d+)'],
-        'camp_name': [r'Camp\s+(\d+)[^\w]*([^0-9\n]+)(?=\d{4}|INSPECTION|DFD)', r'CAMP\s+NAME[:\s]*(.+?)(?=PHONE|ADDRESS|OWNER)', r'NAME[:\s]*(.+?)(?=PHONE|ADDRESS|OWNER)'],
-        'street_address': [r'(?:STREET\s+)?ADDRESS[:\s]*(.+?)(?=CITY|ZIP|\d{5})', r'(\d+\s+[A-Za-z\s]+(?:Avenue|Street|Road|Drive|Lane|Boulevard|Way|Court|Place))', r'ADDRESS[:\s]*(.+?)(?=\n|\r|$)'],
-        'city': [r'CITY[:\s]*([A-Za-z\s]+?)(?=\s*\d{5}|ZIP|COUNTY)', r'(?:Avenue|Street|Road|Drive|Lane|Boulevard|Way|Court|Place)\s+([A-Za-z\s]+?)\s+\d{5}'],
-        'zip': [r'ZIP[:\s]*(\d{5}(?:-\d{4})?)', r'([A-Za-z\s]+)\s+(\d{5})(?:\s|$)', r'\b(\d{5}(?:-\d{4})?)\b'],
-        'county': [r'COUNTY[:\s]*([A-Za-z\s]+?)(?=MAILING|$)', r'\d{5}\s+([A-Za-z]+)(?:\s+MAILING|\s*$)'],
-        'phone': [r'PHONE\s+NUMBER[:\s]*(.+?)(?=E-?MAIL|$)', r'PHONE[:\s]*(.+?)(?=E-?MAIL|$)', r'\((\d{3})\)\s*(\d{3}-\d{4})'],
-        'email': [r'E-?MAIL[:\s]*([^\s]+@[^\s]+)', r'EMAIL[:\s]*([^\s]+@[^\s]+)'],
-        'camp_owner': [r'CAMP\s+OWNER[:\s]*(.+?)(?=PHONE|$)', r'OWNER[:\s]*(.+?)(?=PHONE|$)'],
-        'camp_director': [r'CAMP\s+DIRECTOR\s+NAME[:\s]*(.+?)(?=HEALTH|$)', r'DIRECTOR\s+NAME[:\s]*(.+?)(?=HEALTH|$)', r'DIRECTOR[:\s]*(.+?)(?=HEALTH|$)'],
-        'health_director': [r'HEALTH\s+DIRECTOR\s+NAME[:\s]*(.+?)(?=FOOD|NA|$)', r'HEALTH\s+DIRECTOR[:\s]*(.+?)(?=FOOD|NA|$)'],
-        'evaluation': [r'EVALUATION[:\s]*([A-Z\s]+?)(?=CAMP|$)', r'INSPECTION\s+([A-Z\s]+?)(?=CAMP|$)'],
-        'inspector_name': [r'INSPECTOR\s+NAME[:\s]*(.+?)(?=REHS|$)', r'INSPECTOR[:\s]*(.+?)(?=REHS|$)'],
-        'inspection_date': [r'INSPECTION\s+DATE[:\s]*(.+?)(?=\n|\r|$)', r'DATE[:\s]*(.+?)(?=\n|\r|$)']
-    }
-    
-    # Keep original text structure for better field boundary detection
-    for field_name, patterns in field_patterns.items():
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                if field_name == 'zip' and len(match.groups()) > 1:
-                    # Handle multi-group ZIP patterns
-                    value = match.group(2) if match.group(2) and match.group(2).isdigit() else match.group(1)
-                elif field_name == 'phone' and len(match.groups()) > 1:
-                    # Handle multi-group phone patterns
-                    value = f"({match.group(1)}) {match.group(2)}"
-                else:
-                    value = match.group(1).strip()
-                
-                # Clean up the value
-                if value and len(value) < 200:  # Reasonable field length
-                    value = re.sub(r'\s+', ' ', value).strip()
-                    if value.lower() not in ['', 'n/a', 'na', 'none', '____', 'changes', 'previous', 'information']:
-                        fields[field_name] = value
-                        break
+    for field_name in field_names:
+        for rank, (compiled, labels) in enumerate(COMPILED_FIELD_PATTERNS[field_name]):
+            if time.perf_counter() > deadline:
+                logger.warning(f"Field extraction exceeded its {budget}s budget; "
+                               f"skipped {[f for f in field_names if f not in fields]}")
+                return fields, ranks, True
+            
+            for match in _iter_matches(compiled, labels, text, label_index):
+                value = _field_value(field_name, match)
+                if value is not None:
+                    fields[field_name] = value
+                    ranks[field_name] = rank
+                    break
             if field_name in fields:
                 break
     
-    return fields
+    return fields, ranks, False
 
-def extract_camp_data(pdf_path):
+def extract_labeled_fields(text, budget=FIELD_EXTRACTION_BUDGET):
     """
-    Extract structured camp data from PDF inspection report.
-    Returns dictionary with extracted fields.
+    Extract labeled fields from PDF text using improved NJ DOH patterns.
+    
+    Label positions are indexed up front; each labeled pattern is then only
+    tried where its label occurs, and the first acceptable match of the first
+    pattern that yields one wins, exactly as a full re.finditer scan would.
+    Fields not resolved within budget seconds are left out.
+    
+    Returns dictionary of extracted fields.
+    """
+    return _extract_ranked_fields(text, budget)[0]
+
+def _fields_settled(ranks, known=()):
+    """
+    Whether reading more text could not change any required field.
+    
+    True when every field in REQUIRED_FIELDS is either in known or was matched
+    by its first pattern: each stage's text is the start of the next (the
+    header block is the top of page 1), so that first match stays the first
+    one. A field from a later pattern, or a missing one, could still be taken
+    by a higher-priority match further on. Optional fields are left to
+    whatever the text read so far yields.
     """
+    return all(field in known or ranks.get(field) == 0 for field in REQUIRED_FIELDS)
+
+def _text_stages(pdf):
+    """
+    Yield (depth, text so far) in increasing reading depth.
+    
+    The header block of page 1 comes first; after that the text is the same
+    page-by-page concatenation a full read of the first MAX_PAGES would give,
+    so the last stage parses exactly as a full read does.
+    """
+    first_page = pdf.pages[0]
+    header = first_page.within_bbox((0, 0, first_page.width, first_page.height * HEADER_REGION_FRACTION))
+    yield 'header', (header.extract_text() or "") + "\n"
+    
+    text = ""
+    for i, page in enumerate(pdf.pages[:MAX_PAGES]):
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text + "\n"
+        page.close()
+        yield i + 1, text
+
+def extract_camp_fields(pdf_source, extractor='regex'):
+    """
+    Extract structured camp data from PDF inspection report, reading no more than needed.
+    Accepts the PDF's bytes or a file path.
+    
+    Parsing starts from the header block of page 1 and stops as soon as every
+    required field is settled (see _fields_settled), reading at most MAX_PAGES.
+    Each later page only searches for the fields not yet settled; optional
+    fields are those found in the text read before stopping.
+    
+    The template extractor reads value boxes on page 1 only; any field it
+    cannot find is filled in by the regex extractor from the text read, template
+    values taking precedence. Page 2 fields such as the inspector and date are
+    only read when a required field is still unsettled.
+    
+    Returns (dictionary with extracted fields, depth reached: 'template', 'header',
+    pages read, or 'image_only' when the report has no text layer to read,
+    whether FIELD_EXTRACTION_BUDGET ran out before every field was tried).
+    """
+    if extractor not in FIELD_EXTRACTORS:
+        raise ValueError(f"Unknown field extractor: {extractor}")
+    
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            # Extract text from first few pages (most info is usually on page 1)
-            text = ""
-            for i, page in enumerate(pdf.pages[:3]):  # First 3 pages
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        with open_pdf(pdf_source) as pdf:
+            template_fields = {}
+            if extractor == 'template':
+                template_fields, _ = get_template_cache().extract(pdf.pages[0])
+                # Same cleanup as regex values, so blanks and placeholders fall through to the regex stages
+                template_fields = {f: clean_field_value(v) for f, v in template_fields.items()}
+                template_fields = {f: v for f, v in template_fields.items() if v is not None}
+                if all(f in template_fields for f in FIELD_LABELS):
+                    return template_fields, 'template', False
             
-            if not text.strip():
-                logger.warning(f"No text extracted from PDF: {pdf_path}")
-                return {}
+            # Stop early once no later page could change a required field
+            regex_fields, ranks, text, depth, truncated = {}, {}, "", None, False
+            for depth, text in _text_stages(pdf):
+                # A first-pattern match stays first on longer text; search again only for the rest
+                pending = [f for f in COMPILED_FIELD_PATTERNS if f not in template_fields and ranks.get(f) != 0]
+                stage_fields, stage_ranks, truncated = _extract_ranked_fields(text, field_names=pending)
+                for field in pending:
+                    regex_fields.pop(field, None)
+                    ranks.pop(field, None)
+                regex_fields.update(stage_fields)
+                ranks.update(stage_ranks)
+                if truncated or _fields_settled(ranks, template_fields):
+                    break
             
-            # Extract labeled fields
-            fields = extract_labeled_fields(text)
+            fields = {f: regex_fields[f] for f in COMPILED_FIELD_PATTERNS if f in regex_fields}
+            fields.update(template_fields)
+            
+            if not text.strip():
+                logger.warning(f"No text extracted from PDF: {describe_source(pdf_source)}")
+                return {}, 'image_only', False
             
             # Log what we found
             if fields:
-                logger.debug(f"Extracted fields: {list(fields.keys())}")
+                logger.debug(f"Extracted fields after reading {depth}: {list(fields.keys())}")
             else:
-                logger.warning(f"No labeled fields found in PDF: {pdf_path}")
+                logger.warning(f"No labeled fields found in PDF: {describe_source(pdf_source)}")
                 # Log first 500 chars for debugging
                 logger.debug(f"First 500 chars of text: {text[:500]}")
             
-            return fields
+            return fields, depth, truncated
             
     except Exception as e:
-        logger.error(f"Error extracting data from PDF {pdf_path}: {e}")
-        return {}
+        logger.error(f"Error extracting data from PDF {describe_source(pdf_source)}: {e}")
+        return {}, None, False
+
+def extract_camp_data(pdf_source, extractor='regex'):
+    """
+    Extract structured camp data from PDF inspection report.
+    Returns dictionary with extracted fields.
+    """
+    return extract_camp_fields(pdf_source, extractor)[0]
+
+def count_extraction_depth(depth):
+    """Record how far a parse had to read; called in the parent process."""
+    if depth in EXTRACTION_DEPTHS:
+        EXTRACTION_DEPTHS[depth] += 1
+
+def format_extraction_depths():
+    """One-line summary of how often parsing had to read past page 1."""
+    parsed = sum(EXTRACTION_DEPTHS.values())
+    past_first = EXTRACTION_DEPTHS[2] + EXTRACTION_DEPTHS[3]
+    return (f"PDF parse depth: {EXTRACTION_DEPTHS['template']} layout template, "
+            f"{EXTRACTION_DEPTHS['header']} header only, {EXTRACTION_DEPTHS[1]} page 1, "
+            f"{past_first} past page 1 ({past_first / parsed * 100 if parsed else 0:.1f}% of {parsed} parsed), "
+            f"{EXTRACTION_DEPTHS['image_only']} without a text layer")
+
+def remove_temporary_pdf(pdf_source, temporary):
+    """Delete a spilled temporary download; stored PDFs are kept for the next run."""
+    if temporary:
+        try:
+            os.unlink(pdf_source)
+        except OSError:
+            pass
+
+def merge_camp_pdf_data(camp_info, pdf_data, truncated=False):
+    """
+    Merge fields extracted from a camp's PDF into its index entry.
+    truncated marks a report whose extraction ran out of time, so it is
+    stored as incomplete and parsed again on the next run.
+    Returns a new camp dict with report metadata added.
+    """
+    result = camp_info.copy()
+    result.update(pdf_data)
+    
+    # Add metadata
+    result['doh_report_url'] = camp_info['latest_pdf_url']
+    result['doh_inspection_year'] = camp_info['latest_year']
+    result['doh_extraction_truncated'] = truncated
+    
+    # Validate required fields
+    required_fields = ['camp_id', 'camp_name', 'street_address', 'city', 'zip']
+    missing_fields = [f for f in required_fields if not result.get(f)]
+    
+    if missing_fields:
+        logger.warning(f"Missing required fields for {camp_info['name']}: {missing_fields}")
+    
+    logger.info(f"Successfully processed {camp_info['name']}")
+    return result
 
-def process_camp_pdf(camp_info):
+def process_camp_pdf(camp_info, store=None, field_cache=None, extractor='regex', ocr=None):
     """
     Download and process a single camp's PDF inspection report.
+    Uses the PdfStore if given, otherwise a temporary download, and skips
+    parsing when field_cache already holds this exact PDF. A report with no
+    text layer is queued on ocr (an OcrFallback) if given; see apply_ocr_results.
     Returns camp_info dict updated with extracted PDF data.
     """
     pdf_url = camp_info['latest_pdf_url']
     logger.info(f"Processing PDF for {camp_info['name']}: {pdf_url}")
     
     # Download PDF
-    pdf_path = download_pdf(pdf_url)
-    if not pdf_path:
+    pdf_source, temporary = fetch_pdf(pdf_url, store)
+    if not pdf_source:
         logger.error(f"Failed to download PDF for {camp_info['name']}")
         return camp_info
     
     try:
-        # Extract data from PDF
-        pdf_data = extract_camp_data(pdf_path)
+        pdf_sha256 = source_sha256(pdf_source) if field_cache else None
+        pdf_data = field_cache.get(pdf_sha256) if field_cache else None
+        truncated = False
         
-        # Merge PDF data with camp info
-        result = camp_info.copy()
-        result.update(pdf_data)
+        if pdf_data is None:
+            # Extract data from PDF
+            pdf_data, depth, truncated = extract_camp_fields(pdf_source, extractor)
+            count_extraction_depth(depth)
+            if ocr and depth == 'image_only':
+                ocr.submit((pdf_url, pdf_sha256), pdf_source, HEADER_REGION_FRACTION)
+            # Empty or truncated results would be wrong to reuse; retry those next run
+            if field_cache and pdf_data and not truncated:
+                field_cache.put(pdf_sha256, pdf_data)
         
-        # Add metadata
-        result['doh_report_url'] = pdf_url
-        result['doh_inspection_year'] = camp_info['latest_year']
+        return merge_camp_pdf_data(camp_info, pdf_data, truncated)
         
-        # Validate required fields
-        required_fields = ['camp_id', 'camp_name', 'street_address', 'city', 'zip']
-        missing_fields = [f for f in required_fields if not result.get(f)]
+    finally:
+        remove_temporary_pdf(pdf_source, temporary)
+
+def process_camp_pdfs(camps, concurrency=4, parse_workers=None, store=None, field_cache=None, extractor='regex',
+                      ocr=None):
+    """
+    Download and process many camps' PDFs concurrently.
+    
+    Downloads run on a bounded thread pool; the shared HTTP client additionally
+    caps concurrent requests per host. Each downloaded PDF is parsed in a
+    separate process pool so network I/O and pdfplumber CPU work overlap.
+    
+    Args:
+        camps (list): Camp dicts with latest_pdf_url, as from pick_latest_year
+        concurrency (int): Number of simultaneous downloads
+        parse_workers (int): Parser processes (default: min(concurrency, CPU count))
+        store (PdfStore): Persistent PDF store to fetch through (default: temporary downloads)
+        field_cache (FieldCache): Previously extracted fields; cached PDFs are not parsed
+        extractor (str): Field extraction engine, one of FIELD_EXTRACTORS
+        ocr (OcrFallback): Queue for reports with no text layer; see apply_ocr_results
         
-        if missing_fields:
-            logger.warning(f"Missing required fields for {camp_info['name']}: {missing_fields}")
+    Returns:
+        tuple: (camps in the same order as the input, number of camps whose
+                PDF processing failed). A failed camp is returned unchanged.
+    """
+    if parse_workers is None:
+        parse_workers = min(concurrency, os.cpu_count() or 1)
+    
+    results = [None] * len(camps)
+    errors = 0
+    
+    logger.info(f"Processing {len(camps)} PDFs with {concurrency} downloads and {parse_workers} parser processes")
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as downloader, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+        downloads = {downloader.submit(fetch_pdf, camp['latest_pdf_url'], store): i for i, camp in enumerate(camps)}
+        parses = {}
         
-        logger.info(f"Successfully processed {camp_info['name']}")
-        return result
+        # Hand each PDF to the parser pool as soon as its download finishes
+        for future in as_completed(downloads):
+            i = downloads[future]
+            try:
+                pdf_source, temporary = future.result()
+            except Exception as e:
+                logger.error(f"Error downloading PDF for {camps[i]['name']}: {e}")
+                errors += 1
+                results[i] = camps[i]
+                continue
+            if not pdf_source:
+                logger.error(f"Failed to download PDF for {camps[i]['name']}")
+                results[i] = camps[i]
+                continue
+            
+            pdf_sha256 = None
+            if field_cache:
+                try:
+                    pdf_sha256 = source_sha256(pdf_source)
+                    pdf_data = field_cache.get(pdf_sha256)
+                    if pdf_data is not None:
+                        results[i] = merge_camp_pdf_data(camps[i], pdf_data)
+                        remove_temporary_pdf(pdf_source, temporary)
+                        continue
+                except Exception as e:
+                    logger.error(f"Error processing PDF for {camps[i]['name']}: {e}")
+                    errors += 1
+                    results[i] = camps[i]
+                    remove_temporary_pdf(pdf_source, temporary)
+                    continue
+            
+            parses[parsers.submit(extract_camp_fields, pdf_source, extractor)] = (i, pdf_source, temporary, pdf_sha256)
         
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(pdf_path)
-        except:
-            pass
+        for future in as_completed(parses):
+            i, pdf_source, temporary, pdf_sha256 = parses[future]
+            try:
+                pdf_data, depth, truncated = future.result()
+                count_extraction_depth(depth)
+                if ocr and depth == 'image_only':
+                    ocr.submit((camps[i]['latest_pdf_url'], pdf_sha256), pdf_source, HEADER_REGION_FRACTION)
+                if field_cache and pdf_data and not truncated:
+                    field_cache.put(pdf_sha256, pdf_data)
+                results[i] = merge_camp_pdf_data(camps[i], pdf_data, truncated)
+            except Exception as e:
+                logger.error(f"Error processing PDF for {camps[i]['name']}: {e}")
+                errors += 1
+                # Include camp even if PDF processing failed
+                results[i] = camps[i]
+            finally:
+                remove_temporary_pdf(pdf_source, temporary)
+    
+    return results, errors
+
+def apply_ocr_results(camps, ocr, field_cache=None):
+    """
+    Wait for the OCR queue and merge recovered fields into the camps whose
+    reports had no text layer. Recovered fields are added to field_cache so
+    the next run skips the report entirely.
+    Returns the camps list with recovered camps replaced.
+    """
+    positions = {}
+    for i, camp in enumerate(camps):
+        positions.setdefault(camp.get('latest_pdf_url'), []).append(i)
+    
+    for (pdf_url, pdf_sha256), text in ocr.results():
+        pdf_data, _, truncated = _extract_ranked_fields(text)
+        if not pdf_data:
+            logger.warning(f"No labeled fields found by OCR in {pdf_url}")
+            continue
+        
+        ocr.stats['recovered'] += 1
+        if field_cache and pdf_sha256 and not truncated:
+            field_cache.put(pdf_sha256, pdf_data)
+        for i in positions.get(pdf_url, []):
+            logger.info(f"Recovered {list(pdf_data.keys())} for {camps[i]['name']} by OCR")
+            camps[i] = merge_camp_pdf_data(camps[i], pdf_data, truncated)
+    
+    return camps
 
 if __name__ == "__main__":
     import json
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Cache of fields extracted from camp inspection PDFs.
+Entries are keyed by the PDF's SHA-256 and a fingerprint of the extractor, so an
+unchanged report is never parsed twice and any change to the extraction
+patterns invalidates every entry.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+FIELD_CACHE_FILE = 'camps_ingest/field_cache.sqlite'
+
+# Bump to invalidate entries for reasons the source fingerprint cannot see
+# (e.g. a pdfplumber upgrade that changes extracted text)
+EXTRACTOR_VERSION = 2
+
+def file_sha256(path):
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_sha256(pdf_source):
+    """SHA-256 of a PDF given as bytes or as a file path."""
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(pdf_source).hexdigest()
+    return file_sha256(pdf_source)
+
+def extractor_fingerprint(extractor='regex'):
+    """
+    Fingerprint of a PDF field extractor.
+    Hashes extract_pdf.py itself, where every extraction pattern is defined,
+    and layout_template.py for the template extractor.
+    """
+    digest = hashlib.sha256(f"{EXTRACTOR_VERSION}:{extractor}".encode())
+    sources = ['extract_pdf.py'] + (['layout_template.py'] if extractor == 'template' else [])
+    for source in sources:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), source), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+class FieldCache:
+    """SQLite table of extracted field dicts by (PDF SHA-256, extractor fingerprint)."""
+
+    def __init__(self, cache_file=FIELD_CACHE_FILE, version=None):
+        self.cache_file = cache_file
+        self.version = version or extractor_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(cache_file):
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        self.conn = sqlite3.connect(cache_file, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extracted_fields (
+                pdf_sha256 TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (pdf_sha256, extractor_version)
+            )
+        """)
+
+        # Entries from older extractors can never be hit again
+        stale = self.conn.execute("DELETE FROM extracted_fields WHERE extractor_version != ?",
+                                  (self.version,)).rowcount
+        self.conn.commit()
+        if stale:
+            logger.info(f"Dropped {stale} cached PDF extractions from an older extractor")
+
+    def get(self, pdf_sha256):
+        """Cached fields for a PDF, or None on a miss."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT fields FROM extracted_fields WHERE pdf_sha256 = ? AND extractor_version = ?",
+                (pdf_sha256, self.version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, pdf_sha256, fields):
+        """Store the fields extracted from a PDF."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extracted_fields VALUES (?, ?, ?, ?)",
+                (pdf_sha256, self.version, json.dumps(fields, separators=(',', ':')), datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def format_stats(self):
+        """One-line summary for the end-of-run report."""
+        return f"Field cache: {self.hits} hits, {self.misses} misses"
+
+    def close(self):
+        self.conn.close()
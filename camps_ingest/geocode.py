@@ -4,13 +4,14 @@ Geocoding service for camp addresses using Nominatim (OpenStreetMap).
 Includes rate limiting and caching to be respectful of free services.
 """
 
-import requests
 import json
 import time
 import os
 import logging
 from urllib.parse import quote
 
+from shared import get_client
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -82,7 +83,7 @@ class GeocodingService:
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = get_client().get(url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Layout-template field extraction for NJ DOH camp inspection reports.
+The form has a fixed layout per version: a label such as CITY sits at the same
+place on every report, with its value beside or under it. Label positions are
+learned once per layout from word bounding boxes, cached by a fingerprint of
+the page's ruling lines, and every later report is read straight from the
+value boxes.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_FILE = 'camps_ingest/layout_templates.json'
+
+# Bump when learned templates would come out differently
+TEMPLATE_VERSION = 1
+
+# Label phrases per field, most specific first
+FIELD_LABELS = {
+    'camp_id': ['CAMP ID'],
+    'camp_name': ['CAMP NAME'],
+    'street_address': ['STREET ADDRESS'],
+    'city': ['CITY'],
+    'zip': ['ZIP', 'ZIP CODE'],
+    'county': ['COUNTY'],
+    'phone': ['PHONE NUMBER', 'PHONE'],
+    'email': ['E-MAIL', 'EMAIL'],
+    'camp_owner': ['CAMP OWNER'],
+    'camp_director': ['CAMP DIRECTOR NAME', 'CAMP DIRECTOR'],
+    'health_director': ['HEALTH DIRECTOR NAME', 'HEALTH DIRECTOR'],
+    'evaluation': ['EVALUATION'],
+    'inspector_name': ['INSPECTOR NAME'],
+    'inspection_date': ['INSPECTION DATE']
+}
+
+# Other form labels; they end the value box of the label before them
+BOUNDARY_LABELS = ['MAILING ADDRESS', 'FOOD SERVICE VENDOR', 'REHS LIC.', 'REINSPECTION ON OR AFTER', 'NOV',
+                   'TIME/ACTIVITY REPORT', 'TOTAL HOURS', 'N.J.A.C.']
+
+# Words whose tops are this close (points) are on one line
+LINE_TOLERANCE = 3
+
+# Lines a value may wrap onto when no label line below bounds its box
+MAX_VALUE_LINES = 2
+
+# Share of a cached template's labels that must be found in place for it to be reused
+MIN_VERIFIED_LABELS = 0.8
+
+# Fields a template must locate to be worth caching
+MIN_TEMPLATE_FIELDS = 4
+
+def _norm(text):
+    return text.upper().rstrip(':')
+
+def layout_fingerprint(page):
+    """
+    Fingerprint of a report's form layout: page size and its ruling lines and boxes.
+    Values are typed text, so reports of the same form version share a fingerprint.
+    """
+    shapes = sorted(
+        (round(obj['x0']), round(obj['top']), round(obj['x1']), round(obj['bottom']))
+        for obj in page.rects + page.lines
+    )
+    state = {'version': TEMPLATE_VERSION, 'size': [round(page.width), round(page.height)], 'shapes': shapes}
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+def group_lines(words):
+    """Group words into lines by their top coordinate, each sorted left to right."""
+    lines = []
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if lines and abs(word['top'] - lines[-1][0]['top']) <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w['x0']) for line in lines]
+
+def _find_phrases(line, phrases):
+    """
+    Find label phrases in a line of words, longest first, each word used once.
+    Returns list of (key, x0, x1, top, bottom, first word index, last word index).
+    """
+    texts = [_norm(w['text']) for w in line]
+    used = [False] * len(line)
+    found = []
+    for key, phrase in sorted(phrases, key=lambda kp: -len(kp[1].split())):
+        tokens = [_norm(t) for t in phrase.split()]
+        for i in range(len(line) - len(tokens) + 1):
+            if texts[i:i + len(tokens)] == tokens and not any(used[i:i + len(tokens)]):
+                span = line[i:i + len(tokens)]
+                found.append((key, span[0]['x0'], span[-1]['x1'], min(w['top'] for w in span),
+                              max(w['bottom'] for w in span), i, i + len(tokens) - 1))
+                for j in range(i, i + len(tokens)):
+                    used[j] = True
+                break
+    return sorted(found, key=lambda f: f[1])
+
+def learn_template(page):
+    """
+    Learn value boxes for every field label found on a report's first page.
+
+    A label with other text right after it on its line reads its value from
+    the rest of that line; otherwise the value sits below it, between the
+    label's left edge and the next label on the line, down to the next line
+    that holds a label.
+
+    Returns:
+        dict: Template with label and value boxes per field, or None if too few labels were found
+    """
+    words = page.extract_words()
+    lines = group_lines(words)
+
+    phrases = [(field, phrase) for field, options in FIELD_LABELS.items() for phrase in options]
+    phrases += [(None, phrase) for phrase in BOUNDARY_LABELS]
+
+    line_labels = [_find_phrases(line, phrases) for line in lines]
+    label_line_tops = [line[0]['top'] for line, labels in zip(lines, line_labels) if labels]
+
+    fields = {}
+    for line, labels in zip(lines, line_labels):
+        for n, (field, x0, x1, top, bottom, first, last) in enumerate(labels):
+            if field is None or field in fields:
+                continue
+
+            next_x0 = labels[n + 1][1] if n + 1 < len(labels) else page.width
+            inline = last + 1 < len(line) and line[last + 1]['x0'] < next_x0
+
+            if inline:
+                value_box = [x1, top - LINE_TOLERANCE, next_x0, bottom + LINE_TOLERANCE]
+            else:
+                below = [t for t in label_line_tops if t > top + LINE_TOLERANCE]
+                limit = below[0] if below else bottom + (bottom - top) * 1.5 * MAX_VALUE_LINES
+                value_box = [x0 - LINE_TOLERANCE, bottom, next_x0, limit]
+
+            fields[field] = {
+                'label': [x0, top, x1, bottom],
+                'label_text': _norm(line[first]['text']),
+                'value': [round(v, 2) for v in value_box]
+            }
+
+    if len(fields) < MIN_TEMPLATE_FIELDS:
+        return None
+    return {'version': TEMPLATE_VERSION, 'fields': fields}
+
+def _inside(word, box):
+    """True when the word's center lies in box [x0, top, x1, bottom]."""
+    cx = (word['x0'] + word['x1']) / 2
+    cy = (word['top'] + word['bottom']) / 2
+    return box[0] <= cx <= box[2] and box[1] <= cy <= box[3]
+
+def verify_template(template, words):
+    """Check that enough of the template's labels are where it expects them."""
+    found = 0
+    for spec in template['fields'].values():
+        x0, top = spec['label'][0], spec['label'][1]
+        if any(_norm(w['text']) == spec['label_text'] and abs(w['x0'] - x0) <= LINE_TOLERANCE
+               and abs(w['top'] - top) <= LINE_TOLERANCE for w in words):
+            found += 1
+    return found >= MIN_VERIFIED_LABELS * len(template['fields'])
+
+def region_of_interest(template, page):
+    """Bounding box of every label and value box in a template, clipped to the page."""
+    boxes = [spec['value'] for spec in template['fields'].values()] + \
+            [spec['label'] for spec in template['fields'].values()]
+    return (max(0, min(b[0] for b in boxes)), max(0, min(b[1] for b in boxes)),
+            min(page.width, max(b[2] for b in boxes)), min(page.height, max(b[3] for b in boxes)))
+
+def read_fields(template, words):
+    """Read each field's value from the words inside its value box."""
+    fields = {}
+    for field, spec in template['fields'].items():
+        inside = [w for w in words if _inside(w, spec['value'])]
+        value = ' '.join(' '.join(w['text'] for w in line) for line in group_lines(inside)).strip()
+        if value:
+            fields[field] = value
+    return fields
+
+class TemplateCache:
+    """Learned templates by layout fingerprint, in one JSON file shared by parser processes."""
+
+    def __init__(self, cache_file=TEMPLATE_CACHE_FILE):
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self.templates = self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load layout templates: {e}")
+        return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.cache_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.templates, f, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            logger.error(f"Could not save layout templates: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def extract(self, page):
+        """
+        Read fields from a report's first page with the template for its layout.
+        Learns and caches the template when the layout is new or the cached one no longer fits.
+
+        Returns:
+            tuple: (extracted fields, 'reused' or 'learned'), or ({}, None) if no template could be learned
+        """
+        fingerprint = layout_fingerprint(page)
+        with self._lock:
+            template = self.templates.get(fingerprint)
+
+        if template is not None and template.get('version') == TEMPLATE_VERSION:
+            # Only the words in the template's boxes are needed. Filter whole characters
+            # rather than crop, which clips those straddling the edge into the region
+            region = region_of_interest(template, page)
+            words = page.filter(lambda obj: obj.get('object_type') != 'char' or _inside(obj, region)).extract_words()
+            if verify_template(template, words):
+                return read_fields(template, words), 'reused'
+            logger.info(f"Layout template {fingerprint[:12]} no longer matches; relearning")
+
+        template = learn_template(page)
+        if template is None:
+            return {}, None
+
+        with self._lock:
+            # Another process may have learned templates meanwhile; merge before writing
+            self.templates = {**self._load(), **self.templates, fingerprint: template}
+            self._save()
+        logger.info(f"Learned layout template {fingerprint[:12]} ({len(template['fields'])} fields)")
+        return read_fields(template, page.extract_words()), 'learned'
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+OCR fallback for camp inspection reports that have no text layer.
+Only the header region of an image-only page 1 is rendered and recognized,
+with a locally installed Tesseract. Recognition runs in a process pool and its
+text is cached by the hash of the rendered image, so a scanned report is only
+ever OCR'd once per engine version.
+"""
+
+import io
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from shared import open_pdf, describe_source
+
+logger = logging.getLogger(__name__)
+
+OCR_CACHE_FILE = 'camps_ingest/ocr_cache.sqlite'
+
+# Render resolution for OCR; Tesseract is most accurate on text around 300 DPI
+OCR_RESOLUTION = 300
+
+# Tesseract language and options: treat the header as one block of text lines
+OCR_LANG = 'eng'
+OCR_CONFIG = '--psm 6'
+
+def ocr_engine_version():
+    """
+    Version of the local Tesseract install.
+    Returns None when pytesseract or the tesseract binary is not installed.
+    """
+    try:
+        import pytesseract
+        return str(pytesseract.get_tesseract_version())
+    except ImportError:
+        return None
+    except Exception as e:
+        logger.debug(f"Tesseract not usable: {e}")
+        return None
+
+def render_header_image(pdf_source, header_fraction):
+    """
+    Render the header region of page 1 as PNG bytes, if page 1 has no text layer.
+    Returns None when the page has text, so only image-only pages are OCR'd.
+    """
+    with open_pdf(pdf_source) as pdf:
+        page = pdf.pages[0]
+        if page.chars:
+            return None
+        header = page.crop((0, 0, page.width, page.height * header_fraction))
+        image = header.to_image(resolution=OCR_RESOLUTION).original
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+def ocr_image(png):
+    """
+    Recognize the text in a PNG; runs in an OCR worker process.
+    Returns (text, seconds spent in Tesseract).
+    """
+    import pytesseract
+    from PIL import Image
+
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(Image.open(io.BytesIO(png)), lang=OCR_LANG, config=OCR_CONFIG)
+    return text, time.perf_counter() - start
+
+class OcrCache:
+    """SQLite table of OCR text by (page image SHA-256, engine)."""
+
+    def __init__(self, cache_file=OCR_CACHE_FILE, engine=''):
+        self.cache_file = cache_file
+        self.engine = f"{engine}:{OCR_LANG}:{OCR_CONFIG}"
+        self._lock = threading.Lock()
+
+        if os.path.dirname(cache_file):
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        self.conn = sqlite3.connect(cache_file, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_text (
+                image_sha256 TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                text TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (image_sha256, engine)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, image_sha256):
+        """Cached text for a page image, or None on a miss."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT text FROM ocr_text WHERE image_sha256 = ? AND engine = ?",
+                (image_sha256, self.engine)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, image_sha256, text, seconds):
+        """Store the text recognized in a page image."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ocr_text VALUES (?, ?, ?, ?, ?)",
+                (image_sha256, self.engine, text, seconds, datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+class OcrFallback:
+    """
+    Queue of image-only reports to OCR.
+
+    submit() renders a report's header in the caller, while the PDF is still
+    at hand, and hands recognition to a process pool; results() waits for
+    the queue. Without a usable Tesseract install every report is skipped
+    with a warning.
+    """
+
+    def __init__(self, workers=None, cache_file=OCR_CACHE_FILE):
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = ocr_engine_version()
+        self.cache = OcrCache(cache_file, self.engine) if self.engine else None
+        self._pool = None
+        self._pending = []
+        self.stats = {'image_only': 0, 'pages': 0, 'cached_pages': 0, 'seconds': 0.0, 'recovered': 0}
+
+        if self.engine is None:
+            logger.warning("OCR requested but pytesseract or the tesseract binary is not installed; "
+                           "image-only reports will be skipped")
+
+    def submit(self, key, pdf_source, header_fraction):
+        """Queue OCR of an image-only report; key is handed back by results()."""
+        self.stats['image_only'] += 1
+        if self.engine is None:
+            return
+
+        try:
+            png = render_header_image(pdf_source, header_fraction)
+        except Exception as e:
+            logger.error(f"Could not render {describe_source(pdf_source)} for OCR: {e}")
+            return
+        if png is None:
+            return
+
+        image_sha256 = hashlib.sha256(png).hexdigest()
+        text = self.cache.get(image_sha256)
+        if text is not None:
+            self.stats['cached_pages'] += 1
+            self._pending.append((key, image_sha256, text))
+            return
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pending.append((key, image_sha256, self._pool.submit(ocr_image, png)))
+
+    def results(self):
+        """
+        Wait for every queued report.
+        Yields (key, OCR text) in submission order; failed recognitions are logged and skipped.
+        """
+        pending, self._pending = self._pending, []
+        for key, image_sha256, job in pending:
+            if isinstance(job, str):
+                yield key, job
+                continue
+            try:
+                text, seconds = job.result()
+            except Exception as e:
+                logger.error(f"OCR failed: {e}")
+                continue
+            self.stats['pages'] += 1
+            self.stats['seconds'] += seconds
+            self.cache.put(image_sha256, text, seconds)
+            yield key, text
+
+    def format_stats(self):
+        """One-line summary for the end-of-run report."""
+        pages = self.stats['pages']
+        per_page = f"{self.stats['seconds'] / pages:.2f}s/page" if pages else "n/a"
+        return (f"OCR: {self.stats['recovered']}/{self.stats['image_only']} image-only reports recovered; "
+                f"{pages} pages OCR'd in {self.stats['seconds']:.1f}s ({per_page}), "
+                f"{self.stats['cached_pages']} from cache")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self.cache is not None:
+            self.cache.close()
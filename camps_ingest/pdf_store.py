@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Persistent store for camp inspection PDFs.
+PDFs are kept by content hash, and each URL's ETag/Last-Modified is recorded so
+later runs send conditional requests and only download reports that changed.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+from shared import get_client
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = 'camps_ingest/pdf_cache'
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temporary file and rename."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class PdfStore:
+    """
+    Content-addressed PDF cache keyed by URL.
+
+    index.json maps each URL to the SHA-256 of its last downloaded body and the
+    validators the server sent with it; bodies live under objects/ by hash, so
+    reports that are republished unchanged under a new URL are stored once.
+    """
+
+    def __init__(self, cache_dir=PDF_CACHE_DIR, offline=False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'offline_hits': 0, 'misses': 0, 'bytes': 0}
+
+    def _load_index(self):
+        """Load the URL index from file."""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load PDF store index: {e}")
+        return {}
+
+    def _save_index(self):
+        """Save the URL index; call with the lock held."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _write_atomic(self.index_file, json.dumps(self.index, indent=2).encode('utf-8'))
+
+    def object_path(self, sha256):
+        """Path of the stored PDF with the given content hash."""
+        return os.path.join(self.cache_dir, 'objects', sha256[:2], f"{sha256}.pdf")
+
+    def cached_path(self, url):
+        """Path of the stored copy of url, or None if it has never been downloaded."""
+        with self._lock:
+            entry = self.index.get(url)
+        if entry and os.path.exists(self.object_path(entry['sha256'])):
+            return self.object_path(entry['sha256'])
+        return None
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def fetch(self, url, timeout=30):
+        """
+        Return a local path to the PDF at url, downloading only if it changed.
+
+        Sends If-None-Match/If-Modified-Since when a copy is stored and serves a
+        304 from disk. In offline mode the network is never used.
+
+        Returns:
+            str: Path of the stored PDF, or None if it is not available
+        """
+        cached = self.cached_path(url)
+
+        if self.offline:
+            if cached:
+                self._count('offline_hits')
+            else:
+                self._count('misses')
+                logger.error(f"PDF not in store (offline mode): {url}")
+            return cached
+
+        headers = {}
+        if cached:
+            with self._lock:
+                entry = self.index[url]
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = get_client().get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and cached:
+                self._count('not_modified')
+                logger.debug(f"PDF not modified, using stored copy: {url}")
+                return cached
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Error downloading PDF from {url}: {e}")
+            if cached:
+                logger.warning(f"Using stored copy of {url}")
+                return cached
+            self._count('misses')
+            return None
+
+        content = response.content
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, content)
+
+        with self._lock:
+            self.index[url] = {
+                'sha256': sha256,
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+                'size': len(content),
+                'fetched_at': datetime.now().isoformat()
+            }
+            self._save_index()
+            self.stats['downloaded'] += 1
+            self.stats['bytes'] += len(content)
+
+        return path
+
+    def format_stats(self):
+        """One-line summary for the end-of-run report."""
+        return (f"PDF store: {self.stats['downloaded']} downloaded ({self.stats['bytes'] / 1024:,.0f} KB), "
+                f"{self.stats['not_modified']} not modified, {self.stats['offline_hits']} served offline, "
+                f"{self.stats['misses']} unavailable")
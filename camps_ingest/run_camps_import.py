@@ -14,11 +14,16 @@ from datetime import datetime
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
-from crawl_index import fetch_camps_index, pick_latest_year
-from extract_pdf import process_camp_pdf
+from crawl_index import fetch_camps_index, pick_latest_year, LivenessCache, PROBE_CONCURRENCY, LIVENESS_TTL
+from extract_pdf import (process_camp_pdf, process_camp_pdfs, apply_ocr_results, format_extraction_depths,
+                         FIELD_EXTRACTORS)
+from pdf_store import PdfStore, PDF_CACHE_DIR
+from field_cache import FieldCache, extractor_fingerprint
+from ocr import OcrFallback
 from normalize import normalize_camp_data
 from geocode import geocode_camps
 from upsert import upsert_camps, get_camp_stats
+from shared import IngestLedger, pipeline_version, records_sha256, describe_skip, get_client, SHARED_MODULE_FILES
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -63,6 +68,29 @@ def main():
                        help='Skip geocoding step')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose logging')
+    parser.add_argument('--concurrency', type=int, default=1,
+                       help='Number of camp PDFs to download at once; parsing runs in a process pool (default: 1)')
+    parser.add_argument('--probe-concurrency', type=int, default=PROBE_CONCURRENCY,
+                       help=f'Report URLs to check for liveness at once (default: {PROBE_CONCURRENCY})')
+    parser.add_argument('--liveness-ttl', type=float, default=LIVENESS_TTL / 3600,
+                       help=f'Hours a report URL confirmed live is not checked again; 0 always checks '
+                            f'(default: {LIVENESS_TTL // 3600})')
+    parser.add_argument('--pdf-cache-dir', default=PDF_CACHE_DIR,
+                       help=f'Persistent store for inspection PDFs (default: {PDF_CACHE_DIR})')
+    parser.add_argument('--no-pdf-cache', action='store_true',
+                       help='Download every PDF to a temporary file instead of using the PDF store')
+    parser.add_argument('--field-extractor', choices=FIELD_EXTRACTORS, default='regex',
+                       help="'regex' over report text, or 'template' to read value boxes of the learned form layout")
+    parser.add_argument('--no-field-cache', action='store_true',
+                       help='Parse every PDF even if its extracted fields are cached')
+    parser.add_argument('--offline', action='store_true',
+                       help='Only use PDFs already in the PDF store; never download them')
+    parser.add_argument('--ocr', action='store_true',
+                       help='OCR the page 1 header of reports with no text layer (needs pytesseract and tesseract)')
+    parser.add_argument('--ocr-workers', type=int, default=None,
+                       help='OCR processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                       help='Run even if the index is unchanged since the last successful import')
     
     args = parser.parse_args()
     
@@ -73,6 +101,9 @@ def main():
     if args.db_url:
         os.environ['DATABASE_URL'] = args.db_url
     
+    if args.offline and args.no_pdf_cache:
+        parser.error('--offline needs the PDF store; drop --no-pdf-cache')
+    
     logger.info("🏕️  Starting NJ Summer Youth Camps Import")
     logger.info(f"📄 Index URL: {args.index_url}")
     logger.info(f"🌍 Geocoder: {args.geocoder}")
@@ -88,9 +119,26 @@ def main():
         
         logger.info(f"Found {len(camps)} camps in index")
         
+        # Skip the rest if this exact index already went through this pipeline
+        ledger = IngestLedger()
+        snapshot_sha256 = records_sha256(camps)
+        version = pipeline_version(os.path.dirname(os.path.abspath(__file__)), {
+            'database_url': os.getenv('DATABASE_URL'),
+            'geocoder': args.geocoder,
+            'max_camps': args.max_camps,
+            'skip_geocoding': args.skip_geocoding,
+            'field_extractor': args.field_extractor,
+            'ocr': args.ocr
+        }, extra_files=SHARED_MODULE_FILES)
+        if not args.force and ledger.is_unchanged('nj_camps', snapshot_sha256, version):
+            for line in describe_skip('nj_camps', ledger.last_run('nj_camps')):
+                logger.info(line)
+            return 0
+        
         # Step 2: Pick latest year for each camp
         logger.info("\n=== STEP 2: Selecting latest year per camp ===")
-        processed_camps = pick_latest_year(camps)
+        liveness_cache = LivenessCache(ttl=args.liveness_ttl * 3600) if args.liveness_ttl > 0 else None
+        processed_camps = pick_latest_year(camps, args.probe_concurrency, liveness_cache)
         if not processed_camps:
             logger.error("No camps with valid year links. Exiting.")
             return 1
@@ -106,19 +154,39 @@ def main():
         logger.info("\n=== STEP 3: Extracting PDF data ===")
         extracted_camps = []
         pdf_errors = 0
+        pdf_store = None if args.no_pdf_cache else PdfStore(args.pdf_cache_dir, offline=args.offline)
+        field_cache = None if args.no_field_cache else FieldCache(version=extractor_fingerprint(args.field_extractor))
+        ocr = OcrFallback(args.ocr_workers) if args.ocr else None
         
-        for i, camp in enumerate(processed_camps):
-            logger.info(f"Processing PDF {i+1}/{len(processed_camps)}: {camp['name']}")
-            try:
-                extracted_camp = process_camp_pdf(camp)
-                extracted_camps.append(extracted_camp)
-            except Exception as e:
-                logger.error(f"Error processing PDF for {camp['name']}: {e}")
-                pdf_errors += 1
-                # Include camp even if PDF processing failed
-                extracted_camps.append(camp)
+        if args.concurrency > 1:
+            extracted_camps, pdf_errors = process_camp_pdfs(processed_camps, args.concurrency,
+                                                            store=pdf_store, field_cache=field_cache,
+                                                            extractor=args.field_extractor, ocr=ocr)
+        else:
+            for i, camp in enumerate(processed_camps):
+                logger.info(f"Processing PDF {i+1}/{len(processed_camps)}: {camp['name']}")
+                try:
+                    extracted_camp = process_camp_pdf(camp, pdf_store, field_cache, args.field_extractor, ocr)
+                    extracted_camps.append(extracted_camp)
+                except Exception as e:
+                    logger.error(f"Error processing PDF for {camp['name']}: {e}")
+                    pdf_errors += 1
+                    # Include camp even if PDF processing failed
+                    extracted_camps.append(camp)
+        
+        if ocr:
+            extracted_camps = apply_ocr_results(extracted_camps, ocr, field_cache)
+            ocr.close()
         
         logger.info(f"Extracted data from {len(extracted_camps)} camps ({pdf_errors} PDF errors)")
+        logger.info(format_extraction_depths())
+        if pdf_store:
+            logger.info(pdf_store.format_stats())
+        if field_cache:
+            logger.info(field_cache.format_stats())
+            field_cache.close()
+        if ocr:
+            logger.info(ocr.format_stats())
         
         # Step 4: Normalize data
         logger.info("\n=== STEP 4: Normalizing data ===")
@@ -157,6 +225,13 @@ def main():
             try:
                 upsert_stats = upsert_camps(final_camps)
                 logger.info(f"Database upsert complete: {upsert_stats}")
+                # Truncated reports are stored as such; leave the ledger alone so the next run parses them again
+                truncated = sum(1 for camp in final_camps if camp.get('doh_extraction_truncated'))
+                if truncated:
+                    logger.warning(f"{truncated} reports ran out of field extraction time; not recording this run")
+                elif not upsert_stats['errors']:
+                    ledger.record('nj_camps', snapshot_sha256, version,
+                                  {k: v for k, v in upsert_stats.items() if k != 'error_details'})
                 
                 # Get updated stats
                 camp_stats = get_camp_stats()
@@ -172,6 +247,10 @@ def main():
         logger.info("\n=== IMPORT SUMMARY ===")
         logger.info(f"Total camps processed: {len(final_camps)}")
         logger.info(f"PDF extraction errors: {pdf_errors}")
+        if field_cache:
+            logger.info(f"PDFs parsed: {field_cache.misses}, reused from field cache: {field_cache.hits}")
+        if ocr:
+            logger.info(ocr.format_stats())
         
         if not args.skip_geocoding:
             geocoding_success = sum(1 for c in final_camps if c.get('geocoding_status') == 'OK')
@@ -180,6 +259,9 @@ def main():
         if export_path:
             logger.info(f"Data exported to: {export_path}")
         
+        for line in get_client().format_stats():
+            logger.info(f"HTTP {line}")
+        
         if not args.dry_run:
             logger.info("Database updated successfully")
         
@@ -8,7 +8,8 @@ ALTER TABLE providers
   ADD COLUMN IF NOT EXISTS camp_owner TEXT,
   ADD COLUMN IF NOT EXISTS camp_director TEXT,
   ADD COLUMN IF NOT EXISTS health_director TEXT,
-  ADD COLUMN IF NOT EXISTS evaluation TEXT;
+  ADD COLUMN IF NOT EXISTS evaluation TEXT,
+  ADD COLUMN IF NOT EXISTS doh_extraction_truncated BOOLEAN DEFAULT FALSE;
 
 CREATE INDEX IF NOT EXISTS idx_providers_campid ON providers (camp_id);
 CREATE INDEX IF NOT EXISTS idx_providers_source ON providers (source);
\ No newline at end of file
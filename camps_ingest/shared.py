@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+data_ingest modules shared with the camps pipeline: HTTP client, PDF opening
+and the ingest ledger.
+camps_ingest has its own normalize, geocode and upsert modules, so putting
+data_ingest on sys.path lets one package's module shadow the other's. The
+shared modules are loaded from their files under data_ingest_* names instead.
+"""
+
+import importlib.util
+import os
+import sys
+
+DATA_INGEST_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data_ingest'))
+
+def load_data_ingest_module(name):
+    """Import data_ingest/<name>.py as data_ingest_<name>, once per process"""
+    module_name = f"data_ingest_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(DATA_INGEST_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+http_client = load_data_ingest_module('http_client')
+pdf_source = load_data_ingest_module('pdf_source')
+ingest_ledger = load_data_ingest_module('ingest_ledger')
+
+# Hashed into the camps pipeline version alongside camps_ingest/*.py
+SHARED_MODULE_FILES = [http_client.__file__, pdf_source.__file__, ingest_ledger.__file__]
+
+get_client = http_client.get_client
+open_pdf = pdf_source.open_pdf
+describe_source = pdf_source.describe_source
+SPILL_THRESHOLD = pdf_source.SPILL_THRESHOLD
+IngestLedger = ingest_ledger.IngestLedger
+pipeline_version = ingest_ledger.pipeline_version
+records_sha256 = ingest_ledger.records_sha256
+describe_skip = ingest_ledger.describe_skip
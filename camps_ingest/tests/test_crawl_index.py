@@ -0,0 +1,31 @@
+"""parse_camps_index finds the same camps as the original find_all/get_text walk"""
+
+import os
+
+import pytest
+
+from bench_index import INDEX_URL, reference_parse_camps_index, synthetic_index_page
+from crawl_index import parse_camps_index
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'camps_index.html')
+
+def read_fixture():
+    with open(FIXTURE, 'rb') as f:
+        return f.read()
+
+def test_fixture_page_matches_original_walk():
+    content = read_fixture()
+    camps = list(parse_camps_index(content, INDEX_URL))
+
+    assert camps == reference_parse_camps_index(content, INDEX_URL)
+    assert [camp['camp_id'] for camp in camps] == ['0142', '0207', '0311', '0502', '0577', '0733', '0801']
+    assert camps[4]['county'] == 'Cape May'
+
+@pytest.mark.parametrize('nesting', [0, 25])
+def test_synthetic_page_matches_original_walk(nesting):
+    content = synthetic_index_page(300, seed=3)
+    # Wrap the rows in layout divs, which the original walk re-read once per level
+    content = content.replace(b'<div class="section">', b'<div class="section">' + b'<div>' * nesting)
+    content = content.replace(b'</div></div></div></body>', b'</div>' * nesting + b'</div></div></div></body>')
+
+    assert list(parse_camps_index(content, INDEX_URL)) == reference_parse_camps_index(content, INDEX_URL)
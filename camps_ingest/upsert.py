@@ -95,7 +95,8 @@ def upsert_camp(camp_data, conn):
             'camp_owner': camp_data.get('camp_owner'),
             'camp_director': camp_data.get('camp_director'),
             'health_director': camp_data.get('health_director'),
-            'evaluation': camp_data.get('evaluation')
+            'evaluation': camp_data.get('evaluation'),
+            'doh_extraction_truncated': camp_data.get('doh_extraction_truncated', False)
         }
         
         if existing_id:
@@ -128,8 +129,9 @@ def upsert_camp(camp_data, conn):
                     camp_director = %(camp_director)s,
                     health_director = %(health_director)s,
                     evaluation = %(evaluation)s,
+                    doh_extraction_truncated = %(doh_extraction_truncated)s,
                     updated_at = NOW()
-                WHERE id = %s
+                WHERE id = %(existing_id)s
             """
             cur.execute(update_sql, {**db_data, 'existing_id': existing_id})
             return ('updated', existing_id)
@@ -145,7 +147,7 @@ def upsert_camp(camp_data, conn):
                     age_min_months, age_max_months,
                     camp_id, doh_inspection_year, doh_report_url,
                     camp_owner, camp_director, health_director, evaluation,
-                    created_at, updated_at
+                    doh_extraction_truncated, created_at, updated_at
                 ) VALUES (
                     %(name)s, %(address)s, %(city)s, %(state)s, %(borough)s, 
                     %(zip_code)s, %(county)s, %(phone)s, %(email)s, 
@@ -155,7 +157,7 @@ def upsert_camp(camp_data, conn):
                     %(age_min_months)s, %(age_max_months)s,
                     %(camp_id)s, %(doh_inspection_year)s, %(doh_report_url)s,
                     %(camp_owner)s, %(camp_director)s, %(health_director)s, %(evaluation)s,
-                    NOW(), NOW()
+                    %(doh_extraction_truncated)s, NOW(), NOW()
                 ) RETURNING id
             """
             cur.execute(insert_sql, db_data)
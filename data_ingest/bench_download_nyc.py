@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sharded NYC download at several worker counts
+
+Runs against a local synthetic_socrata.py server in its own process, with
+latency added to every request to stand in for the round trip to NYC Open
+Data. Every worker count must produce the same rows.
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+import requests
+
+from download_nyc import fetch_shards, load_raw_providers, SELECT_COLUMNS, PAGE_SIZE
+from http_client import get_client, host_limit
+from ingest_ledger import records_sha256
+
+def start_server(rows: int, latency_ms: float, port: int, timeout: float = 300) -> subprocess.Popen:
+    """Start synthetic_socrata.py and wait until it answers"""
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve().parent / 'synthetic_socrata.py'),
+         '--rows', str(rows), '--port', str(port), '--latency-ms', str(latency_ms)],
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except requests.exceptions.ConnectionError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("synthetic Socrata server did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel paged Socrata downloads')
+    parser.add_argument('--rows', type=int, default=300000, help='Synthetic inspection rows (all five boroughs)')
+    parser.add_argument('--latency-ms', type=float, default=250, help='Latency added to every request')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Rows per page and shard')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts to compare')
+    parser.add_argument('--port', type=int, default=8800, help='Port for the synthetic server')
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic rows...")
+    server = start_server(args.rows, args.latency_ms, args.port)
+    endpoint = f"http://127.0.0.1:{args.port}/resource/dsg6-ifza.json"
+    work_dir = Path(tempfile.mkdtemp(prefix='bench_download_nyc_'))
+
+    results = []
+    try:
+        for workers in args.workers:
+            shard_dir = work_dir / f"workers_{workers}"
+            start = time.perf_counter()
+            count = fetch_shards(endpoint, SELECT_COLUMNS, '', str(shard_dir), args.page_size, workers)
+            elapsed = time.perf_counter() - start
+            if count is None:
+                print(f"Download with {workers} workers failed")
+                sys.exit(1)
+            shards = len(list(shard_dir.glob('part-*.ndjson')))
+            results.append((workers, count, shards, elapsed, records_sha256(load_raw_providers(shard_dir))))
+    finally:
+        server.terminate()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = results[0][3]
+    print(f"\nHost limit for 127.0.0.1 in http_client: {host_limit('127.0.0.1')} concurrent requests")
+    print(f"{'workers':>8} {'rows':>9} {'shards':>7} {'seconds':>8} {'rows/s':>9} {'speedup':>8}")
+    for workers, count, shards, elapsed, _ in results:
+        print(f"{workers:>8} {count:>9,} {shards:>7} {elapsed:>8.2f} {count / elapsed:>9,.0f} {baseline / elapsed:>7.1f}x")
+
+    for line in get_client().format_stats():
+        print(line)
+
+    digests = {digest for *_, digest in results}
+    if len(digests) != 1:
+        print("MISMATCH: worker counts produced different rows")
+        sys.exit(1)
+    print("All worker counts produced identical rows")
+
+if __name__ == "__main__":
+    main()
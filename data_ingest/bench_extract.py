@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF extraction engines on a real PDF or on synthetic DCF-style PDFs
+
+Every run happens in a freshly spawned process with caching disabled, so peak
+RSS is per engine and no run benefits from the one before it. Results are
+written as JSON so they can be compared across commits.
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from extract import ENGINES, extract_providers_from_pdf
+from pdf_source import open_pdf
+from synthetic_pdf import SYNTHETIC_DIR, build_synthetic_pdf
+
+DEFAULT_SYNTHETIC_PAGES = [10, 100, 1000]
+
+BENCH_OUTPUT_DIR = "data_ingest/exports"
+
+def _peak_rss_mb(who: int) -> float:
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _run_engine(pdf_path: str, engine: str, workers: int) -> Dict[str, Any]:
+    """Child process entry point: extract once and report time and memory"""
+    start = time.perf_counter()
+    rows = extract_providers_from_pdf(pdf_path, workers=workers, use_layout_profile=False,
+                                      page_cache_dir=None, engine=engine)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'rows': rows,
+        'seconds': elapsed,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'worker_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    }
+
+def benchmark_engine(pdf_path: str, engine: str, page_count: int, workers: int = 1) -> Dict[str, Any]:
+    """Run one engine in a clean process and derive throughput figures"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        result = executor.submit(_run_engine, pdf_path, engine, workers).result()
+
+    elapsed = result['seconds']
+    return {
+        'engine': engine,
+        'rows': result['rows'],
+        'seconds': elapsed,
+        'pages_per_sec': page_count / elapsed if elapsed > 0 else 0.0,
+        'rows_per_sec': len(result['rows']) / elapsed if elapsed > 0 else 0.0,
+        'peak_rss_mb': result['peak_rss_mb'],
+        'worker_peak_rss_mb': result['worker_peak_rss_mb']
+    }
+
+def compare_rows(reference: List[Dict[str, Any]], candidate: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Field-level agreement of candidate rows with reference rows, matched on License Number
+
+    Returns:
+        Dictionary with matched, missing and extra row counts, overall field
+        agreement and agreement per field
+    """
+    by_license = {row.get('License Number'): row for row in reference}
+    fields = [k for k in (reference[0] if reference else {}) if not k.startswith('_')]
+
+    matched = 0
+    seen = set()
+    equal_by_field = {field: 0 for field in fields}
+    for row in candidate:
+        license_number = row.get('License Number')
+        ref = by_license.get(license_number)
+        if ref is None or license_number in seen:
+            continue
+        seen.add(license_number)
+        matched += 1
+        for field in fields:
+            if row.get(field, '') == ref.get(field, ''):
+                equal_by_field[field] += 1
+
+    total_fields = matched * len(fields)
+    return {
+        'matched_rows': matched,
+        'missing_rows': len(by_license) - matched,
+        'extra_rows': len(candidate) - matched,
+        'field_agreement': sum(equal_by_field.values()) / total_fields if total_fields else 0.0,
+        'field_agreement_by_field': {field: equal / matched if matched else 0.0
+                                     for field, equal in equal_by_field.items()}
+    }
+
+def benchmark_pdf(pdf_path: str, engines: List[str], workers: int,
+                  truth: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Benchmark every engine on one PDF
+
+    Accuracy is measured against the ground truth when given, otherwise against
+    the first engine's output.
+    """
+    with open_pdf(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+
+    results = []
+    for engine in engines:
+        result = benchmark_engine(pdf_path, engine, page_count, workers)
+        result.update({'pdf': pdf_path, 'pages': page_count, 'workers': workers})
+        results.append(result)
+
+    reference = truth if truth is not None else results[0]['rows']
+    for result in results:
+        result['accuracy'] = compare_rows(reference, result['rows'])
+        result['accuracy']['reference'] = 'ground_truth' if truth is not None else results[0]['engine']
+
+    return results
+
+def print_results(results: List[Dict[str, Any]]):
+    print("\n" + "=" * 60)
+    print("EXTRACTION BENCHMARK")
+    print("=" * 60)
+    for result in results:
+        accuracy = result['accuracy']
+        print(f"  {Path(result['pdf']).name} ({result['pages']} pages) {result['engine']:>8}: "
+              f"{len(result['rows']):,} rows in {result['seconds']:.2f}s")
+        print(f"    {result['pages_per_sec']:.2f} pages/sec, {result['rows_per_sec']:,.0f} rows/sec, "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB")
+        print(f"    vs {accuracy['reference']}: {accuracy['matched_rows']:,} matched, "
+              f"{accuracy['missing_rows']:,} missing, {accuracy['extra_rows']:,} extra, "
+              f"{accuracy['field_agreement'] * 100:.2f}% field agreement")
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_report(results: List[Dict[str, Any]], output_path: str):
+    """Write results without the extracted rows, plus enough context to compare runs"""
+    report = {
+        'git_commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [{k: v for k, v in result.items() if k != 'rows'} | {'row_count': len(result['rows'])}
+                    for result in results]
+    }
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nBenchmark results saved to: {output_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction engines on one PDF or on synthetic DCF PDFs')
+    parser.add_argument('pdf_path', nargs='?', help='PDF to benchmark; omit to run the synthetic suite')
+    parser.add_argument('--pages', type=int, nargs='+', default=DEFAULT_SYNTHETIC_PAGES,
+                        help='Synthetic PDF sizes in pages (default: 10 100 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for synthetic provider data')
+    parser.add_argument('--synthetic-dir', default=SYNTHETIC_DIR, help='Where synthetic PDFs are generated and reused')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES, help='Engines to run')
+    parser.add_argument('--workers', type=int, default=1, help='Number of extraction processes')
+    parser.add_argument('--output', help='JSON results path (default: data_ingest/exports/bench_extract_<timestamp>.json)')
+    args = parser.parse_args()
+
+    if args.pdf_path:
+        if not Path(args.pdf_path).exists():
+            print(f"PDF file not found: {args.pdf_path}")
+            sys.exit(1)
+        results = benchmark_pdf(args.pdf_path, args.engines, args.workers)
+    else:
+        results = []
+        for pages in args.pages:
+            pdf_path, truth = build_synthetic_pdf(pages, args.seed, args.synthetic_dir)
+            results.extend(benchmark_pdf(pdf_path, args.engines, args.workers, truth))
+
+    print_results(results)
+
+    output_path = args.output or f"{BENCH_OUTPUT_DIR}/bench_extract_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    write_report(results, output_path)
+
+if __name__ == "__main__":
+    main()
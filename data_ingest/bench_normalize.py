@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark the row-wise and columnar NJ DCF normalizers
+
+Feeds the rows of the NJ childcare centers CSV (renamed to the extractor's
+column names, with page/row source fields) through normalize_provider_data
+and validate_provider_data one row at a time, then through
+normalize_provider_batch, and checks both give the same records and errors.
+Email validation looks up each domain, so timings depend on DNS.
+"""
+
+import sys
+import glob
+import time
+import argparse
+from typing import List, Dict, Any
+
+import pandas as pd
+
+from normalize import normalize_provider_data, validate_provider_data, normalize_provider_batch
+
+DEFAULT_CSV_PATTERN = "attached_assets/nj_childcare_centers_2025_*.csv"
+
+# CSV columns to the header names extract.py gives them
+CSV_COLUMNS = {
+    'county': 'County',
+    'license_id': 'License Number',
+    'provider_type': 'Provider Type',
+    'provider_name': 'Provider Name',
+    'address': 'Provider Address 1',
+    'city': 'Provider City',
+    'zip': 'Provider Zip Code',
+    'phone': 'Provider Phone Number',
+    'email': 'Provider Email Address',
+    'ages_served': 'Ages Served',
+    'capacity': 'Licensed Capacity'
+}
+
+# Rows per page in the DCF PDF, for the synthetic source fields
+ROWS_PER_PAGE = 40
+
+def load_rows(csv_path: str) -> List[Dict[str, Any]]:
+    """CSV rows as the extractor would yield them"""
+    frame = pd.read_csv(csv_path, dtype=str, keep_default_na=False).rename(columns=CSV_COLUMNS)
+    rows = frame.to_dict('records')
+    for i, row in enumerate(rows):
+        row['_source_page'] = i // ROWS_PER_PAGE + 1
+        row['_source_row'] = i % ROWS_PER_PAGE
+    return rows
+
+def normalize_row_wise(rows: List[Dict[str, Any]]) -> list:
+    """The per-row path run_import.py used to take"""
+    results = []
+    for row in rows:
+        try:
+            normalized = normalize_provider_data(row)
+        except Exception as e:
+            results.append((None, [str(e)]))
+            continue
+        results.append((normalized, validate_provider_data(normalized)[1]))
+    return results
+
+def same_results(expected: list, actual: list) -> bool:
+    """Equal records and errors, with the same keys in the same order"""
+    if expected != actual:
+        return False
+    return all(a is None or list(a) == list(b) for (a, _), (b, _) in zip(expected, actual))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark row-wise vs columnar normalization')
+    parser.add_argument('csv', nargs='?', help=f'Provider CSV (default: newest {DEFAULT_CSV_PATTERN})')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per columnar batch')
+    args = parser.parse_args()
+
+    csv_path = args.csv or max(glob.glob(DEFAULT_CSV_PATTERN), default=None)
+    if not csv_path:
+        print(f"No CSV matching {DEFAULT_CSV_PATTERN}; run from the repository root or pass a path")
+        sys.exit(1)
+
+    rows = load_rows(csv_path)
+    print(f"{len(rows):,} rows from {csv_path}")
+
+    start = time.perf_counter()
+    expected = normalize_row_wise(rows)
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = []
+    for offset in range(0, len(rows), args.batch_size):
+        actual.extend(normalize_provider_batch(rows[offset:offset + args.batch_size]))
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{'path':>9} {'seconds':>8} {'rows/s':>9}")
+    print(f"{'row-wise':>9} {row_seconds:>8.2f} {len(rows) / row_seconds:>9,.0f}")
+    print(f"{'columnar':>9} {batch_seconds:>8.2f} {len(rows) / batch_seconds:>9,.0f}")
+    print(f"Speedup: {row_seconds / batch_seconds:.1f}x")
+
+    valid = sum(1 for normalized, errors in actual if normalized is not None and not errors)
+    print(f"Valid: {valid:,} of {len(rows):,}")
+
+    if not same_results(expected, actual):
+        print("MISMATCH: columnar output differs from row-wise output")
+        sys.exit(1)
+    print("Columnar output is identical to row-wise output")
+
+if __name__ == "__main__":
+    main()
@@ -4,98 +4,244 @@ Download NJ DCF Licensed Child Care Centers PDF
 """
 
 import os
+import re
 import requests
 from pathlib import Path
 import hashlib
 import time
-from typing import Optional
+from typing import Optional, Dict, Tuple
 
-def download_pdf(url: str, cache_dir: str = "data_ingest/cache", force_refresh: bool = False) -> str:
+from http_client import get_client
+
+# Bytes read from the response per write; override with DOWNLOAD_CHUNK_SIZE
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Attempts per download when the body is cut off mid-transfer; each retry
+# resumes from the bytes already on disk. Connection errors and 5xx/429
+# responses are retried by the shared client's urllib3 Retry, not here.
+MAX_ATTEMPTS = 5
+
+class TransferInterrupted(requests.RequestException):
+    """The response body ended early; the partial file can be resumed"""
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_meta(meta_path: Path) -> Dict[str, str]:
+    """
+    Read a download sidecar: ETag, Last-Modified, SHA-256 and size, one per line
+
+    Sidecars written before checksums were recorded only have the first two lines.
+    """
+    meta = {'etag': '', 'last_modified': '', 'sha256': '', 'size': ''}
+    try:
+        with open(meta_path, 'r') as f:
+            for key in ['etag', 'last_modified', 'sha256', 'size']:
+                meta[key] = f.readline().strip()
+    except OSError:
+        pass
+    return meta
+
+def write_meta(meta_path: Path, etag: str, last_modified: str, sha256: str = '', size: Optional[int] = None):
+    """Write a download sidecar atomically"""
+    tmp_path = meta_path.with_name(meta_path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(f"{etag}\n")
+        f.write(f"{last_modified}\n")
+        f.write(f"{sha256}\n")
+        f.write(f"{'' if size is None else size}\n")
+    os.replace(tmp_path, meta_path)
+
+def is_cached_copy_valid(pdf_path: Path, meta: Dict[str, str]) -> bool:
+    """Check a cached PDF against the size and SHA-256 recorded when it was downloaded"""
+    if not pdf_path.exists():
+        return False
+    if meta['size'] and os.path.getsize(pdf_path) != int(meta['size']):
+        return False
+    if meta['sha256'] and file_sha256(pdf_path) != meta['sha256']:
+        return False
+    return True
+
+def _expected_size(response: requests.Response, offset: int) -> Optional[int]:
+    """Full file size from Content-Range (206) or Content-Length (200)"""
+    if response.status_code == 206:
+        match = re.match(r'bytes \d+-\d+/(\d+)', response.headers.get('Content-Range', ''))
+        return int(match.group(1)) if match else None
+
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+def _fetch_to_part(url: str, part_path: Path, part_meta_path: Path, headers: Dict[str, str],
+                   chunk_size: int) -> Tuple[Optional[requests.Response], Dict[str, str]]:
+    """
+    Fetch url into part_path, resuming from its current size when possible
+
+    Returns:
+        (response, validators) where response is None for 304 Not Modified
+    """
+    part_meta = read_meta(part_meta_path)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+
+    request_headers = dict(headers)
+    if offset:
+        # If-Range makes the server send the whole file if it changed since the partial transfer
+        validator = part_meta['etag'] or part_meta['last_modified']
+        if validator:
+            request_headers['Range'] = f"bytes={offset}-"
+            request_headers['If-Range'] = validator
+            request_headers.pop('If-None-Match', None)
+            request_headers.pop('If-Modified-Since', None)
+        else:
+            offset = 0
+
+    client = get_client()
+    response = client.get(url, headers=request_headers, stream=True, timeout=60)
+
+    # Always release the pooled connection, including when the body is cut off
+    try:
+        if response.status_code == 304:
+            return None, part_meta
+
+        if response.status_code == 416:
+            # Stale or oversized partial file; start over
+            part_path.unlink(missing_ok=True)
+            raise TransferInterrupted("Requested range not satisfiable, restarting download")
+
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            print(f"Resuming download at byte {offset:,}")
+        else:
+            offset = 0
+
+        validators = {
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', '')
+        }
+        write_meta(part_meta_path, validators['etag'], validators['last_modified'])
+
+        expected_size = _expected_size(response, offset)
+
+        try:
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                for chunk in client.iter_content(response, chunk_size):
+                    f.write(chunk)
+        except requests.RequestException as e:
+            raise TransferInterrupted(f"Transfer interrupted: {e}") from e
+    finally:
+        response.close()
+
+    received = part_path.stat().st_size
+    if expected_size is not None and received != expected_size:
+        if received > expected_size:
+            part_path.unlink(missing_ok=True)
+        raise TransferInterrupted(f"Incomplete download: got {received:,} of {expected_size:,} bytes")
+
+    validators['size'] = received
+    return response, validators
+
+def download_pdf(url: str, cache_dir: str = "data_ingest/cache", force_refresh: bool = False,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_attempts: int = MAX_ATTEMPTS) -> str:
     """
     Download PDF with caching based on ETag/Last-Modified headers
-    
+
+    The transfer goes to a .part file that is resumed with HTTP Range requests
+    after a failure, checked against the advertised size, hashed, and only then
+    renamed over the cached PDF. The SHA-256 is kept in the .meta sidecar so a
+    damaged cached copy is never reused.
+
     Args:
         url: PDF URL to download
         cache_dir: Directory to cache downloaded file
         force_refresh: Force re-download even if cached
-    
+        chunk_size: Bytes read from the response per write
+        max_attempts: Resume attempts after an interrupted transfer before giving up
+
     Returns:
         Path to downloaded PDF file
     """
     cache_path = Path(cache_dir)
     cache_path.mkdir(parents=True, exist_ok=True)
-    
+
     # Generate filename from URL hash
     url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
     pdf_filename = f"nj_dcf_{url_hash}.pdf"
     pdf_path = cache_path / pdf_filename
-    
+
     # Metadata file to store headers for caching
     meta_path = cache_path / f"{pdf_filename}.meta"
-    
-    headers = {
-        'User-Agent': 'HappiKid-Data-Import/1.0 (data@happikid.com)'
-    }
-    
-    # Check if we have cached version with metadata
-    if pdf_path.exists() and meta_path.exists() and not force_refresh:
-        try:
-            with open(meta_path, 'r') as f:
-                cached_etag = f.readline().strip()
-                cached_last_modified = f.readline().strip()
-            
-            # Add conditional headers
-            if cached_etag:
-                headers['If-None-Match'] = cached_etag
-            if cached_last_modified:
-                headers['If-Modified-Since'] = cached_last_modified
-                
-        except Exception:
-            # If meta file is corrupted, proceed without conditional headers
-            pass
-    
+
+    # In-progress transfer and the validators of the response it came from
+    part_path = cache_path / f"{pdf_filename}.part"
+    part_meta_path = cache_path / f"{pdf_filename}.part.meta"
+
+    # User-Agent comes from the shared client
+    headers = {}
+
+    meta = read_meta(meta_path)
+    cached_valid = is_cached_copy_valid(pdf_path, meta)
+    if pdf_path.exists() and not cached_valid:
+        print(f"Cached PDF does not match its recorded size/checksum, re-downloading: {pdf_path}")
+
+    # Only ask for a 304 if the cached copy is intact
+    if cached_valid and not force_refresh:
+        if meta['etag']:
+            headers['If-None-Match'] = meta['etag']
+        if meta['last_modified']:
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    if force_refresh:
+        part_path.unlink(missing_ok=True)
+
     print(f"Downloading PDF from: {url}")
-    
-    try:
-        response = requests.get(url, headers=headers, stream=True, timeout=60)
-        
-        # If 304 Not Modified, use cached version
-        if response.status_code == 304:
-            print(f"Using cached PDF: {pdf_path}")
+
+    last_error = None
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response, validators = _fetch_to_part(url, part_path, part_meta_path, headers, chunk_size)
+
+            # If 304 Not Modified, use cached version
+            if response is None:
+                print(f"Using cached PDF: {pdf_path}")
+                return str(pdf_path)
+
+            sha256 = file_sha256(part_path)
+
+            # Rename into place, then record the checksum of what is now cached
+            print(f"Saving PDF to: {pdf_path}")
+            os.replace(part_path, pdf_path)
+            write_meta(meta_path, validators['etag'], validators['last_modified'], sha256, validators['size'])
+            part_meta_path.unlink(missing_ok=True)
+
+            print(f"Successfully downloaded PDF ({validators['size']} bytes, sha256 {sha256[:12]})")
             return str(pdf_path)
-        
-        # Check for successful response
-        response.raise_for_status()
-        
-        # Download and save PDF
-        print(f"Saving PDF to: {pdf_path}")
-        with open(pdf_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        # Save metadata for future caching
-        etag = response.headers.get('ETag', '')
-        last_modified = response.headers.get('Last-Modified', '')
-        
-        with open(meta_path, 'w') as f:
-            f.write(f"{etag}\n")
-            f.write(f"{last_modified}\n")
-        
-        print(f"Successfully downloaded PDF ({os.path.getsize(pdf_path)} bytes)")
+
+        except TransferInterrupted as e:
+            last_error = e
+            print(f"Error downloading PDF (attempt {attempt}/{max_attempts}): {e}")
+            if attempt < max_attempts:
+                time.sleep(min(2 ** attempt, 30))
+
+        except requests.RequestException as e:
+            # Already retried by the shared client; don't stack a second layer on top
+            last_error = e
+            print(f"Error downloading PDF: {e}")
+            break
+
+    # Fall back to cached version if available
+    if cached_valid:
+        print(f"Using existing cached PDF: {pdf_path}")
         return str(pdf_path)
-        
-    except requests.RequestException as e:
-        print(f"Error downloading PDF: {e}")
-        
-        # Fall back to cached version if available
-        if pdf_path.exists():
-            print(f"Using existing cached PDF: {pdf_path}")
-            return str(pdf_path)
-        
-        raise Exception(f"Failed to download PDF and no cached version available: {e}")
+
+    raise Exception(f"Failed to download PDF and no cached version available: {last_error}")
 
 if __name__ == "__main__":
     import sys
     url = sys.argv[1] if len(sys.argv) > 1 else "https://www.nj.gov/dcf/about/divisions/ol/NJDCF-Licensed-Child-Care-Centers.pdf"
     pdf_path = download_pdf(url)
-    print(f"PDF available at: {pdf_path}")
\ No newline at end of file
+    print(f"PDF available at: {pdf_path}")
@@ -4,11 +4,19 @@ Download Manhattan childcare providers from NYC Open Data API
 Focus on downtown Manhattan zip codes
 """
 
+import os
+import math
+import argparse
 import requests
 import json
+import tempfile
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Union
+
+from http_client import get_client
 
 # Downtown Manhattan zip codes (Lower Manhattan, Tribeca, SoHo, East Village, West Village, etc.)
 DOWNTOWN_MANHATTAN_ZIPS = [
@@ -24,13 +32,132 @@ DOWNTOWN_MANHATTAN_ZIPS = [
 # NYC Open Data API endpoint - DOHMH Childcare Center Inspections (has full addresses)
 API_ENDPOINT = "https://data.cityofnewyork.us/resource/dsg6-ifza.json"
 
-def download_manhattan_providers(zip_codes: List[str] = None, limit: int = 10000) -> List[Dict[str, Any]]:
+# Columns normalize_nyc.py reads; everything else is left on the server
+NYC_COLUMNS = [
+    'centername', 'building', 'street', 'zipcode', 'phone', 'url', 'agerange',
+    'childcaretype', 'permitnumber', 'dc_id', 'maximumcapacity'
+]
+
+# Per-inspection columns kept for the inspection history table
+INSPECTION_COLUMNS = [
+    'inspectiondate', 'inspectionsummaryresult', 'violationcategory', 'healthcodesubsection', 'violationstatus'
+]
+
+# Socrata system field with each row's last update time; kept so the next
+# incremental run can ask only for rows changed since this one
+UPDATED_AT_COLUMN = ':updated_at'
+
+SELECT_COLUMNS = NYC_COLUMNS + INSPECTION_COLUMNS + [UPDATED_AT_COLUMN]
+
+# Rows per request; Socrata serves up to 50,000 but smaller pages keep each response quick
+PAGE_SIZE = 5000
+
+# Permits looked up per history query, keeping each $where short enough for a URL
+HISTORY_BATCH_SIZE = 200
+
+# Pages fetched at once by the sharded download; the shared HTTP client also
+# caps concurrent requests per host
+FETCH_WORKERS = 4
+
+# Written last into a shard directory; shards without it are an unfinished download
+SHARD_MANIFEST = 'manifest.json'
+
+def socrata_headers(app_token: Optional[str] = None) -> Dict[str, str]:
+    """
+    Request headers carrying a Socrata app token, from app_token or SOCRATA_APP_TOKEN
+
+    Requests with a token get a much higher rate limit than anonymous ones.
+    """
+    token = app_token or os.getenv('SOCRATA_APP_TOKEN')
+    return {'X-App-Token': token} if token else {}
+
+def build_where(zip_codes: Optional[List[str]], since: Optional[str] = None,
+                borough: Optional[str] = 'MANHATTAN', until: Optional[str] = None) -> str:
+    """
+    SoQL filter for provider rows; an empty zip list or no borough leaves that filter out
+
+    With since, only rows updated after that :updated_at timestamp match; with
+    until, only rows updated at or before it.
+    """
+    clauses = []
+    if borough:
+        clauses.append(f"borough='{borough}'")
+    if zip_codes:
+        clauses.append(f"zipcode in ({', '.join(repr(str(z)) for z in zip_codes)})")
+    if since:
+        clauses.append(f"{UPDATED_AT_COLUMN} > '{since}'")
+    if until:
+        clauses.append(f"{UPDATED_AT_COLUMN} <= '{until}'")
+    return ' AND '.join(clauses)
+
+def build_query(where: str, page_size: int, offset: int) -> Dict[str, Any]:
+    """
+    SoQL parameters for one page of the rows matching where
+
+    The filter and column list are pushed down to the server, and rows are
+    ordered by the row id so consecutive offsets never skip or repeat a row.
+    """
+    return {
+        "$select": ', '.join(SELECT_COLUMNS),
+        "$where": where,
+        "$order": ":id",
+        "$limit": page_size,
+        "$offset": offset
+    }
+
+def iter_provider_pages(zip_codes: List[str] = None, limit: Optional[int] = None,
+                        page_size: int = PAGE_SIZE, endpoint: str = API_ENDPOINT,
+                        since: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of downtown Manhattan provider rows as they arrive
+
+    Args:
+        zip_codes: List of zip codes to filter by (default: all downtown Manhattan)
+        limit: Maximum number of records to fetch (default: all)
+        page_size: Rows requested per page
+        endpoint: Socrata resource URL
+        since: Only fetch rows updated after this :updated_at watermark
+
+    Raises:
+        requests.exceptions.RequestException: If a page cannot be fetched
+    """
+    if zip_codes is None:
+        zip_codes = DOWNTOWN_MANHATTAN_ZIPS
+    
+    yield from iter_where_pages(build_where(zip_codes, since), limit, page_size, endpoint)
+
+def iter_where_pages(where: str, limit: Optional[int] = None, page_size: int = PAGE_SIZE,
+                     endpoint: str = API_ENDPOINT) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of the rows matching a SoQL filter as they arrive
+
+    Raises:
+        requests.exceptions.RequestException: If a page cannot be fetched
+    """
+    offset = 0
+    while limit is None or offset < limit:
+        size = page_size if limit is None else min(page_size, limit - offset)
+        response = get_client().get(endpoint, params=build_query(where, size, offset),
+                                    headers=socrata_headers(), timeout=30)
+        response.raise_for_status()
+        
+        page = response.json()
+        if page:
+            yield page
+        if len(page) < size:
+            return
+        offset += len(page)
+
+def download_manhattan_providers(zip_codes: List[str] = None, limit: Optional[int] = None,
+                                 page_size: int = PAGE_SIZE, endpoint: str = API_ENDPOINT) -> List[Dict[str, Any]]:
     """
     Download childcare providers from NYC Open Data API
     
     Args:
         zip_codes: List of zip codes to filter by (default: all downtown Manhattan)
-        limit: Maximum number of records to fetch
+        limit: Maximum number of records to fetch (default: all)
+        page_size: Rows requested per page
+        endpoint: Socrata resource URL
         
     Returns:
         List of provider dictionaries
@@ -38,38 +165,298 @@ def download_manhattan_providers(zip_codes: List[str] = None, limit: int = 10000
     if zip_codes is None:
         zip_codes = DOWNTOWN_MANHATTAN_ZIPS
     
+    print(f"Downloading childcare providers for {len(zip_codes)} Manhattan zip codes...")
+    print(f"Fetching from NYC Open Data API: {endpoint}")
+    
     all_providers = []
+    try:
+        for page in iter_provider_pages(zip_codes, limit, page_size, endpoint):
+            all_providers.extend(page)
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading data: {e}")
+        return []
+    
+    print(f"Retrieved {len(all_providers)} downtown Manhattan providers")
+    return all_providers
+
+def download_manhattan_providers_to_json(output_path: str, zip_codes: List[str] = None,
+                                         limit: Optional[int] = None, page_size: int = PAGE_SIZE,
+                                         endpoint: str = API_ENDPOINT, since: Optional[str] = None) -> Optional[int]:
+    """
+    Download childcare providers straight into a JSON file, one page at a time
+    
+    Only one page is held in memory. Pages go to a temporary file that replaces
+    output_path once the last page has arrived, so a failed download never
+    leaves a partial snapshot behind. With since, only rows updated after
+    that :updated_at watermark are downloaded.
+    
+    Returns:
+        Number of providers written, or None if the download failed
+    """
+    if zip_codes is None:
+        zip_codes = DOWNTOWN_MANHATTAN_ZIPS
+    
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
     
     print(f"Downloading childcare providers for {len(zip_codes)} Manhattan zip codes...")
+    print(f"Fetching from NYC Open Data API: {endpoint}")
+    if since:
+        print(f"Only rows updated after {since}")
     
-    # Build query - filter by borough and zip codes
-    params = {
-        "$limit": limit,
-        "$where": f"borough='MANHATTAN'"
-    }
+    try:
+        count = _write_json_pages(iter_provider_pages(zip_codes, limit, page_size, endpoint, since), output_file)
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading data: {e}")
+        return None
     
+    print(f"Saved {count} downtown Manhattan providers to {output_file}")
+    return count
+
+def _write_json_pages(pages: Iterator[List[Dict[str, Any]]], output_file: Path) -> int:
+    """Write pages of rows as one JSON array, replacing output_file only once every page is in"""
+    count = 0
+    fd, tmp_path = tempfile.mkstemp(dir=output_file.parent, suffix='.tmp')
     try:
-        print(f"Fetching from NYC Open Data API: {API_ENDPOINT}")
-        response = requests.get(API_ENDPOINT, params=params, timeout=30)
-        response.raise_for_status()
-        
-        providers = response.json()
-        print(f"Retrieved {len(providers)} total Manhattan providers")
-        
-        # Filter to downtown zip codes
-        filtered_providers = [
-            p for p in providers 
-            if p.get('zipcode', '').strip() in zip_codes
-        ]
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for page in pages:
+                for row in page:
+                    f.write(',\n' if count else '\n')
+                    json.dump(row, f, ensure_ascii=False)
+                    count += 1
+                print(f"  {count} rows so far")
+            f.write('\n]\n')
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+def download_permit_histories(delta_rows: List[Dict[str, Any]], output_path: str, zip_codes: List[str] = None,
+                              page_size: int = PAGE_SIZE, endpoint: str = API_ENDPOINT,
+                              batch_size: int = HISTORY_BATCH_SIZE) -> Optional[int]:
+    """
+    Download every row of the permits in an incremental download into a JSON file
+    
+    The delta only holds the rows that changed. Collapsed on their own, a
+    corrected older inspection would stand in for the permit's latest one and
+    overwrite newer provider details. Each permit in delta_rows is fetched
+    whole instead: by permit number, or by DC ID for rows without one, as
+    normalize_nyc.permit_key groups them. Rows are only taken up to the
+    delta's newest :updated_at, so anything changed since waits for the next
+    run. Delta rows with neither key cannot be looked up and are kept as they
+    are.
+    
+    Returns:
+        Number of rows written, or None if the download failed
+    """
+    if zip_codes is None:
+        zip_codes = DOWNTOWN_MANHATTAN_ZIPS
+    
+    until = max((r[UPDATED_AT_COLUMN] for r in delta_rows if r.get(UPDATED_AT_COLUMN)), default=None)
+    permits = sorted({r['permitnumber'] for r in delta_rows if r.get('permitnumber')})
+    dc_ids = sorted({r['dc_id'] for r in delta_rows if not r.get('permitnumber') and r.get('dc_id')})
+    unkeyed = [r for r in delta_rows if not r.get('permitnumber') and not r.get('dc_id')]
+    
+    print(f"Fetching the full history of {len(permits) + len(dc_ids)} changed permits")
+    
+    def pages():
+        for column, keys in (('permitnumber', permits), ('dc_id', dc_ids)):
+            for start in range(0, len(keys), batch_size):
+                batch = ', '.join(repr(str(k)) for k in keys[start:start + batch_size])
+                where = f"{build_where(zip_codes, until=until)} AND {column} in ({batch})"
+                for page in iter_where_pages(where, None, page_size, endpoint):
+                    # A DC ID only keys the rows that have no permit number
+                    yield page if column == 'permitnumber' else [r for r in page if not r.get('permitnumber')]
+        if unkeyed:
+            yield unkeyed
+    
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        count = _write_json_pages(pages(), output_file)
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading permit histories: {e}")
+        return None
+    
+    print(f"Saved {count} rows of {len(delta_rows)} changed rows' permits to {output_file}")
+    return count
+
+def count_rows(endpoint: str, where: str, headers: Dict[str, str]) -> int:
+    """Number of rows matching a SoQL filter"""
+    params = {"$select": "count(*) AS row_count"}
+    if where:
+        params["$where"] = where
+    response = get_client().get(endpoint, params=params, headers=headers, timeout=30)
+    response.raise_for_status()
+    rows = response.json()
+    return int(next(iter(rows[0].values()))) if rows else 0
+
+def _write_shard(path: Path, rows: List[Dict[str, Any]]):
+    """Write rows as NDJSON, atomically"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False))
+                f.write('\n')
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _fetch_shard(endpoint: str, params: Dict[str, Any], headers: Dict[str, str], path: Path) -> int:
+    """Fetch one page into a shard file; returns its row count, writing no file for an empty page"""
+    response = get_client().get(endpoint, params=params, headers=headers, timeout=60)
+    response.raise_for_status()
+    rows = response.json()
+    if rows:
+        _write_shard(path, rows)
+    return len(rows)
+
+def fetch_shards(endpoint: str, select: List[str], where: str, shard_dir: str, page_size: int = PAGE_SIZE,
+                 workers: int = FETCH_WORKERS, app_token: Optional[str] = None, order: str = ':id') -> Optional[int]:
+    """
+    Fetch a Socrata query into numbered NDJSON shards, several pages at a time
+    
+    The matching rows are counted first and split into pages of page_size by
+    $offset under a stable $order, which a bounded pool of workers fetches
+    concurrently. Page N is written to part-0000N.ndjson as soon as it
+    arrives. Rows added after the count spill past the planned pages and are
+    fetched until a short page comes back. The manifest is written last and
+    lists the shards in order, so each can be handed to a separate consumer.
+    
+    Args:
+        endpoint: Socrata resource URL
+        select: Columns to fetch
+        where: SoQL filter ('' for every row)
+        shard_dir: Directory for the shards; shards of an earlier download are removed
+        page_size: Rows per page and shard
+        workers: Pages fetched at once
+        app_token: Socrata app token (default: SOCRATA_APP_TOKEN)
+        order: Stable ordering to page by
+    
+    Returns:
+        Number of rows written, or None if the download failed
+    """
+    shard_path = Path(shard_dir)
+    shard_path.mkdir(parents=True, exist_ok=True)
+    for stale in [shard_path / SHARD_MANIFEST] + sorted(shard_path.glob('part-*.ndjson')):
+        stale.unlink(missing_ok=True)
+    
+    headers = socrata_headers(app_token)
+    base_params = {"$select": ', '.join(select), "$order": order}
+    if where:
+        base_params["$where"] = where
+    
+    def page_params(page):
+        return {**base_params, "$limit": page_size, "$offset": page * page_size}
+    
+    def page_file(page):
+        return shard_path / f"part-{page:05d}.ndjson"
+    
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        total = count_rows(endpoint, where, headers)
+        pages = max(1, math.ceil(total / page_size))
+        print(f"{total:,} rows in {pages} pages of {page_size:,}, {workers} workers")
         
-        print(f"Filtered to {len(filtered_providers)} downtown Manhattan providers")
-        all_providers.extend(filtered_providers)
+        page_rows = {}
+        futures = {pool.submit(_fetch_shard, endpoint, page_params(page), headers, page_file(page)): page
+                   for page in range(pages)}
+        for future in as_completed(futures):
+            page_rows[futures[future]] = future.result()
+            if len(page_rows) % 10 == 0 or len(page_rows) == pages:
+                print(f"  {len(page_rows)}/{pages} pages, {sum(page_rows.values()):,} rows so far")
         
+        # Rows added since the count
+        page = pages
+        while page_rows[page - 1] == page_size:
+            page_rows[page] = _fetch_shard(endpoint, page_params(page), headers, page_file(page))
+            page += 1
     except requests.exceptions.RequestException as e:
         print(f"Error downloading data: {e}")
-        return []
+        return None
+    finally:
+        pool.shutdown(cancel_futures=True)
     
-    return all_providers
+    shards = [{'file': page_file(page).name, 'rows': rows} for page, rows in sorted(page_rows.items()) if rows]
+    manifest = {
+        'endpoint': endpoint,
+        'where': where,
+        'rows': sum(shard['rows'] for shard in shards),
+        'shards': shards,
+        'completed_at': datetime.now().isoformat()
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=shard_path, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, shard_path / SHARD_MANIFEST)
+    
+    return manifest['rows']
+
+def download_providers_to_shards(shard_dir: str, zip_codes: List[str] = None, borough: Optional[str] = 'MANHATTAN',
+                                 page_size: int = PAGE_SIZE, workers: int = FETCH_WORKERS,
+                                 endpoint: str = API_ENDPOINT, since: Optional[str] = None,
+                                 app_token: Optional[str] = None) -> Optional[int]:
+    """
+    Download childcare providers into NDJSON shards with parallel page fetches
+    
+    Args:
+        shard_dir: Directory for the shards and their manifest
+        zip_codes: List of zip codes to filter by (default: all downtown Manhattan; [] for every zip)
+        borough: Borough to filter by (None for all five)
+        page_size: Rows per page and shard
+        workers: Pages fetched at once
+        endpoint: Socrata resource URL
+        since: Only fetch rows updated after this :updated_at watermark
+        app_token: Socrata app token (default: SOCRATA_APP_TOKEN)
+        
+    Returns:
+        Number of providers written, or None if the download failed
+    """
+    if zip_codes is None:
+        zip_codes = DOWNTOWN_MANHATTAN_ZIPS
+    
+    print(f"Downloading childcare providers ({borough or 'all boroughs'}, "
+          f"{len(zip_codes) if zip_codes else 'all'} zip codes) into {shard_dir}")
+    print(f"Fetching from NYC Open Data API: {endpoint}")
+    if since:
+        print(f"Only rows updated after {since}")
+    
+    count = fetch_shards(endpoint, SELECT_COLUMNS, build_where(zip_codes, since, borough), shard_dir,
+                         page_size, workers, app_token)
+    if count is not None:
+        print(f"Saved {count} providers to {shard_dir}")
+    return count
+
+def shard_paths(shard_dir: str) -> List[Path]:
+    """
+    Shard files of a finished sharded download, in page order
+    
+    Raises:
+        FileNotFoundError: If the directory has no manifest (the download did not finish)
+    """
+    shard_path = Path(shard_dir)
+    with open(shard_path / SHARD_MANIFEST, 'r') as f:
+        manifest = json.load(f)
+    return [shard_path / shard['file'] for shard in manifest['shards']]
+
+def read_shard(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Rows of one NDJSON shard"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def load_raw_providers(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Raw provider rows from a JSON snapshot or a shard directory"""
+    if Path(path).is_dir():
+        rows = []
+        for shard in shard_paths(path):
+            rows.extend(read_shard(shard))
+        return rows
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 def save_providers_to_json(providers: List[Dict[str, Any]], output_path: str):
     """Save providers to JSON file"""
@@ -97,20 +484,39 @@ def save_providers_to_csv(providers: List[Dict[str, Any]], output_path: str):
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description='Download NYC childcare providers from NYC Open Data')
+    parser.add_argument('--endpoint', default=API_ENDPOINT,
+                        help='Socrata resource URL (e.g. a local synthetic_socrata.py server)')
+    parser.add_argument('--shard-dir', help='Download into NDJSON shards here, fetching pages in parallel')
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS, help='Pages fetched at once with --shard-dir')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Rows per page')
+    parser.add_argument('--all-boroughs', action='store_true',
+                        help='Every zip code in all five boroughs, not just downtown Manhattan (with --shard-dir)')
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("NYC Manhattan Childcare Provider Downloader")
     print("=" * 80)
     
     # Download providers
-    providers = download_manhattan_providers()
+    if args.shard_dir:
+        zip_codes, borough = ([], None) if args.all_boroughs else (None, 'MANHATTAN')
+        if download_providers_to_shards(args.shard_dir, zip_codes, borough, args.page_size, args.workers,
+                                        args.endpoint) is None:
+            print("No providers downloaded. Exiting.")
+            return
+        providers = load_raw_providers(args.shard_dir)
+    else:
+        providers = download_manhattan_providers(page_size=args.page_size, endpoint=args.endpoint)
     
     if not providers:
         print("No providers downloaded. Exiting.")
         return
     
     # Save to both JSON and CSV
-    save_providers_to_json(providers, "data_ingest/output/nyc_manhattan_raw.json")
-    save_providers_to_csv(providers, "data_ingest/output/nyc_manhattan_raw.csv")
+    if not args.shard_dir:
+        save_providers_to_json(providers, "data_ingest/output/nyc_manhattan_raw.json")
+        save_providers_to_csv(providers, "data_ingest/output/nyc_manhattan_raw.csv")
     
     # Print summary statistics
     print("\n" + "=" * 80)
@@ -3,12 +3,22 @@
 Extract provider data from NJ DCF Licensed Child Care Centers PDF
 """
 
-import pdfplumber
 import pandas as pd
 import re
-from typing import List, Dict, Any, Optional
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from pathlib import Path
 
+from layout_profile import is_acceptable_table, full_search_tables, get_layout_profile, open_pdf_fingerprint
+from page_cache import PageCache, PAGE_CACHE_DIR, page_content_hash, page_cache_key
+from pdf_source import PdfSource, open_pdf, describe_source
+from word_columns import learn_column_layout_from_pdf, extract_table_from_words
+
+# Extraction engines: pdfplumber's table finder, or word coordinates bucketed into learned columns
+ENGINES = ['tables', 'words']
+
 # Expected column headers from the PDF
 EXPECTED_HEADERS = [
     "County",
@@ -24,6 +34,9 @@ EXPECTED_HEADERS = [
     "Licensed Capacity"
 ]
 
+# Upper bound on pages per worker task, keeps in-flight results small on huge PDFs
+MAX_PAGES_PER_RANGE = 16
+
 def normalize_header(header: str) -> str:
     """Normalize header text for matching"""
     if not header:
@@ -119,27 +132,29 @@ def map_headers_to_standard(headers: List[str]) -> Dict[int, str]:
     
     return mapping
 
-def extract_tables_from_page(page) -> List[List[str]]:
-    """Extract tables from a single PDF page"""
+def extract_tables_from_page(page, profile: Optional[Dict[str, Any]] = None) -> List[List[str]]:
+    """
+    Extract tables from a single PDF page
+    
+    Args:
+        page: pdfplumber page object
+        profile: Learned layout profile (see layout_profile.py). Its strategy is
+                 tried first; the full strategy search only runs if it fails.
+    """
     tables = []
     
     try:
-        # Try different extraction strategies
-        strategies = [
-            {"vertical_strategy": "lines", "horizontal_strategy": "lines", "snap_tolerance": 3},
-            {"vertical_strategy": "lines", "horizontal_strategy": "text", "snap_tolerance": 5},
-            {"vertical_strategy": "text", "horizontal_strategy": "lines", "snap_tolerance": 5},
-            {"vertical_strategy": "text", "horizontal_strategy": "text", "snap_tolerance": 3}
-        ]
-        
-        for strategy in strategies:
+        if profile:
             try:
-                page_tables = page.extract_tables(strategy)
-                if page_tables and len(page_tables[0]) > 5:  # Must have reasonable number of columns
-                    tables.extend(page_tables)
-                    break
+                page_tables = page.extract_tables(profile['strategy'])
+                if is_acceptable_table(page_tables, profile.get('expected_columns')):
+                    return page_tables
             except Exception:
-                continue
+                pass
+            print(f"Layout profile strategy failed on page {page.page_number}, falling back to full search")
+        
+        # Try different extraction strategies
+        tables = full_search_tables(page)
         
         # If no tables found, try extracting text and parsing manually
         if not tables:
@@ -173,88 +188,299 @@ def clean_cell_value(value: Any) -> str:
     
     return cleaned.strip()
 
-def extract_providers_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
+def extract_rows_from_page(page, page_num: int,
+                           header_mapping: Optional[Dict[int, str]],
+                           profile: Optional[Dict[str, Any]] = None,
+                           column_layout: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[int, str]], List[Dict[str, Any]]]:
     """
-    Extract provider data from the PDF file
+    Extract provider rows from a single PDF page
     
     Args:
-        pdf_path: Path to the PDF file
+        page: pdfplumber page object
+        page_num: Zero-based page index (used for _source_page)
+        header_mapping: Column mapping learned so far, or None if no header page has been seen
+        profile: Optional layout profile passed through to extract_tables_from_page
+        column_layout: Learned word-column layout; when given, the word-coordinate
+                       engine is used instead of pdfplumber's table finder
         
     Returns:
-        List of provider dictionaries
+        Tuple of (header mapping after this page, list of provider dictionaries)
     """
     providers = []
     
-    print(f"Extracting data from PDF: {pdf_path}")
+    if column_layout is not None:
+        tables = [extract_table_from_words(page, column_layout)]
+    else:
+        tables = extract_tables_from_page(page, profile)
     
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            print(f"PDF has {len(pdf.pages)} pages")
+    for table in tables:
+        if not table or len(table) < 2:  # Need header + at least one data row
+            continue
+        
+        # First row is usually headers
+        raw_headers = table[0]
+        
+        # Skip if this doesn't look like a header row
+        header_text = ' '.join([str(h) for h in raw_headers if h]).lower()
+        if not any(keyword in header_text for keyword in ['county', 'license', 'provider', 'name', 'address']):
+            continue
+        
+        # Map headers if not already done
+        if header_mapping is None:
+            header_mapping = map_headers_to_standard([clean_cell_value(h) for h in raw_headers])
+            print(f"Mapped headers: {header_mapping}")
+            
+            # Verify we have essential columns
+            required_headers = ['Provider Name', 'Provider Address 1', 'Provider City']
+            mapped_headers = set(header_mapping.values())
+            missing_required = [h for h in required_headers if h not in mapped_headers]
+            
+            if missing_required:
+                print(f"Warning: Missing required headers: {missing_required}")
+        
+        # Process data rows
+        for row_idx, row in enumerate(table[1:], 1):
+            if not row or len(row) == 0:
+                continue
+            
+            # Skip rows that appear to be headers (repeated)
+            row_text = ' '.join([str(cell) for cell in row if cell]).lower()
+            if any(keyword in row_text for keyword in ['county', 'license number', 'provider type']):
+                continue
+            
+            # Extract data using header mapping
+            provider_data = {}
+            
+            for col_idx, header in header_mapping.items():
+                # Skip internal fields that aren't actual data
+                if header.startswith('_row_number'):
+                    continue
+                    
+                if col_idx < len(row):
+                    provider_data[header] = clean_cell_value(row[col_idx])
+                else:
+                    provider_data[header] = ""
+            
+            # Skip rows with missing essential data
+            if not provider_data.get('Provider Name') or not provider_data.get('Provider City'):
+                continue
+            
+            # Add page reference for debugging
+            provider_data['_source_page'] = page_num + 1
+            provider_data['_source_row'] = row_idx
+            
+            providers.append(provider_data)
+    
+    return header_mapping, providers
+
+def extract_page(page, page_num: int, header_mapping: Optional[Dict[int, str]],
+                 profile: Optional[Dict[str, Any]] = None,
+                 page_cache: Optional[PageCache] = None,
+                 column_layout: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[int, str]], List[Dict[str, Any]]]:
+    """Extract one page, serving its rows from the page cache when its content is unchanged"""
+    if page_cache is None:
+        return extract_rows_from_page(page, page_num, header_mapping, profile, column_layout)
+    
+    key = page_cache_key(page_content_hash(page), header_mapping, column_layout,
+                         profile['strategy'] if profile else None)
+    cached = page_cache.get(key, page_num)
+    if cached is not None:
+        return cached
+    
+    header_mapping, page_rows = extract_rows_from_page(page, page_num, header_mapping, profile, column_layout)
+    page_cache.put(key, header_mapping, page_rows)
+    return header_mapping, page_rows
+
+def _extract_page_range(pdf_path: PdfSource, start: int, end: int,
+                        header_mapping: Dict[int, str],
+                        profile: Optional[Dict[str, Any]] = None,
+                        page_cache_dir: Optional[str] = None,
+                        column_layout: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Worker entry point: open the PDF independently and extract pages [start, end)
+    using a header mapping learned by the parent process
+    
+    Returns:
+        Tuple of (provider rows, page cache hits, page cache misses)
+    """
+    providers = []
+    page_cache = PageCache(page_cache_dir) if page_cache_dir else None
+    
+    with open_pdf(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        for page_num in range(start, end):
+            print(f"Processing page {page_num + 1}/{total_pages}")
+            page = pdf.pages[page_num]
+            _, page_rows = extract_page(page, page_num, header_mapping, profile, page_cache, column_layout)
+            page.close()
+            providers.extend(page_rows)
+    
+    if page_cache is None:
+        return providers, 0, 0
+    return providers, page_cache.hits, page_cache.misses
+
+def split_page_range(start: int, end: int, chunks: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into up to `chunks` contiguous, near-equal page ranges"""
+    total = end - start
+    if total <= 0:
+        return []
+    
+    chunks = max(1, min(chunks, total))
+    size, remainder = divmod(total, chunks)
+    
+    ranges = []
+    cursor = start
+    for i in range(chunks):
+        chunk_end = cursor + size + (1 if i < remainder else 0)
+        ranges.append((cursor, chunk_end))
+        cursor = chunk_end
+    
+    return ranges
+
+def parse_page_range(text: str) -> Tuple[int, int]:
+    """
+    Parse a 1-based, inclusive 'START-END' page range (or a single page)
+    
+    Returns:
+        Zero-based, end-exclusive (start, end) tuple
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*(?:-\s*(\d+)\s*)?', text)
+    if not match:
+        raise ValueError(f"Invalid page range '{text}', expected START-END")
+    
+    start = int(match.group(1))
+    end = int(match.group(2) or start)
+    if start < 1 or end < start:
+        raise ValueError(f"Invalid page range '{text}', pages are numbered from 1 and END must not precede START")
+    
+    return start - 1, end
+
+def iter_providers_from_pdf(pdf_path: PdfSource, workers: int = 1,
+                            use_layout_profile: bool = True,
+                            page_cache_dir: Optional[str] = PAGE_CACHE_DIR,
+                            engine: str = 'tables',
+                            page_range: Optional[Tuple[int, int]] = None,
+                            extraction_info: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream provider rows from the PDF file page by page
+    
+    Each page's cached layout objects are released as soon as its rows have been
+    produced, so memory stays flat regardless of the number of pages.
+    
+    Args:
+        pdf_path: Path to the PDF file, or its bytes
+        workers: Number of worker processes (1 = serial). Pages after the first
+                 header page are split across a process pool; output order is
+                 identical to the serial path.
+        use_layout_profile: Learn (or reuse) the fastest table strategy for this
+                            PDF's layout instead of searching every page
+        page_cache_dir: Directory of the per-page row cache; pages whose content
+                        hash is already cached are not re-parsed. None disables it.
+        engine: 'tables' for pdfplumber's table finder, 'words' for the
+                word-coordinate column engine (see word_columns.py)
+        page_range: Zero-based, end-exclusive (start, end) pages to extract;
+                    None extracts the whole document
+        extraction_info: Optional dictionary filled in with the header mapping
+                         learned from the pages extracted
+        
+    Yields:
+        Provider dictionaries in page order
+    """
+    print(f"Extracting data from PDF: {describe_source(pdf_path)}")
+    
+    page_cache = PageCache(page_cache_dir) if page_cache_dir else None
+    
+    with open_pdf(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        print(f"PDF has {total_pages} pages")
+        
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown extraction engine: {engine}")
+        
+        first_page, end_page = page_range or (0, total_pages)
+        if not 0 <= first_page < end_page <= total_pages:
+            raise ValueError(f"Page range {first_page + 1}-{end_page} is outside the PDF's {total_pages} pages")
+        
+        profile = None
+        column_layout = None
+        if engine == 'words':
+            column_layout = learn_column_layout_from_pdf(pdf)
+            if column_layout is None:
+                return
+        elif use_layout_profile:
+            profile = get_layout_profile(pdf)
+        
+        header_mapping = None
+        next_page = first_page
+        
+        # Walk pages serially until the header mapping is known. In serial
+        # mode this covers the whole document; in parallel mode the rest of
+        # the pages are handed to the pool below.
+        while next_page < end_page and (workers <= 1 or header_mapping is None):
+            print(f"Processing page {next_page + 1}/{total_pages}")
+            page = pdf.pages[next_page]
+            header_mapping, page_rows = extract_page(page, next_page, header_mapping, profile, page_cache, column_layout)
+            page.close()
+            next_page += 1
+            yield from page_rows
+    
+    if extraction_info is not None:
+        extraction_info['header_mapping'] = header_mapping
+    
+    if next_page < end_page:
+        # Over-split so slow pages don't leave workers idle; ranges stay
+        # contiguous and results are yielded in submission order. Only a
+        # bounded window of short ranges is in flight so rows don't pile up.
+        range_count = max(workers * 4, -(-(end_page - next_page) // MAX_PAGES_PER_RANGE))
+        page_ranges = split_page_range(next_page, end_page, range_count)
+        print(f"Extracting pages {next_page + 1}-{end_page} with {workers} workers "
+              f"({len(page_ranges)} page ranges)")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            remaining = iter(page_ranges)
             
-            header_mapping = None
+            def submit(page_range: Tuple[int, int]):
+                start, end = page_range
+                return executor.submit(_extract_page_range, pdf_path, start, end,
+                                       header_mapping, profile, page_cache_dir, column_layout)
             
-            for page_num, page in enumerate(pdf.pages):
-                print(f"Processing page {page_num + 1}/{len(pdf.pages)}")
+            pending = deque(submit(page_range) for page_range in itertools.islice(remaining, workers * 2))
+            
+            while pending:
+                range_rows, hits, misses = pending.popleft().result()
                 
-                tables = extract_tables_from_page(page)
+                next_range = next(remaining, None)
+                if next_range:
+                    pending.append(submit(next_range))
                 
-                for table in tables:
-                    if not table or len(table) < 2:  # Need header + at least one data row
-                        continue
-                    
-                    # First row is usually headers
-                    raw_headers = table[0]
-                    
-                    # Skip if this doesn't look like a header row
-                    header_text = ' '.join([str(h) for h in raw_headers if h]).lower()
-                    if not any(keyword in header_text for keyword in ['county', 'license', 'provider', 'name', 'address']):
-                        continue
-                    
-                    # Map headers if not already done
-                    if header_mapping is None:
-                        header_mapping = map_headers_to_standard([clean_cell_value(h) for h in raw_headers])
-                        print(f"Mapped headers: {header_mapping}")
-                        
-                        # Verify we have essential columns
-                        required_headers = ['Provider Name', 'Provider Address 1', 'Provider City']
-                        mapped_headers = set(header_mapping.values())
-                        missing_required = [h for h in required_headers if h not in mapped_headers]
-                        
-                        if missing_required:
-                            print(f"Warning: Missing required headers: {missing_required}")
-                    
-                    # Process data rows
-                    for row_idx, row in enumerate(table[1:], 1):
-                        if not row or len(row) == 0:
-                            continue
-                        
-                        # Skip rows that appear to be headers (repeated)
-                        row_text = ' '.join([str(cell) for cell in row if cell]).lower()
-                        if any(keyword in row_text for keyword in ['county', 'license number', 'provider type']):
-                            continue
-                        
-                        # Extract data using header mapping
-                        provider_data = {}
-                        
-                        for col_idx, header in header_mapping.items():
-                            # Skip internal fields that aren't actual data
-                            if header.startswith('_row_number'):
-                                continue
-                                
-                            if col_idx < len(row):
-                                provider_data[header] = clean_cell_value(row[col_idx])
-                            else:
-                                provider_data[header] = ""
-                        
-                        # Skip rows with missing essential data
-                        if not provider_data.get('Provider Name') or not provider_data.get('Provider City'):
-                            continue
-                        
-                        # Add page reference for debugging
-                        provider_data['_source_page'] = page_num + 1
-                        provider_data['_source_row'] = row_idx
-                        
-                        providers.append(provider_data)
+                if page_cache:
+                    page_cache.hits += hits
+                    page_cache.misses += misses
+                yield from range_rows
+    
+    if page_cache:
+        print(f"Page cache: {page_cache.hits} hits, {page_cache.misses} freshly extracted")
+
+def extract_providers_from_pdf(pdf_path: PdfSource, workers: int = 1,
+                               use_layout_profile: bool = True,
+                               page_cache_dir: Optional[str] = PAGE_CACHE_DIR,
+                               engine: str = 'tables') -> List[Dict[str, Any]]:
+    """
+    Extract provider data from the PDF file
+    
+    Args:
+        pdf_path: Path to the PDF file, or its bytes
+        workers: Number of worker processes (see iter_providers_from_pdf)
+        use_layout_profile: Use a learned table strategy for this PDF's layout
+        page_cache_dir: Directory of the per-page row cache, or None to disable it
+        engine: Extraction engine, 'tables' or 'words'
+        
+    Returns:
+        List of provider dictionaries
+    """
+    try:
+        providers = list(iter_providers_from_pdf(pdf_path, workers, use_layout_profile,
+                                                 page_cache_dir, engine))
         
         print(f"Extracted {len(providers)} provider records")
         
@@ -273,15 +499,51 @@ def extract_providers_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
         raise
 
 if __name__ == "__main__":
+    import argparse
     import sys
     
-    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "data_ingest/cache/nj_dcf.pdf"
+    parser = argparse.ArgumentParser(description='Extract providers from the NJ DCF Licensed Child Care Centers PDF')
+    parser.add_argument('pdf_path', nargs='?', default="data_ingest/cache/nj_dcf.pdf", help='Path to the PDF file')
+    parser.add_argument('--workers', type=int, default=1, help='Number of extraction processes (default: 1)')
+    parser.add_argument('--no-layout-profile', action='store_true', help='Search every table strategy on every page')
+    parser.add_argument('--no-page-cache', action='store_true', help='Re-extract every page even if its content is cached')
+    parser.add_argument('--engine', choices=ENGINES, default='tables', help='Extraction engine (default: tables)')
+    parser.add_argument('--pages', help='Extract only pages START-END (1-based, inclusive) and write a shard file')
+    parser.add_argument('--shard-output', help='Shard file path (default: data_ingest/cache/shards/<pdf hash>_pages_<range>.json)')
+    args = parser.parse_args()
+    
+    pdf_path = args.pdf_path
     
     if not Path(pdf_path).exists():
         print(f"PDF file not found: {pdf_path}")
         sys.exit(1)
     
-    providers = extract_providers_from_pdf(pdf_path)
+    if args.pages:
+        from shards import default_shard_path, write_shard
+        
+        try:
+            start, end = parse_page_range(args.pages)
+            info = {}
+            providers = list(iter_providers_from_pdf(pdf_path, workers=args.workers,
+                                                     use_layout_profile=not args.no_layout_profile,
+                                                     page_cache_dir=None if args.no_page_cache else PAGE_CACHE_DIR,
+                                                     engine=args.engine, page_range=(start, end),
+                                                     extraction_info=info))
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        
+        with open_pdf(pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+            pdf_hash = open_pdf_fingerprint(pdf)
+        write_shard(args.shard_output or default_shard_path(pdf_hash, start, end), pdf_path, total_pages,
+                    start, end, args.engine, info.get('header_mapping'), providers, pdf_hash)
+        sys.exit(0)
+    
+    providers = extract_providers_from_pdf(pdf_path, workers=args.workers,
+                                           use_layout_profile=not args.no_layout_profile,
+                                           page_cache_dir=None if args.no_page_cache else PAGE_CACHE_DIR,
+                                           engine=args.engine)
     print(f"Extracted {len(providers)} providers")
     
     # Save to CSV for inspection
@@ -3,7 +3,6 @@
 Geocode provider addresses using Nominatim or Google Maps API
 """
 
-import requests
 import time
 import json
 import os
@@ -11,6 +10,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from http_client import get_client
+
 class GeocodingService:
     def __init__(self, service: str = "nominatim", api_key: Optional[str] = None):
         self.service = service.lower()
@@ -87,7 +88,7 @@ class GeocodingService:
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = get_client().get(url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -126,7 +127,7 @@ class GeocodingService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = get_client().get(url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the ingest pipelines
+
+One pooled requests.Session per process with keep-alive connection pools and a
+concurrency limit per host, consistent timeouts and User-Agent, and retries with
+exponential backoff. Every request is counted so a run can report request
+volume, bytes, latency and how often connections were reused.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_USER_AGENT = os.getenv('USER_AGENT', 'HappiKid-Data-Import/1.0') + \
+    f" ({os.getenv('CONTACT_EMAIL', 'data@happikid.com')})"
+
+# (connect, read) seconds, used when a caller does not pass its own timeout
+DEFAULT_TIMEOUT = (10, 30)
+
+# Concurrent requests (and pooled connections) allowed per host
+DEFAULT_HOST_LIMIT = 4
+HOST_LIMITS = {
+    'nominatim.openstreetmap.org': 1,    # usage policy: one request at a time
+    'maps.googleapis.com': 8,
+    'data.cityofnewyork.us': 4,
+    'www.nj.gov': 4,
+    'www.childcarenj.gov': 8,
+    'www.state.nj.us': 8,
+    'nj.gov': 8
+}
+
+# Retries for connection errors and transient statuses, with 1s, 2s, 4s... backoff
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 1.0
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+def host_limit(host: str) -> int:
+    """Concurrent requests (and pooled connections) allowed for host"""
+    return HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+
+class HttpClient:
+    """Thread-safe pooled session with per-host limits and request metrics"""
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+
+        retry = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=['GET', 'HEAD'], respect_retry_after_header=True, raise_on_status=False)
+
+        # Hosts without a dedicated adapter share the default pool size
+        default_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=DEFAULT_HOST_LIMIT, max_retries=retry)
+        self.session.mount('http://', default_adapter)
+        self.session.mount('https://', default_adapter)
+        for host, limit in HOST_LIMITS.items():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit, max_retries=retry)
+            self.session.mount(f"https://{host}/", adapter)
+            self.session.mount(f"http://{host}/", adapter)
+
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._stats = defaultdict(lambda: {
+            'requests': 0,
+            'errors': 0,
+            'bytes': 0,
+            'latency_ms_total': 0.0,
+            'latency_histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        })
+
+    def _slots(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(host_limit(host))
+            return self._host_slots[host]
+
+    def _record(self, host: str, elapsed: float, body_bytes: int = 0, error: bool = False):
+        latency_ms = elapsed * 1000
+        with self._lock:
+            stats = self._stats[host]
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['bytes'] += body_bytes
+            stats['latency_ms_total'] += latency_ms
+            stats['latency_histogram'][bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session
+
+        Accepts the same keyword arguments as requests.Session.request. The host's
+        concurrency slot is held until the response headers (or, when not
+        streaming, the whole body) have arrived; read streamed bodies through
+        iter_content so their bytes are counted.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).hostname or ''
+
+        start = time.perf_counter()
+        with self._slots(host):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                self._record(host, time.perf_counter() - start, error=True)
+                raise
+
+        body_bytes = 0 if kwargs.get('stream') else len(response.content)
+        self._record(host, time.perf_counter() - start, body_bytes, error=response.status_code >= 400)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request('HEAD', url, **kwargs)
+
+    def iter_content(self, response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+        """Iterate a streamed response body, counting its bytes"""
+        host = urlparse(response.url).hostname or ''
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            with self._lock:
+                self._stats[host]['bytes'] += len(chunk)
+            yield chunk
+
+    def _connections_opened(self) -> Dict[str, int]:
+        """New TCP/TLS connections per host, read from urllib3's pools"""
+        opened = defaultdict(int)
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened[pool.host] += pool.num_connections
+        return opened
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request counts, bytes, latency histogram and connection reuse"""
+        opened = self._connections_opened()
+        with self._lock:
+            report = {}
+            for host, stats in self._stats.items():
+                requests_made = stats['requests']
+                connections = opened.get(host, 0)
+                report[host] = {
+                    'requests': requests_made,
+                    'errors': stats['errors'],
+                    'bytes': stats['bytes'],
+                    'mean_latency_ms': stats['latency_ms_total'] / requests_made if requests_made else 0.0,
+                    'latency_histogram_ms': {
+                        (f"<={bound}" if i < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}"): count
+                        for i, (bound, count) in enumerate(zip(LATENCY_BUCKETS_MS + [None], stats['latency_histogram']))
+                    },
+                    'connections_opened': connections,
+                    'connection_reuse': max(0.0, 1 - connections / requests_made) if requests_made else 0.0
+                }
+            return report
+
+    def format_stats(self) -> List[str]:
+        """One summary line per host, for end-of-run reports"""
+        lines = []
+        for host, stats in sorted(self.stats().items()):
+            lines.append(f"{host}: {stats['requests']:,} requests ({stats['errors']} errors), "
+                         f"{stats['bytes'] / 1024:,.0f} KB, mean {stats['mean_latency_ms']:.0f} ms, "
+                         f"{stats['connections_opened']} connections ({stats['connection_reuse'] * 100:.0f}% reuse)")
+        return lines
+
+    def close(self):
+        self.session.close()
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    """The process-wide shared client, created on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
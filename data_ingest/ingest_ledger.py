@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Ledger of successful imports, used to skip a run when neither the source
+snapshot nor the pipeline that processes it has changed
+"""
+
+import json
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+# Anchored to this file so the NJ, NYC and camps importers share one ledger
+# whichever directory they are run from
+LEDGER_FILE = str(Path(__file__).resolve().parent / "data_ingest" / "cache" / "ingest_ledger.json")
+
+def records_sha256(records: Iterable[Dict[str, Any]]) -> str:
+    """
+    Order-independent SHA-256 of JSON records
+
+    APIs and index pages do not promise a stable order, so each record is
+    serialized canonically and the serialized records are hashed sorted.
+    """
+    digest = hashlib.sha256()
+    for line in sorted(json.dumps(record, sort_keys=True, ensure_ascii=False) for record in records):
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def pipeline_version(code_dir: str, settings: Optional[Dict[str, Any]] = None,
+                     extra_files: Iterable[str] = ()) -> str:
+    """
+    Fingerprint of a pipeline: its Python sources plus the settings that change its output
+
+    Any edit to a module in code_dir, or to one of extra_files (modules the
+    pipeline imports from elsewhere), invalidates earlier ledger entries, so a
+    fix to normalization or geocoding is never skipped.
+    """
+    digest = hashlib.sha256()
+    paths = sorted(Path(code_dir).glob('*.py')) + sorted(Path(path) for path in extra_files)
+    for path in paths:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+class IngestLedger:
+    """Last successful run per source, stored in one JSON file"""
+
+    def __init__(self, ledger_file: str = LEDGER_FILE):
+        self.ledger_file = Path(ledger_file)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.ledger_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def last_run(self, source: str) -> Optional[Dict[str, Any]]:
+        """Ledger entry of the last successful run of a source, if any"""
+        return self._load().get(source)
+
+    def is_unchanged(self, source: str, snapshot_sha256: str, version: str) -> bool:
+        """True when the last successful run saw the same snapshot with the same pipeline"""
+        entry = self.last_run(source)
+        return bool(entry) and entry.get('snapshot_sha256') == snapshot_sha256 \
+            and entry.get('pipeline_version') == version
+
+    def record(self, source: str, snapshot_sha256: str, version: str,
+               stats: Optional[Dict[str, Any]] = None, watermark: Optional[str] = None,
+               incremental: bool = False):
+        """
+        Record a successful run; call only after the import has been committed
+
+        Sources that sync incrementally pass the watermark their next run
+        starts from. A full run also stamps full_sync_at; an incremental run
+        keeps the previous one.
+        """
+        ledger = self._load()
+        previous = ledger.get(source) or {}
+        entry = {
+            'snapshot_sha256': snapshot_sha256,
+            'pipeline_version': version,
+            'completed_at': datetime.now().isoformat(),
+            'stats': stats or {}
+        }
+        if watermark is not None:
+            entry['watermark'] = watermark
+            entry['full_sync_at'] = previous.get('full_sync_at') if incremental else entry['completed_at']
+        ledger[source] = entry
+
+        self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename so an interrupted run never leaves a corrupt ledger
+        fd, tmp_path = tempfile.mkstemp(dir=self.ledger_file.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(ledger, f, indent=2, default=str)
+            os.replace(tmp_path, self.ledger_file)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+def describe_skip(source: str, entry: Dict[str, Any]) -> List[str]:
+    """Log lines explaining why an import was skipped"""
+    return [
+        f"Source snapshot for {source} is unchanged since the last successful import "
+        f"({entry.get('completed_at', 'unknown time')}, sha256 {entry['snapshot_sha256'][:12]})",
+        "Nothing to do; use --force to run the import anyway"
+    ]
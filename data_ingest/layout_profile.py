@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Learn and persist the pdfplumber table strategy that works for a given PDF layout
+"""
+
+import io
+import json
+import hashlib
+import mmap
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# Base strategies, in the order the full search tries them
+TABLE_STRATEGIES = [
+    {"vertical_strategy": "lines", "horizontal_strategy": "lines", "snap_tolerance": 3},
+    {"vertical_strategy": "lines", "horizontal_strategy": "text", "snap_tolerance": 5},
+    {"vertical_strategy": "text", "horizontal_strategy": "lines", "snap_tolerance": 5},
+    {"vertical_strategy": "text", "horizontal_strategy": "text", "snap_tolerance": 3}
+]
+
+# Snap tolerances tried for every base strategy while tuning
+CANDIDATE_SNAP_TOLERANCES = [1, 3, 5]
+
+# Minimum number of rows for a table to count as a real listing
+MIN_TABLE_ROWS = 5
+
+# Pages checked before a profile is trusted on a PDF it was not learned from
+REUSE_SAMPLE_SIZE = 3
+
+# Bumped when the way profiles are chosen changes; older profiles are re-learned
+PROFILE_VERSION = 2
+
+PROFILE_CACHE_FILE = "data_ingest/cache/layout_profiles.json"
+
+def pdf_fingerprint(pdf_path: str) -> str:
+    """SHA-256 of the PDF bytes"""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def open_pdf_fingerprint(pdf) -> str:
+    """
+    SHA-256 of an open pdfplumber PDF's bytes, read from the stream it was opened on
+
+    In-memory and memory-mapped PDFs are hashed straight from their buffer; a
+    file stream is read from the start and left where pdfminer had it.
+    """
+    stream = pdf.stream
+    if isinstance(stream, io.BytesIO):
+        with stream.getbuffer() as buffer:
+            return hashlib.sha256(buffer).hexdigest()
+    if isinstance(stream, mmap.mmap):
+        return hashlib.sha256(stream).hexdigest()
+
+    digest = hashlib.sha256()
+    position = stream.tell()
+    stream.seek(0)
+    try:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+    finally:
+        stream.seek(position)
+    return digest.hexdigest()
+
+def is_acceptable_table(tables: List[List[List[str]]], expected_columns: Optional[int] = None) -> bool:
+    """Check whether extract_tables output looks like the provider listing"""
+    if not tables or len(tables[0]) <= MIN_TABLE_ROWS:
+        return False
+
+    if expected_columns is not None:
+        return max(len(row) for row in tables[0]) == expected_columns
+
+    return True
+
+def full_search_tables(page) -> List[List[List[str]]]:
+    """Tables from the first base strategy that finds the listing, as extraction without a profile does"""
+    for strategy in TABLE_STRATEGIES:
+        try:
+            tables = page.extract_tables(strategy)
+        except Exception:
+            continue
+        if is_acceptable_table(tables):
+            return tables
+    return []
+
+def candidate_strategies() -> List[Dict[str, Any]]:
+    """Every base strategy crossed with every candidate snap tolerance, without duplicates"""
+    candidates = []
+    for base in TABLE_STRATEGIES:
+        for tolerance in CANDIDATE_SNAP_TOLERANCES:
+            candidate = dict(base, snap_tolerance=tolerance)
+            if candidate not in candidates:
+                candidates.append(candidate)
+    return candidates
+
+def strategy_label(strategy: Dict[str, Any]) -> str:
+    """Short human-readable name for log lines"""
+    return f"{strategy['vertical_strategy']}/{strategy['horizontal_strategy']}@{strategy['snap_tolerance']}"
+
+def sample_page_indices(total_pages: int, sample_size: int) -> List[int]:
+    """Evenly spaced page indices, always including the first page"""
+    if total_pages <= sample_size:
+        return list(range(total_pages))
+
+    step = (total_pages - 1) / max(sample_size - 1, 1)
+    return sorted({round(i * step) for i in range(sample_size)})
+
+def learn_layout_profile(pdf, sample_size: int = 3) -> Optional[Dict[str, Any]]:
+    """
+    Time every candidate strategy on a few sample pages and pick the fastest one
+    that reproduces the full search's tables cell for cell
+
+    Args:
+        pdf: Open pdfplumber PDF
+        sample_size: Number of pages to sample
+
+    Returns:
+        Profile dictionary, or None if no candidate works on every sample page
+    """
+    sample_pages = sample_page_indices(len(pdf.pages), sample_size)
+
+    # A candidate must reproduce the full search's rows exactly on every sample page
+    reference = [full_search_tables(pdf.pages[page_num]) for page_num in sample_pages]
+    if not reference[0]:
+        print("Layout profile: no strategy produced a table on the sample page")
+        return None
+    expected_columns = max(len(row) for row in reference[0][0])
+
+    print(f"Layout profile: tuning on pages {[p + 1 for p in sample_pages]} "
+          f"(expecting {expected_columns} columns)")
+
+    timings = {}
+    best_strategy = None
+    best_time = None
+
+    for strategy in candidate_strategies():
+        label = strategy_label(strategy)
+        elapsed = 0.0
+        pages_timed = 0
+        works = True
+
+        for page_num, expected_tables in zip(sample_pages, reference):
+            page = pdf.pages[page_num]
+            start = time.perf_counter()
+            try:
+                tables = page.extract_tables(strategy)
+            except Exception:
+                tables = []
+            elapsed += time.perf_counter() - start
+            pages_timed += 1
+
+            if tables != expected_tables:
+                works = False
+                break
+
+        per_page = elapsed / pages_timed
+        timings[label] = {'seconds_per_page': round(per_page, 4), 'matches_layout': works}
+        print(f"  {label}: {per_page:.3f}s/page {'✓' if works else '✗'}")
+
+        if works and (best_time is None or per_page < best_time):
+            best_strategy = strategy
+            best_time = per_page
+
+    if best_strategy is None:
+        print("Layout profile: no candidate matched the full search on every sample page")
+        return None
+
+    print(f"Layout profile: selected {strategy_label(best_strategy)} ({best_time:.3f}s/page)")
+
+    return {
+        'version': PROFILE_VERSION,
+        'strategy': best_strategy,
+        'expected_columns': expected_columns,
+        'sample_pages': [p + 1 for p in sample_pages],
+        'timings': timings,
+        'created_at': datetime.now().isoformat()
+    }
+
+def load_profiles(cache_file: str = PROFILE_CACHE_FILE) -> Dict[str, Any]:
+    """Load all persisted layout profiles"""
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_profile(fingerprint: str, profile: Dict[str, Any], cache_file: str = PROFILE_CACHE_FILE):
+    """Persist a layout profile under the PDF's fingerprint"""
+    profiles = load_profiles(cache_file)
+    profiles[fingerprint] = profile
+
+    cache_path = Path(cache_file)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump(profiles, f, indent=2)
+
+def reuse_latest_profile(pdf, profiles: Dict[str, Any],
+                         sample_size: int = REUSE_SAMPLE_SIZE) -> Optional[Dict[str, Any]]:
+    """
+    Check whether the most recently learned profile still fits this PDF
+
+    A republished PDF gets a new fingerprint but almost always keeps its layout,
+    so checking the profile against the full search on a few pages spread
+    through the document is enough to avoid re-tuning.
+    """
+    if not profiles or not pdf.pages:
+        return None
+
+    latest = max(profiles.values(), key=lambda p: p.get('created_at', ''))
+    for page_num in sample_page_indices(len(pdf.pages), sample_size):
+        page = pdf.pages[page_num]
+        try:
+            tables = page.extract_tables(latest['strategy'])
+        except Exception:
+            return None
+        if not is_acceptable_table(tables, latest.get('expected_columns')) or tables != full_search_tables(page):
+            return None
+
+    return latest
+
+def get_layout_profile(pdf, cache_file: str = PROFILE_CACHE_FILE) -> Optional[Dict[str, Any]]:
+    """Return the persisted profile for this open PDF, learning and saving one if needed"""
+    fingerprint = open_pdf_fingerprint(pdf)
+    profiles = {key: profile for key, profile in load_profiles(cache_file).items()
+                if profile.get('version') == PROFILE_VERSION}
+
+    profile = profiles.get(fingerprint)
+    if profile:
+        print(f"Layout profile: using cached {strategy_label(profile['strategy'])} for {fingerprint[:12]}")
+        return profile
+
+    profile = reuse_latest_profile(pdf, profiles)
+    if profile:
+        print(f"Layout profile: previous {strategy_label(profile['strategy'])} still fits {fingerprint[:12]}")
+    else:
+        profile = learn_layout_profile(pdf)
+
+    if profile:
+        save_profile(fingerprint, profile, cache_file)
+
+    return profile
@@ -8,7 +8,9 @@ import phonenumbers
 from email_validator import validate_email, EmailNotValidError
 from slugify import slugify
 import hashlib
-from typing import Dict, Any, Optional, Tuple, List
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional, Tuple, List, Callable
 
 def normalize_phone(phone: str) -> Optional[str]:
     """Normalize phone number to E.164 format"""
@@ -18,6 +20,10 @@ def normalize_phone(phone: str) -> Optional[str]:
     # Remove all non-digits
     digits_only = re.sub(r'\D', '', phone)
     
+    return _phone_from_digits(digits_only)
+
+def _phone_from_digits(digits_only: str) -> Optional[str]:
+    """E.164 phone number from the digits of a phone number"""
     # Skip if no digits
     if not digits_only:
         return None
@@ -37,25 +43,48 @@ def normalize_phone(phone: str) -> Optional[str]:
     # Return cleaned version if parsing fails
     return digits_only if len(digits_only) >= 10 else None
 
+# Artifacts stripped from email cells before validation
+EMAIL_PREFIX = r'^(email:|e-mail:|contact:)\s*'
+EMAIL_SUFFIX = r'\s*(phone|fax|tel).*$'
+
 def normalize_email(email: str) -> Optional[str]:
     """Normalize and validate email address"""
     if not email:
         return None
     
+    # Basic cleaning
+    email = email.strip().lower()
+    
+    # Remove common prefixes/suffixes that might be artifacts
+    email = re.sub(EMAIL_PREFIX, '', email)
+    email = re.sub(EMAIL_SUFFIX, '', email)
+    
+    return _validated_email(email)
+
+def _validated_email(email: str) -> Optional[str]:
+    """Validated form of a cleaned email address, None if it is not valid"""
     try:
-        # Basic cleaning
-        email = email.strip().lower()
-        
-        # Remove common prefixes/suffixes that might be artifacts
-        email = re.sub(r'^(email:|e-mail:|contact:)\s*', '', email)
-        email = re.sub(r'\s*(phone|fax|tel).*$', '', email)
-        
-        # Validate email
         validated = validate_email(email)
         return validated.email
     except EmailNotValidError:
         return None
 
+def _email_syntax(email: str):
+    """ValidatedEmail for a cleaned address without the DNS check, None if its syntax is not valid"""
+    try:
+        return validate_email(email, check_deliverability=False)
+    except EmailNotValidError:
+        return None
+
+def _domain_accepts_email(ascii_domain: str) -> bool:
+    """Whether validate_email's deliverability check passes for addresses at this domain"""
+    try:
+        # The shortest local part keeps the address within every length limit the original met
+        validate_email(f"x@{ascii_domain}")
+        return True
+    except EmailNotValidError:
+        return False
+
 def parse_age_range(age_text: str) -> Tuple[Optional[int], Optional[int]]:
     """Parse age range text into min/max months"""
     if not age_text:
@@ -157,6 +186,18 @@ def normalize_capacity(capacity_text: str) -> Optional[int]:
     
     return None
 
+# Street abbreviations expanded in addresses, in order
+ADDRESS_ABBREVIATIONS = {
+    ' St ': ' Street ',
+    ' Ave ': ' Avenue ',
+    ' Rd ': ' Road ',
+    ' Dr ': ' Drive ',
+    ' Blvd ': ' Boulevard ',
+    ' Ct ': ' Court ',
+    ' Ln ': ' Lane ',
+    ' Pl ': ' Place '
+}
+
 def normalize_address(address: str) -> str:
     """Clean and normalize address"""
     if not address:
@@ -172,18 +213,7 @@ def normalize_address(address: str) -> str:
     address = address.title()
     
     # Fix common abbreviations
-    replacements = {
-        ' St ': ' Street ',
-        ' Ave ': ' Avenue ',
-        ' Rd ': ' Road ',
-        ' Dr ': ' Drive ',
-        ' Blvd ': ' Boulevard ',
-        ' Ct ': ' Court ',
-        ' Ln ': ' Lane ',
-        ' Pl ': ' Place '
-    }
-    
-    for old, new in replacements.items():
+    for old, new in ADDRESS_ABBREVIATIONS.items():
         address = address.replace(old, new)
     
     return address
@@ -234,6 +264,15 @@ def map_provider_type(raw_type: str) -> str:
         # Default to daycare for most child care facilities
         return "daycare"
 
+# Fields every NJ DCF provider record carries
+NJ_DCF_METADATA = {
+    'source': 'NJ_DCF',
+    'source_url': 'https://www.nj.gov/dcf/about/divisions/ol/NJDCF-Licensed-Child-Care-Centers.pdf',
+    'source_as_of_date': '2025-08-01',
+    'is_verified_by_gov': True,
+    'is_profile_public': True
+}
+
 def normalize_provider_data(raw_data: Dict[str, Any]) -> Dict[str, Any]:
     """Normalize a single provider record"""
     normalized = {}
@@ -276,11 +315,7 @@ def normalize_provider_data(raw_data: Dict[str, Any]) -> Dict[str, Any]:
     normalized['slug'] = generate_slug(normalized['name'], normalized['city'])
     
     # NJ-specific metadata
-    normalized['source'] = 'NJ_DCF'
-    normalized['source_url'] = 'https://www.nj.gov/dcf/about/divisions/ol/NJDCF-Licensed-Child-Care-Centers.pdf'
-    normalized['source_as_of_date'] = '2025-08-01'
-    normalized['is_verified_by_gov'] = True
-    normalized['is_profile_public'] = True
+    normalized.update(NJ_DCF_METADATA)
     
     # Preserve source metadata for debugging
     if '_source_page' in raw_data:
@@ -324,6 +359,208 @@ def validate_provider_data(provider: Dict[str, Any]) -> Tuple[bool, List[str]]:
     
     return len(errors) == 0, errors
 
+# Raw columns the normalizer reads, as named by the extractor
+RAW_FIELDS = [
+    'Provider Name', 'Provider Address 1', 'Provider City', 'Provider Zip Code', 'County', 'License Number',
+    'Provider Phone Number', 'Provider Email Address', 'Provider Type', 'Ages Served', 'Licensed Capacity'
+]
+
+SOURCE_FIELDS = ['_source_page', '_source_row']
+
+def _map_distinct(values: pd.Series, func: Callable[[Any], Any]) -> np.ndarray:
+    """Apply func once per distinct value and spread the results back over the rows (None for missing values)"""
+    codes, uniques = pd.factorize(values)
+    # The extra last slot stays None and is what the -1 code of a missing value picks
+    results = np.empty(len(uniques) + 1, dtype=object)
+    for i, value in enumerate(uniques):
+        results[i] = func(value)
+    return results[codes]
+
+def _optional_ints(values: pd.Series) -> np.ndarray:
+    """Object array of Python ints, None where values is missing"""
+    result = np.full(len(values), None, dtype=object)
+    present = values.notna().to_numpy()
+    result[present] = [int(v) for v in values[present]]
+    return result
+
+def normalize_provider_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a table of extracted provider rows column by column
+    
+    Gives the same values as normalize_provider_data on each row. Whitespace,
+    casing, abbreviations, ZIP codes and capacities are handled as vectorized
+    string operations; phone, email, type, age and slug parsing run once per
+    distinct value.
+    
+    Args:
+        raw: One row per provider, columns named as in RAW_FIELDS (missing
+             columns and NaN cells count as empty strings) plus optional
+             _source_page/_source_row
+    
+    Returns:
+        DataFrame of normalized columns, object dtype, None for missing values
+    """
+    raw = raw.reset_index(drop=True)
+    column = {}
+    for field in RAW_FIELDS:
+        values = raw[field] if field in raw.columns else pd.Series('', index=raw.index)
+        column[field] = values.astype(object).fillna('')
+    
+    normalized = {}
+    normalized['name'] = column['Provider Name'].str.strip()
+    
+    address = column['Provider Address 1'].str.strip().str.replace(r'\s+', ' ', regex=True).str.title()
+    for old, new in ADDRESS_ABBREVIATIONS.items():
+        address = address.str.replace(old, new, regex=False)
+    normalized['address'] = address
+    
+    normalized['city'] = column['Provider City'].str.strip().str.title()
+    normalized['state'] = 'NJ'
+    
+    zip_raw = column['Provider Zip Code']
+    normalized['zip_code'] = zip_raw.str.extract(r'(\d{5})', expand=False).fillna(zip_raw.str.strip())
+    
+    normalized['county'] = column['County'].str.strip().str.title()
+    normalized['license_number'] = column['License Number'].str.strip()
+    
+    # Phone and email validation are the expensive steps: clean the cells as
+    # columns, then validate each distinct cleaned value once
+    phone_raw = column['Provider Phone Number']
+    phone = _map_distinct(phone_raw.str.replace(r'\D', '', regex=True), _phone_from_digits)
+    phone[(phone_raw == '').to_numpy()] = None
+    normalized['phone'] = phone
+    
+    email_raw = column['Provider Email Address']
+    email_clean = (email_raw.str.strip().str.lower()
+                   .str.replace(EMAIL_PREFIX, '', regex=True)
+                   .str.replace(EMAIL_SUFFIX, '', regex=True))
+    # Deliverability only depends on the domain, so it is checked once per domain
+    syntax = _map_distinct(email_clean, _email_syntax)
+    # Domain literals (user@[10.0.0.1]) skip the DNS check, as in validate_email
+    domains = pd.Series([v.ascii_domain if v is not None and getattr(v, 'domain_address', None) is None else None
+                         for v in syntax], dtype=object)
+    deliverable = _map_distinct(domains, _domain_accepts_email)
+    email = np.array([v.email if v is not None and ok is not False else None
+                      for v, ok in zip(syntax, deliverable)], dtype=object)
+    email[(email_raw == '').to_numpy()] = None
+    normalized['email'] = email
+    
+    normalized['provider_type_raw'] = column['Provider Type'].str.strip()
+    normalized['type'] = _map_distinct(column['Provider Type'], map_provider_type)
+    
+    ages = _map_distinct(column['Ages Served'], parse_age_range)
+    normalized['ages_served_raw'] = column['Ages Served'].str.strip()
+    normalized['age_min_months'] = [age[0] for age in ages]
+    normalized['age_max_months'] = [age[1] for age in ages]
+    
+    normalized['capacity'] = _optional_ints(column['Licensed Capacity'].str.extract(r'(\d+)', expand=False))
+    
+    names_and_cities = pd.Series(list(zip(normalized['name'], normalized['city'])), dtype=object)
+    normalized['slug'] = _map_distinct(names_and_cities, lambda key: generate_slug(*key))
+    
+    normalized.update(NJ_DCF_METADATA)
+    
+    for field in SOURCE_FIELDS:
+        if field in raw.columns:
+            normalized[field] = raw[field]
+    
+    # object dtype keeps ints as ints and lets None stand for every missing value
+    frame = pd.DataFrame({key: values.tolist() if isinstance(values, pd.Series) else values
+                          for key, values in normalized.items()}, index=raw.index, dtype=object)
+    return frame.where(frame.notna(), None)
+
+def provider_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Provider dicts from a normalized frame, keyed as normalize_provider_data keys them
+    
+    age_range_min/max are only set when the age is known, and source fields
+    only where the row has them.
+    """
+    columns = list(frame.columns)
+    records = []
+    for values in zip(*(frame[c].tolist() for c in columns)):
+        record = {}
+        for key, value in zip(columns, values):
+            if key in SOURCE_FIELDS and value is None:
+                continue
+            record[key] = value
+            if key == 'age_max_months':
+                if record['age_min_months'] is not None:
+                    record['age_range_min'] = record['age_min_months']
+                if value is not None:
+                    record['age_range_max'] = value
+        records.append(record)
+    return records
+
+def validate_provider_frame(frame: pd.DataFrame) -> List[List[str]]:
+    """Validation errors per row of a normalized frame, as validate_provider_data reports them"""
+    def missing(column: str) -> pd.Series:
+        values = frame[column]
+        return values.isna() | (values == '')
+    
+    errors = [[] for _ in range(len(frame))]
+    
+    def flag(mask: pd.Series, message: Callable[[Any], str], column: Optional[str] = None):
+        for i in np.flatnonzero(mask.to_numpy(dtype=bool)):
+            errors[i].append(message(frame[column].iat[i] if column else None))
+    
+    flag(missing('name'), lambda _: "Missing provider name")
+    flag(missing('address'), lambda _: "Missing address")
+    flag(missing('city'), lambda _: "Missing city")
+    
+    zip_code = frame['zip_code'].fillna('')
+    bad_zip = (zip_code != '') & ~zip_code.str.match(r'^\d{5}(-\d{4})?$').astype(bool)
+    flag(bad_zip & missing('city'), lambda z: f"Invalid ZIP code format and missing city: {z}", 'zip_code')
+    
+    phone = frame['phone'].fillna('')
+    flag((phone != '') & (phone.str.len() < 10), lambda p: f"Invalid phone format: {p}", 'phone')
+    
+    capacity = pd.to_numeric(frame['capacity'])
+    flag(capacity.notna() & (capacity < 0), lambda c: f"Invalid capacity: {c}", 'capacity')
+    
+    return errors
+
+def _is_columnar(raw_data: Dict[str, Any]) -> bool:
+    """Whether the columnar path gives the same result as the row-wise one for this row"""
+    return (all(isinstance(raw_data.get(field, ''), str) for field in RAW_FIELDS)
+            and all(raw_data.get(field, 0) is not None for field in SOURCE_FIELDS))
+
+def normalize_provider_batch(raw_rows: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], List[str]]]:
+    """
+    Normalize and validate a batch of extracted rows in one columnar pass
+    
+    Rows with non-string cells (which the row-wise path cannot always handle)
+    go through normalize_provider_data one at a time instead, so every row
+    ends up exactly as it would on its own.
+    
+    Returns:
+        One (normalized, errors) pair per row, in order. normalized is None
+        when the row could not be normalized at all; errors then holds why.
+    """
+    results: List[Tuple[Optional[Dict[str, Any]], List[str]]] = [None] * len(raw_rows)
+    
+    columnar = [i for i, row in enumerate(raw_rows) if _is_columnar(row)]
+    if columnar:
+        rows = [raw_rows[i] for i in columnar]
+        table = {field: [row.get(field, '') for row in rows] for field in RAW_FIELDS}
+        for field in SOURCE_FIELDS:
+            if any(field in row for row in rows):
+                table[field] = [row.get(field) for row in rows]
+        frame = normalize_provider_frame(pd.DataFrame(table, dtype=object))
+        for i, record, errors in zip(columnar, provider_records(frame), validate_provider_frame(frame)):
+            results[i] = (record, errors)
+    
+    for i, row in enumerate(raw_rows):
+        if results[i] is None:
+            try:
+                normalized = normalize_provider_data(row)
+            except Exception as e:
+                results[i] = (None, [str(e)])
+                continue
+            results[i] = (normalized, validate_provider_data(normalized)[1])
+    
+    return results
+
 if __name__ == "__main__":
     # Test normalization functions
     test_data = {
@@ -7,11 +7,64 @@ import json
 import pandas as pd
 import re
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from slugify import slugify
 import phonenumbers
 from email_validator import validate_email, EmailNotValidError
 
+from download_nyc import load_raw_providers
+
+# Inspection columns kept in the compact history, as (raw column, history field)
+INSPECTION_FIELDS = [
+    ('inspectiondate', 'inspection_date'),
+    ('inspectionsummaryresult', 'result'),
+    ('violationcategory', 'violation_category'),
+    ('healthcodesubsection', 'health_code_subsection'),
+    ('violationstatus', 'violation_status')
+]
+
+def permit_key(provider: Dict[str, Any]) -> Optional[str]:
+    """The provider's license number, as normalize_provider derives it"""
+    return provider.get('permitnumber', '') or provider.get('license_number', '') or provider.get('dc_id', '') or None
+
+def collapse_inspections(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Collapse NYC inspection rows to one row per permit
+    
+    The dataset has a row per inspection (and per violation cited), each
+    repeating the center's details. Each permit keeps the row of its latest
+    inspection for the provider record. Every inspection row goes into a
+    compact history, one entry per permit, date, health code subsection and
+    violation category. Rows without a permit number or DC ID cannot be
+    grouped and are kept as they are.
+    
+    Returns:
+        (one row per provider, inspection history)
+    """
+    latest = {}
+    unkeyed = []
+    history = {}
+    
+    for row in rows:
+        key = permit_key(row)
+        if not key:
+            unkeyed.append(row)
+            continue
+        
+        current = latest.get(key)
+        if current is None or (row.get('inspectiondate') or '') >= (current.get('inspectiondate') or ''):
+            latest[key] = row
+        
+        inspection = {'license_number': key}
+        for column, field in INSPECTION_FIELDS:
+            inspection[field] = str(row.get(column) or '').strip()
+        inspection['inspection_date'] = inspection['inspection_date'][:10]
+        if inspection['inspection_date']:
+            history[(key, inspection['inspection_date'], inspection['health_code_subsection'],
+                     inspection['violation_category'])] = inspection
+    
+    return list(latest.values()) + unkeyed, list(history.values())
+
 def normalize_phone(phone: str) -> Optional[str]:
     """Normalize phone number to E.164 format"""
     if not phone or pd.isna(phone):
@@ -177,12 +230,28 @@ def normalize_provider(provider: Dict[str, Any]) -> Dict[str, Any]:
     
     return normalized
 
-def normalize_providers_from_json(input_path: str, output_path: str):
-    """Normalize providers from JSON file"""
+def normalize_providers_from_json(input_path: str, output_path: str, inspections_path: Optional[str] = None):
+    """
+    Normalize providers from a JSON file or a directory of NDJSON shards
+    
+    Inspection rows are collapsed to one provider per permit first; the
+    inspection history is saved to inspections_path when given.
+    """
     print(f"Reading raw data from {input_path}")
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        providers = json.load(f)
+    rows = load_raw_providers(input_path)
+    
+    providers, inspections = collapse_inspections(rows)
+    print(f"Collapsed {len(rows)} inspection rows to {len(providers)} providers "
+          f"({len(inspections)} inspection history entries)")
+    del rows
+    
+    if inspections_path:
+        inspections_file = Path(inspections_path)
+        inspections_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(inspections_file, 'w', encoding='utf-8') as f:
+            json.dump(inspections, f, ensure_ascii=False)
+        print(f"Saved inspection history to {inspections_file}")
     
     print(f"Normalizing {len(providers)} providers...")
     
@@ -223,8 +292,9 @@ def main():
     
     input_file = "data_ingest/output/nyc_manhattan_raw.json"
     output_file = "data_ingest/output/nyc_manhattan_normalized.json"
+    inspections_file = "data_ingest/output/nyc_manhattan_inspections.json"
     
-    providers = normalize_providers_from_json(input_file, output_file)
+    providers = normalize_providers_from_json(input_file, output_file, inspections_file)
     
     # Print summary
     print("\n" + "=" * 80)
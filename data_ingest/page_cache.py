@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of rows extracted from individual PDF pages
+"""
+
+import json
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from pdfminer.pdftypes import resolve1
+
+# Bump whenever extract_rows_from_page would produce different rows for the same page
+EXTRACTOR_VERSION = 2
+
+PAGE_CACHE_DIR = "data_ingest/cache/pages"
+
+def page_content_hash(page) -> str:
+    """
+    Hash a page by its raw content streams and geometry
+
+    Falls back to the text layer plus character positions when the content
+    streams cannot be read.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((tuple(page.page_obj.mediabox), page.rotation)).encode())
+
+    try:
+        contents = page.page_obj.contents or []
+        for stream in contents:
+            digest.update(resolve1(stream).get_data())
+    except Exception:
+        for char in page.chars:
+            digest.update(f"{char['text']}|{char['x0']:.1f}|{char['top']:.1f}|{char['fontname']}\n".encode())
+
+    return digest.hexdigest()
+
+def page_cache_key(content_hash: str, header_mapping: Optional[Dict[int, str]],
+                   column_layout: Optional[Dict[str, Any]] = None,
+                   table_strategy: Optional[Dict[str, Any]] = None) -> str:
+    """Combine page content with the extraction state that affects its rows"""
+    state = {
+        'version': EXTRACTOR_VERSION,
+        'content': content_hash,
+        'header_mapping': sorted(header_mapping.items()) if header_mapping else None
+    }
+    if column_layout is not None:
+        state['column_layout'] = column_layout
+    if table_strategy is not None:
+        state['table_strategy'] = table_strategy
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+class PageCache:
+    """One JSON file per page entry, safe to share between worker processes"""
+
+    def __init__(self, cache_dir: str = PAGE_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str, page_num: int) -> Optional[Tuple[Optional[Dict[int, str]], List[Dict[str, Any]]]]:
+        """
+        Look up a page entry
+
+        Returns:
+            (header mapping after the page, rows stamped with page_num), or None on a miss
+        """
+        try:
+            with open(self._entry_path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        header_mapping = entry['header_mapping']
+        if header_mapping is not None:
+            header_mapping = {int(col): name for col, name in header_mapping.items()}
+
+        rows = entry['rows']
+        for row in rows:
+            row['_source_page'] = page_num + 1
+
+        return header_mapping, rows
+
+    def put(self, key: str, header_mapping: Optional[Dict[int, str]], rows: List[Dict[str, Any]]):
+        """Store a page entry; _source_page is re-stamped on read so moved pages still hit"""
+        entry = {
+            'header_mapping': header_mapping,
+            'rows': rows
+        }
+
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename so concurrent workers never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
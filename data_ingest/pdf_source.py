@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Open PDFs for pdfplumber from memory or disk without extra copies
+
+Downloaded bytes are parsed straight from memory instead of being written to a
+temporary file and read back, and large local files are memory-mapped so
+pdfminer's seeks and reads go to the page cache rather than through a
+buffered file. Worker processes mapping the same PDF share those pages.
+"""
+
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+import pdfplumber
+
+# Local files at least this large are memory-mapped instead of opened normally
+MMAP_THRESHOLD = 1024 * 1024
+
+# Downloads larger than this are written to a temporary file instead of kept in memory
+SPILL_THRESHOLD = 32 * 1024 * 1024
+
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+def is_in_memory(source: PdfSource) -> bool:
+    """True when source holds the PDF's bytes rather than naming a file"""
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+def describe_source(source: PdfSource) -> str:
+    """Short label for log messages: the path, or the size of an in-memory PDF"""
+    if is_in_memory(source):
+        return f"<in-memory PDF, {len(source):,} bytes>"
+    return str(source)
+
+@contextmanager
+def open_pdf(source: PdfSource, mmap_threshold: int = MMAP_THRESHOLD) -> Iterator[pdfplumber.PDF]:
+    """
+    Open a PDF from bytes or a path
+
+    Args:
+        source: PDF bytes, or the path of a PDF file
+        mmap_threshold: Memory-map files of at least this many bytes; None disables mapping
+
+    Yields:
+        Open pdfplumber PDF, closed (with any mapping) on exit
+    """
+    if is_in_memory(source):
+        # BytesIO shares the buffer of a bytes object instead of copying it
+        with pdfplumber.open(io.BytesIO(source)) as pdf:
+            yield pdf
+        return
+
+    if mmap_threshold is None or os.path.getsize(source) < mmap_threshold:
+        with pdfplumber.open(source) as pdf:
+            yield pdf
+        return
+
+    with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with pdfplumber.open(mapped) as pdf:
+            yield pdf
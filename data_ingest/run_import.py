@@ -7,16 +7,19 @@ import argparse
 import os
 import sys
 import pandas as pd
+from itertools import islice
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Import our modules
-from download import download_pdf
-from extract import extract_providers_from_pdf
-from normalize import normalize_provider_data, validate_provider_data
+from download import DEFAULT_CHUNK_SIZE, download_pdf, file_sha256
+from extract import ENGINES, iter_providers_from_pdf
+from normalize import normalize_provider_batch
 from geocode import geocode_providers
 from upsert import upsert_to_database
+from ingest_ledger import IngestLedger, pipeline_version, describe_skip
+from http_client import get_client
 
 def load_config():
     """Load configuration from environment"""
@@ -43,7 +46,11 @@ def load_config():
         'create_missing_indexes': os.getenv('CREATE_MISSING_INDEXES', 'true').lower() == 'true',
         'google_maps_api_key': os.getenv('GOOGLE_MAPS_API_KEY'),
         'user_agent': os.getenv('USER_AGENT', 'HappiKid-Data-Import/1.0'),
-        'contact_email': os.getenv('CONTACT_EMAIL', 'data@happikid.com')
+        'contact_email': os.getenv('CONTACT_EMAIL', 'data@happikid.com'),
+        'extract_workers': int(os.getenv('EXTRACT_WORKERS', '1')),
+        'extract_engine': os.getenv('EXTRACT_ENGINE', 'tables'),
+        'normalize_batch_size': int(os.getenv('NORMALIZE_BATCH_SIZE', '5000')),
+        'download_chunk_size': int(os.getenv('DOWNLOAD_CHUNK_SIZE', str(DEFAULT_CHUNK_SIZE)))
     }
 
 def create_export_csv(providers: list, filename_suffix: str = "") -> str:
@@ -98,6 +105,12 @@ def print_summary_report(original_count: int, processed_count: int,
         print(f"  Existing providers updated: {results.get('updated', 0):,}")
         print(f"  Errors: {results.get('errors', 0):,}")
     
+    http_stats = get_client().format_stats()
+    if http_stats:
+        print(f"\n🌐 HTTP:")
+        for line in http_stats:
+            print(f"  {line}")
+    
     if database_stats:
         print(f"\n📈 FINAL DATABASE STATUS:")
         print(f"  Total providers: {database_stats.get('total', 0):,}")
@@ -125,6 +138,9 @@ def main():
     parser.add_argument('--make-profiles-draft', action='store_true', help='Create profiles as drafts')
     parser.add_argument('--google-api-key', help='Google Maps API key')
     parser.add_argument('--force-download', action='store_true', help='Force re-download of PDF')
+    parser.add_argument('--force', action='store_true', help='Run the import even if the PDF is unchanged since the last successful run')
+    parser.add_argument('--workers', type=int, help='Number of processes for PDF extraction (default: 1)')
+    parser.add_argument('--engine', choices=ENGINES, help='PDF extraction engine (default: tables)')
     
     args = parser.parse_args()
     
@@ -146,6 +162,10 @@ def main():
         config['make_profiles_draft'] = True
     if args.google_api_key:
         config['google_maps_api_key'] = args.google_api_key
+    if args.workers:
+        config['extract_workers'] = args.workers
+    if args.engine:
+        config['extract_engine'] = args.engine
     
     # Validate required configuration
     if not config['database_url'] and not config['dry_run']:
@@ -166,45 +186,65 @@ def main():
     try:
         # Step 1: Download PDF
         print("📥 Step 1: Downloading PDF...")
-        pdf_path = download_pdf(config['pdf_url'], force_refresh=args.force_download)
-        
-        # Step 2: Extract data from PDF
-        print("📊 Step 2: Extracting data from PDF...")
-        raw_providers = extract_providers_from_pdf(pdf_path)
+        pdf_path = download_pdf(config['pdf_url'], force_refresh=args.force_download,
+                                chunk_size=config['download_chunk_size'])
         
-        if not raw_providers:
-            print("❌ No providers extracted from PDF. Check PDF format or extraction logic.")
-            sys.exit(1)
+        # Skip everything else if this exact PDF already went through this pipeline
+        ledger = IngestLedger()
+        snapshot_sha256 = file_sha256(Path(pdf_path))
+        version = pipeline_version(Path(__file__).resolve().parent, {
+            'database_url': config['database_url'],
+            'pdf_url': config['pdf_url'],
+            'extract_engine': config['extract_engine'],
+            'as_of_date': config['as_of_date'],
+            'geocoder': config['geocoder'],
+            'make_profiles_draft': config['make_profiles_draft']
+        })
+        if not args.force and ledger.is_unchanged('nj_dcf', snapshot_sha256, version):
+            for line in describe_skip('nj_dcf', ledger.last_run('nj_dcf')):
+                print(f"⏭️  {line}")
+            return
         
-        original_count = len(raw_providers)
-        print(f"✅ Extracted {original_count:,} provider records")
+        # Steps 2-3: Extract rows from the PDF and normalize them as they stream in
+        print("📊 Step 2: Extracting data from PDF...")
+        raw_providers = iter_providers_from_pdf(pdf_path, workers=config['extract_workers'],
+                                                engine=config['extract_engine'])
         
-        # Step 3: Normalize and validate data
         print("🧹 Step 3: Normalizing and validating data...")
+        original_count = 0
         normalized_providers = []
         validation_stats = {'valid': 0, 'invalid': 0}
         
-        for raw_provider in raw_providers:
-            try:
-                normalized = normalize_provider_data(raw_provider)
+        # Rows are normalized a batch at a time as columns, so phone and email
+        # validation run once per distinct value in the batch
+        while True:
+            batch = list(islice(raw_providers, config['normalize_batch_size']))
+            if not batch:
+                break
+            original_count += len(batch)
+            
+            for normalized, errors in normalize_provider_batch(batch):
+                if normalized is None:
+                    validation_stats['invalid'] += 1
+                    print(f"❌ Error normalizing provider: {errors[0]}")
+                    continue
                 
                 # Override profile visibility if making drafts
                 if config['make_profiles_draft']:
                     normalized['is_profile_public'] = False
                 
-                # Validate
-                is_valid, errors = validate_provider_data(normalized)
-                
-                if is_valid:
+                if not errors:
                     normalized_providers.append(normalized)
                     validation_stats['valid'] += 1
                 else:
                     validation_stats['invalid'] += 1
                     print(f"⚠️  Validation failed for {normalized.get('name', 'Unknown')}: {', '.join(errors)}")
-                    
-            except Exception as e:
-                validation_stats['invalid'] += 1
-                print(f"❌ Error normalizing provider: {e}")
+        
+        if original_count == 0:
+            print("❌ No providers extracted from PDF. Check PDF format or extraction logic.")
+            sys.exit(1)
+        
+        print(f"✅ Extracted {original_count:,} provider records")
         
         processed_count = len(normalized_providers)
         print(f"✅ Normalized {processed_count:,} valid provider records")
@@ -243,6 +283,12 @@ def main():
         
         # Step 7: Print summary report
         database_stats = upsert_results.get('database_stats', {})
+        
+        # Only a clean, real import makes the next identical run skippable
+        operation_results = upsert_results.get('operation_results', {})
+        if not config['dry_run'] and not operation_results.get('errors'):
+            ledger.record('nj_dcf', snapshot_sha256, version, operation_results)
+        
         print_summary_report(
             original_count, 
             processed_count, 
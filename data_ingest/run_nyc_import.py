@@ -7,13 +7,38 @@ Downloads, normalizes, geocodes, and imports provider data from NYC Open Data.
 import os
 import sys
 import argparse
+import json
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 # Import our modules
-from download_nyc import download_manhattan_providers, save_providers_to_json
+from download_nyc import (download_manhattan_providers_to_json, download_providers_to_shards, load_raw_providers,
+                          download_permit_histories, UPDATED_AT_COLUMN)
 from normalize_nyc import normalize_providers_from_json
 from geocode import geocode_providers
 from upsert import DatabaseUpserter
+from ingest_ledger import IngestLedger, pipeline_version, records_sha256, describe_skip
+from http_client import get_client
+
+# An incremental run does a full sync instead once the last one is this many days old
+RECONCILE_DAYS = 7
+
+def incremental_since(entry: Optional[Dict[str, Any]], version: str, reconcile_days: int) -> Tuple[Optional[str], str]:
+    """
+    Watermark an incremental run can start from
+
+    Returns:
+        (watermark, '') or (None, reason a full sync is needed instead)
+    """
+    if not entry or not entry.get('watermark'):
+        return None, "no watermark from an earlier import"
+    if entry.get('pipeline_version') != version:
+        return None, "the pipeline has changed since the last import"
+    full_sync_at = entry.get('full_sync_at')
+    if not full_sync_at or datetime.now() - datetime.fromisoformat(full_sync_at) > timedelta(days=reconcile_days):
+        return None, f"the last full sync is more than {reconcile_days} days old"
+    return entry['watermark'], ''
 
 def main():
     """Main orchestrator for NYC import pipeline"""
@@ -22,6 +47,14 @@ def main():
     parser.add_argument('--skip-normalize', action='store_true', help='Skip normalization step')
     parser.add_argument('--skip-geocode', action='store_true', help='Skip geocoding step')
     parser.add_argument('--skip-import', action='store_true', help='Skip database import step')
+    parser.add_argument('--force', action='store_true', help='Run even if the data is unchanged since the last successful import')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only download and import rows updated since the last successful import')
+    parser.add_argument('--reconcile-days', type=int, default=RECONCILE_DAYS,
+                        help=f'With --incremental, run a full sync instead when the last one is older than this '
+                             f'(default: {RECONCILE_DAYS})')
+    parser.add_argument('--download-workers', type=int, default=1,
+                        help='Fetch pages this many at a time into NDJSON shards instead of one JSON file')
     args = parser.parse_args()
     
     print("=" * 80)
@@ -32,9 +65,33 @@ def main():
     output_dir = Path("data_ingest/output")
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    raw_file = output_dir / "nyc_manhattan_raw.json"
-    normalized_file = output_dir / "nyc_manhattan_normalized.json"
-    geocoded_file = output_dir / "nyc_manhattan_geocoded.json"
+    ledger = IngestLedger()
+    version = pipeline_version(Path(__file__).resolve().parent, {'database_url': os.getenv('DATABASE_URL')})
+    
+    # Incremental runs start from the watermark of the last successful import
+    since = None
+    if args.incremental:
+        since, reason = incremental_since(ledger.last_run('nyc_manhattan'), version, args.reconcile_days)
+        if since:
+            print(f"\nIncremental sync: rows updated after {since}")
+        else:
+            print(f"\nFull sync: {reason}")
+    incremental = since is not None
+    
+    # Incremental runs keep their rows apart from the last full snapshot
+    suffix = "_delta" if incremental else ""
+    # Parallel downloads write a directory of shards in place of the single raw file
+    if args.download_workers > 1:
+        raw_file = output_dir / f"nyc_manhattan_raw{suffix}_shards"
+    else:
+        raw_file = output_dir / f"nyc_manhattan_raw{suffix}.json"
+    if incremental:
+        # The changed rows are widened to their permits' whole history, which is what gets normalized
+        delta_file = raw_file
+        raw_file = output_dir / "nyc_manhattan_raw_delta_history.json"
+    normalized_file = output_dir / f"nyc_manhattan_normalized{suffix}.json"
+    geocoded_file = output_dir / f"nyc_manhattan_geocoded{suffix}.json"
+    inspections_file = output_dir / f"nyc_manhattan_inspections{suffix}.json"
     
     # Step 1: Download from NYC Open Data
     if not args.skip_download:
@@ -42,16 +99,45 @@ def main():
         print("STEP 1: DOWNLOADING FROM NYC OPEN DATA API")
         print("=" * 80)
         
-        providers = download_manhattan_providers()
-        if not providers:
+        download_file = delta_file if incremental else raw_file
+        if args.download_workers > 1:
+            downloaded = download_providers_to_shards(str(download_file), since=since, workers=args.download_workers)
+        else:
+            downloaded = download_manhattan_providers_to_json(str(download_file), since=since)
+        if downloaded is None or (not downloaded and not incremental):
             print("ERROR: No providers downloaded. Exiting.")
             return 1
+        if not downloaded:
+            print(f"No rows updated since {since}; nothing to do")
+            return 0
         
-        save_providers_to_json(providers, str(raw_file))
-        print(f"✓ Downloaded {len(providers)} providers")
+        print(f"✓ Downloaded {downloaded} providers")
+        
+        if incremental:
+            # Collapsing only the changed rows could let a corrected older inspection
+            # overwrite a permit's newer details
+            if download_permit_histories(load_raw_providers(download_file), str(raw_file)) is None:
+                print("ERROR: Could not download the changed permits' history. Exiting.")
+                return 1
     else:
         print("\n[SKIPPED] Step 1: Download")
     
+    # Skip the rest if this exact snapshot already went through this pipeline
+    full_run = not (args.skip_download or args.skip_normalize or args.skip_geocode or args.skip_import)
+    snapshot_sha256 = None
+    watermark = since
+    if raw_file.exists():
+        records = load_raw_providers(raw_file)
+        snapshot_sha256 = records_sha256(records)
+        watermark = max((r[UPDATED_AT_COLUMN] for r in records if r.get(UPDATED_AT_COLUMN)), default=since)
+        del records
+    
+    if full_run and not incremental and not args.force and snapshot_sha256 \
+            and ledger.is_unchanged('nyc_manhattan', snapshot_sha256, version):
+        for line in describe_skip('nyc_manhattan', ledger.last_run('nyc_manhattan')):
+            print(line)
+        return 0
+    
     # Step 2: Normalize data
     if not args.skip_normalize:
         print("\n" + "=" * 80)
@@ -62,7 +148,7 @@ def main():
             print(f"ERROR: Raw data file not found: {raw_file}")
             return 1
         
-        normalized_providers = normalize_providers_from_json(str(raw_file), str(normalized_file))
+        normalized_providers = normalize_providers_from_json(str(raw_file), str(normalized_file), str(inspections_file))
         print(f"✓ Normalized {len(normalized_providers)} providers")
     else:
         print("\n[SKIPPED] Step 2: Normalize")
@@ -101,19 +187,33 @@ def main():
             print("ERROR: DATABASE_URL environment variable not set")
             return 1
         
-        # Import to database
-        upserter = DatabaseUpserter(db_url)
-        
-        import json
         with open(geocoded_file, 'r', encoding='utf-8') as f:
             providers = json.load(f)
         
-        stats = upserter.upsert_providers(providers)
+        inspections = []
+        if inspections_file.exists():
+            with open(inspections_file, 'r', encoding='utf-8') as f:
+                inspections = json.load(f)
+        
+        # Import to database: one provider per permit, then the inspection history in bulk
+        upserter = DatabaseUpserter(db_url)
+        upserter.connect()
+        try:
+            upserter.ensure_schema()
+            stats = upserter.upsert_providers_batch(providers)
+            stats['inspections'] = upserter.write_inspections(inspections)
+        finally:
+            upserter.disconnect()
         
         print(f"✓ Database import complete")
         print(f"  - Inserted: {stats.get('inserted', 0)}")
         print(f"  - Updated: {stats.get('updated', 0)}")
         print(f"  - Skipped: {stats.get('skipped', 0)}")
+        print(f"  - Inspection history rows: {stats['inspections']}")
+        
+        if full_run and snapshot_sha256 and not stats.get('errors'):
+            ledger.record('nyc_manhattan', snapshot_sha256, version, stats,
+                          watermark=watermark, incremental=incremental)
     else:
         print("\n[SKIPPED] Step 4: Database import")
     
@@ -125,6 +225,13 @@ def main():
     print(f"  - Raw data: {raw_file}")
     print(f"  - Normalized: {normalized_file}")
     print(f"  - Geocoded: {geocoded_file}")
+    print(f"  - Inspections: {inspections_file}")
+    
+    http_stats = get_client().format_stats()
+    if http_stats:
+        print(f"\nHTTP:")
+        for line in http_stats:
+            print(f"  - {line}")
     
     return 0
 
@@ -31,4 +31,16 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_providers_slug_unique ON providers (slug);
 
 -- Add constraint for geocode status
 ALTER TABLE providers ADD CONSTRAINT IF NOT EXISTS chk_geocode_status 
-  CHECK (geocode_status IN ('OK', 'PARTIAL', 'NONE') OR geocode_status IS NULL);
\ No newline at end of file
+  CHECK (geocode_status IN ('OK', 'PARTIAL', 'NONE') OR geocode_status IS NULL);
+
+-- Inspection history of NYC providers, one row per inspection and violation cited
+CREATE TABLE IF NOT EXISTS provider_inspections (
+  license_number TEXT NOT NULL,
+  inspection_date DATE NOT NULL,
+  health_code_subsection TEXT NOT NULL DEFAULT '',
+  violation_category TEXT NOT NULL DEFAULT '',
+  violation_status TEXT NOT NULL DEFAULT '',
+  result TEXT NOT NULL DEFAULT '',
+  source VARCHAR(64) NOT NULL,
+  PRIMARY KEY (license_number, inspection_date, health_code_subsection, violation_category)
+);
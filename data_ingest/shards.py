@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Page-range shards of a DCF PDF extraction, and the merge step that reassembles them
+
+Each shard holds the rows extracted from one contiguous page range, tagged with
+the source PDF's SHA-256 so shards produced on different machines can be
+checked against each other before merging.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from layout_profile import pdf_fingerprint
+from page_cache import EXTRACTOR_VERSION
+
+SHARD_DIR = "data_ingest/cache/shards"
+
+SHARD_FORMAT_VERSION = 1
+
+def default_shard_path(pdf_hash: str, start: int, end: int, shard_dir: str = SHARD_DIR) -> str:
+    """Shard file name for zero-based, end-exclusive pages [start, end)"""
+    return str(Path(shard_dir) / f"{pdf_hash[:12]}_pages_{start + 1:05d}-{end:05d}.json")
+
+def write_shard(output_path: str, pdf_path: str, total_pages: int, start: int, end: int,
+                engine: str, header_mapping: Optional[Dict[int, str]],
+                rows: List[Dict[str, Any]], pdf_hash: Optional[str] = None) -> str:
+    """
+    Write the rows extracted from pages [start, end) as a shard file
+
+    Returns:
+        Path of the written shard
+    """
+    shard = {
+        'format_version': SHARD_FORMAT_VERSION,
+        'extractor_version': EXTRACTOR_VERSION,
+        'source_pdf': Path(pdf_path).name,
+        'pdf_sha256': pdf_hash or pdf_fingerprint(pdf_path),
+        'total_pages': total_pages,
+        'page_start': start + 1,
+        'page_end': end,
+        'engine': engine,
+        'header_mapping': header_mapping,
+        'rows': rows
+    }
+
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write then rename so a crashed run never leaves a truncated shard behind
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(shard, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    print(f"Wrote shard for pages {start + 1}-{end} ({len(rows)} rows) to {path}")
+    return str(path)
+
+def load_shard(shard_path: str) -> Dict[str, Any]:
+    """Read a shard file, restoring integer column indices in its header mapping"""
+    with open(shard_path, 'r') as f:
+        shard = json.load(f)
+
+    if shard.get('format_version') != SHARD_FORMAT_VERSION:
+        raise ValueError(f"{shard_path}: unsupported shard format {shard.get('format_version')}")
+
+    if shard['header_mapping'] is not None:
+        shard['header_mapping'] = {int(col): name for col, name in shard['header_mapping'].items()}
+
+    shard['path'] = shard_path
+    return shard
+
+def _pages(first: int, last: int) -> str:
+    return f"page {first}" if first == last else f"pages {first}-{last}"
+
+def check_coverage(shards: List[Dict[str, Any]], total_pages: int) -> List[str]:
+    """
+    Describe gaps and overlaps in the page ranges of shards sorted by page_start
+
+    Returns:
+        List of problems, empty when the shards cover pages 1..total_pages exactly once
+    """
+    problems = []
+    next_page = 1
+
+    for shard in shards:
+        start, end = shard['page_start'], shard['page_end']
+        if start > next_page:
+            problems.append(f"{_pages(next_page, start - 1)} missing")
+        elif start < next_page:
+            problems.append(f"{_pages(start, min(end, next_page - 1))} covered more than once "
+                            f"({Path(shard['path']).name})")
+        next_page = max(next_page, end + 1)
+
+    if next_page <= total_pages:
+        problems.append(f"{_pages(next_page, total_pages)} missing")
+
+    return problems
+
+def reconcile_header_mappings(shards: List[Dict[str, Any]]) -> Optional[Dict[int, str]]:
+    """
+    Pick the header mapping the serial path would have used and check every shard against it
+
+    The serial path maps columns from the first header page, so the earliest
+    shard that saw a header wins. Shards that mapped columns differently have
+    rows keyed under different fields and cannot be merged.
+    """
+    with_mapping = [shard for shard in shards if shard['header_mapping'] is not None]
+    if not with_mapping:
+        return None
+
+    reference = with_mapping[0]
+    conflicts = [shard for shard in with_mapping[1:] if shard['header_mapping'] != reference['header_mapping']]
+    if conflicts:
+        names = ', '.join(Path(shard['path']).name for shard in conflicts)
+        raise ValueError(f"Header mapping of {names} differs from {Path(reference['path']).name}: "
+                         f"{reference['header_mapping']}; re-extract those page ranges")
+
+    for shard in shards:
+        if shard['header_mapping'] is None and shard['rows']:
+            raise ValueError(f"{Path(shard['path']).name} has rows but no header mapping")
+
+    return reference['header_mapping']
+
+def merge_shards(shard_paths: List[str]) -> Tuple[Optional[Dict[int, str]], List[Dict[str, Any]]]:
+    """
+    Verify and reassemble shards of one PDF into a single row list in page order
+
+    Raises:
+        ValueError: if the shards come from different PDFs, engines or extractor
+                    versions, leave pages uncovered or overlap, or disagree on
+                    the header mapping
+
+    Returns:
+        Tuple of (reconciled header mapping, provider rows in page order)
+    """
+    if not shard_paths:
+        raise ValueError("No shards to merge")
+
+    shards = sorted((load_shard(path) for path in shard_paths), key=lambda s: (s['page_start'], s['page_end']))
+
+    for field in ['pdf_sha256', 'total_pages', 'engine', 'extractor_version']:
+        values = {shard[field] for shard in shards}
+        if len(values) > 1:
+            raise ValueError(f"Shards disagree on {field}: {sorted(values, key=str)}")
+
+    total_pages = shards[0]['total_pages']
+    problems = check_coverage(shards, total_pages)
+    if problems:
+        raise ValueError(f"Shards do not cover the {total_pages}-page PDF exactly once: {'; '.join(problems)}")
+
+    header_mapping = reconcile_header_mappings(shards)
+
+    rows = []
+    for shard in shards:
+        rows.extend(shard['rows'])
+
+    print(f"Merged {len(shards)} shards of {shards[0]['source_pdf']} "
+          f"({total_pages} pages, {len(rows)} rows)")
+    return header_mapping, rows
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Merge page-range shards written by extract.py --pages')
+    parser.add_argument('shards', nargs='+', help='Shard files covering every page of one PDF')
+    parser.add_argument('--output', default="data_ingest/exports/extracted_raw.csv", help='Merged raw CSV path')
+    args = parser.parse_args()
+
+    try:
+        _, providers = merge_shards(args.shards)
+    except ValueError as e:
+        print(f"Cannot merge shards: {e}")
+        sys.exit(1)
+
+    if providers:
+        pd.DataFrame(providers).to_csv(args.output, index=False)
+        print(f"Raw extracted data saved to: {args.output}")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic PDFs in the NJ DCF Licensed Child Care Centers layout
+
+The pages copy the geometry of the published listing (landscape letter, twelve
+ruled columns, grey three-line header band, 5.2pt text) and are filled with
+seeded random providers. The rows written to the PDF are returned as ground
+truth so extraction accuracy can be measured without the live PDF.
+"""
+
+import json
+import random
+import zlib
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+from pdfminer.fontmetrics import FONT_METRICS
+
+SYNTHETIC_DIR = "data_ingest/cache/synthetic"
+
+PAGE_WIDTH = 792.0
+PAGE_HEIGHT = 612.0
+FONT_SIZE = 5.2
+RULE_WIDTH = 0.48
+CELL_PADDING = 1.5
+
+# Column rules measured from the 08.01.2025 DCF PDF
+COLUMN_RULES = [1.2, 16.3, 52.7, 100.0, 145.1, 356.0, 468.8, 527.2, 563.5, 599.9, 719.9, 762.2, 788.0]
+
+# Header cell lines, top to bottom, and the ground-truth field each column holds
+COLUMNS = [
+    (['Total'], None),
+    (['Provider', 'County'], 'County'),
+    (['License Number'], 'License Number'),
+    (['Provider Type'], 'Provider Type'),
+    (['Provider Name'], 'Provider Name'),
+    (['Provider Address 1'], 'Provider Address 1'),
+    (['Provider City'], 'Provider City'),
+    (['Provider Zip', 'Code'], 'Provider Zip Code'),
+    (['Provider Phone', 'Number'], 'Provider Phone Number'),
+    (['Provider Email Address'], 'Provider Email Address'),
+    (['Ages Served'], 'Ages Served'),
+    (['Licensed', 'Capacity'], 'Licensed Capacity')
+]
+
+TITLE_TOP = 0.36
+HEADER_TOP = 11.52
+HEADER_BOTTOM = 32.04
+ROW_HEIGHT = 6.84
+TABLE_BOTTOM = 607.08
+ROWS_PER_PAGE = int((TABLE_BOTTOM - HEADER_BOTTOM) // ROW_HEIGHT)
+
+COUNTIES = ['Atlantic', 'Bergen', 'Burlington', 'Camden', 'Cape May', 'Cumberland', 'Essex',
+            'Gloucester', 'Hudson', 'Hunterdon', 'Mercer', 'Middlesex', 'Monmouth', 'Morris',
+            'Ocean', 'Passaic', 'Salem', 'Somerset', 'Sussex', 'Union', 'Warren']
+CITIES = ['Egg Harbor Township', 'Northfield', 'Ventnor', 'Mays Landing', 'Hackensack', 'Paramus',
+          'Cherry Hill', 'Newark', 'Jersey City', 'Flemington', 'Trenton', 'Edison', 'Freehold',
+          'Morristown', 'Toms River', 'Paterson', 'Somerville', 'Newton', 'Elizabeth',
+          'Phillipsburg', 'Mount Laurel', 'Vineland', 'Princeton', 'New Brunswick']
+NAME_WORDS = ['Little', 'Bright', 'Sunshine', 'Kiddie', 'Academy', 'Learning', 'Tiny', 'Town',
+              'Scholars', 'Sprouts', 'Kingdom', 'Rainbow', 'Discovery', 'Garden', 'Stars', 'Early',
+              'Explorers', 'Happy', 'Hearts', 'Montessori', 'Creative', 'Minds', 'Acorn', 'Village']
+# Names run 3-7 words, like the live listing (median 5)
+NAME_SUFFIXES = ['Center', 'Preschool', 'Child Care', 'Learning Center', 'Daycare', 'LLC', 'Inc.']
+STREETS = ['Tilton', 'Hickory', 'Wellington', 'Mill', 'Delilah', 'Main', 'Broad', 'Maple', 'Park',
+           'Church', 'Washington', 'Bargaintown', 'Ridge', 'Central', 'Highland', 'Union']
+STREET_TYPES = ['Road', 'Street', 'Avenue', 'Boulevard', 'Lane', 'Pike']
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'aol.com', 'outlook.com', 'k12.nj.us']
+AGES = ['0 - 13 years', '2 1/2 - 6 years', '2 1/2 - 13 years', '0 - 6 years', '3 - 5 years', '5 - 13 years']
+
+_WIDTHS = FONT_METRICS['Helvetica'][1]
+
+def text_width(text: str, size: float = FONT_SIZE) -> float:
+    """Width of text set in Helvetica at the given size"""
+    return sum(_WIDTHS.get(ch, 556) for ch in text) * size / 1000
+
+def fit_to_column(text: str, column: int) -> str:
+    """Drop trailing words until text fits inside its column without wrapping"""
+    room = COLUMN_RULES[column + 1] - COLUMN_RULES[column] - 2 * CELL_PADDING
+    words = text.split()
+    while len(words) > 1 and text_width(' '.join(words)) > room:
+        words.pop()
+    return ' '.join(words)
+
+def generate_providers(count: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Seeded random provider rows keyed by the standard DCF field names"""
+    rng = random.Random(seed)
+    licenses = rng.sample(range(100000, 1000000), count)
+
+    providers = []
+    for license_number in licenses:
+        name = ' '.join(rng.sample(NAME_WORDS, rng.randint(2, 6)) + [rng.choice(NAME_SUFFIXES)])
+        slug = ''.join(name.lower().split()[:2]).replace('.', '')
+        providers.append({
+            'County': rng.choice(COUNTIES),
+            'License Number': f"CCC{license_number}",
+            'Provider Type': 'Child Care Center',
+            'Provider Name': name,
+            'Provider Address 1': f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}",
+            'Provider City': rng.choice(CITIES),
+            'Provider Zip Code': f"0{rng.randint(7000, 8999)}",
+            'Provider Phone Number': f"{rng.choice(['201', '609', '732', '856', '908', '973'])}-"
+                                     f"{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            'Provider Email Address': f"{slug}{rng.randint(1, 99)}@{rng.choice(EMAIL_DOMAINS)}",
+            'Ages Served': rng.choice(AGES),
+            'Licensed Capacity': str(rng.randint(10, 250))
+        })
+
+    for provider in providers:
+        for column, (_, field) in enumerate(COLUMNS):
+            if field:
+                provider[field] = fit_to_column(provider[field], column)
+
+    return providers
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def _baseline(top: float) -> float:
+    """PDF baseline y for text whose pdfplumber 'top' should be `top`"""
+    descent = FONT_METRICS['Helvetica'][0]['Descent'] / 1000
+    return PAGE_HEIGHT - top - FONT_SIZE * (1 + descent)
+
+def _text(x: float, top: float, text: str) -> str:
+    return f"BT /F1 {FONT_SIZE} Tf {x:.2f} {_baseline(top):.2f} Td ({_escape(text)}) Tj ET\n"
+
+def _rule(x0: float, top: float, x1: float, bottom: float) -> str:
+    return f"{x0:.2f} {PAGE_HEIGHT - bottom:.2f} {x1 - x0:.2f} {bottom - top:.2f} re f\n"
+
+def render_page(rows: List[Tuple[int, Dict[str, str]]], with_title: bool, as_of: str) -> bytes:
+    """Content stream for one listing page; rows are (running row number, provider)"""
+    left, right = COLUMN_RULES[0], COLUMN_RULES[-1]
+    bottom = HEADER_BOTTOM + ROW_HEIGHT * len(rows)
+    ops = []
+
+    # Grey header band, then black rules
+    ops.append(f"0.827 g {left:.2f} {PAGE_HEIGHT - HEADER_BOTTOM:.2f} {right - left:.2f} "
+               f"{HEADER_BOTTOM - HEADER_TOP:.2f} re f 0 g\n")
+    table_top = TITLE_TOP if with_title else HEADER_TOP
+    for x in COLUMN_RULES:
+        band_top = table_top if x in (left, right) else HEADER_TOP
+        ops.append(_rule(x, band_top, x + RULE_WIDTH, bottom))
+    rule_tops = ([TITLE_TOP] if with_title else []) + [HEADER_TOP] + \
+        [HEADER_BOTTOM + ROW_HEIGHT * i for i in range(len(rows) + 1)]
+    for top in rule_tops:
+        ops.append(_rule(left, top, right, top + RULE_WIDTH))
+
+    if with_title:
+        ops.append(_text(left + CELL_PADDING, TITLE_TOP + 2.5, f"Licensed Child Care Centers as of {as_of}"))
+
+    # Header labels are centered; single-line labels sit on the middle line
+    line_tops = [16.74, 20.22, 23.58]
+    for column, (labels, _) in enumerate(COLUMNS):
+        center = (COLUMN_RULES[column] + COLUMN_RULES[column + 1]) / 2
+        tops = [line_tops[1]] if len(labels) == 1 else [line_tops[0], line_tops[2]]
+        for label, top in zip(labels, tops):
+            ops.append(_text(center - text_width(label) / 2, top, label))
+
+    for i, (row_number, provider) in enumerate(rows):
+        top = HEADER_BOTTOM + ROW_HEIGHT * i + 1.7
+        for column, (_, field) in enumerate(COLUMNS):
+            value = str(row_number) if field is None else provider[field]
+            ops.append(_text(COLUMN_RULES[column] + CELL_PADDING, top, value))
+
+    return ''.join(ops).encode('latin-1')
+
+def write_dcf_pdf(output_path: str, providers: List[Dict[str, str]], as_of: str = '08.01.2025') -> int:
+    """
+    Write providers to a DCF-style PDF, ROWS_PER_PAGE rows per page
+
+    Objects are streamed to disk as they are produced, so large documents never
+    sit in memory.
+
+    Returns:
+        Number of pages written
+    """
+    pages = [list(enumerate(providers[start:start + ROWS_PER_PAGE], start + 1))
+             for start in range(0, len(providers), ROWS_PER_PAGE)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content per page
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    offsets = {}
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        def write_object(obj_id: int, body: bytes):
+            offsets[obj_id] = f.tell()
+            f.write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+        write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+        for page_index, (page_id, rows) in enumerate(zip(page_ids, pages)):
+            write_object(page_id, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH:g} {PAGE_HEIGHT:g}] "
+                                   f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>").encode())
+            content = zlib.compress(render_page(rows, page_index == 0, as_of))
+            write_object(page_id + 1, f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode()
+                         + content + b"\nendstream")
+
+        xref_offset = f.tell()
+        object_count = 3 + 2 * len(pages)
+        f.write(f"xref\n0 {object_count + 1}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, object_count + 1):
+            f.write(f"{offsets[obj_id]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {object_count + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+
+    return len(pages)
+
+def build_synthetic_pdf(pages: int, seed: int = 0, output_dir: str = SYNTHETIC_DIR) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Build (or reuse) a synthetic DCF PDF with the given number of full pages
+
+    Returns:
+        Tuple of (PDF path, ground-truth provider rows in page order)
+    """
+    pdf_path = Path(output_dir) / f"dcf_{pages}p_seed{seed}.pdf"
+    truth_path = pdf_path.with_suffix('.truth.json')
+
+    if pdf_path.exists() and truth_path.exists():
+        with open(truth_path) as f:
+            return str(pdf_path), json.load(f)
+
+    providers = generate_providers(pages * ROWS_PER_PAGE, seed)
+    write_dcf_pdf(str(pdf_path), providers)
+    with open(truth_path, 'w') as f:
+        json.dump(providers, f)
+
+    print(f"Generated {pdf_path} ({pages} pages, {len(providers):,} providers)")
+    return str(pdf_path), providers
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic DCF-style provider PDF')
+    parser.add_argument('pages', type=int, help='Number of pages')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for provider data')
+    parser.add_argument('--output-dir', default=SYNTHETIC_DIR, help='Directory for the PDF and ground truth')
+    args = parser.parse_args()
+
+    build_synthetic_pdf(args.pages, args.seed, args.output_dir)
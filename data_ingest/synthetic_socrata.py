@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Socrata dataset endpoint, serving synthetic DOHMH inspections
+
+Rows follow the columns of the NYC childcare inspections dataset (dsg6-ifza)
+across all five boroughs, several inspection rows per permit, with the :id
+and :updated_at system fields. The server understands the part of SoQL the
+downloaders use ($select with columns or count(*), $where with =, >, <, in
+and AND, $order, $limit, $offset), can require an X-App-Token, and can add
+per-request latency so parallel fetching can be measured offline.
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Optional, Callable
+from urllib.parse import urlparse, parse_qs
+
+RESOURCE_PATH = "/resource/dsg6-ifza.json"
+
+# Zip codes per borough, enough to spread rows across each
+BOROUGH_ZIPS = {
+    'MANHATTAN': ['10001', '10002', '10003', '10009', '10011', '10013', '10016', '10024', '10025', '10029',
+                  '10031', '10128', '10280'],
+    'BRONX': ['10451', '10452', '10453', '10456', '10458', '10461', '10463', '10467', '10469', '10472'],
+    'BROOKLYN': ['11201', '11203', '11206', '11207', '11211', '11215', '11220', '11226', '11230', '11235'],
+    'QUEENS': ['11101', '11354', '11355', '11368', '11372', '11375', '11385', '11412', '11434', '11691'],
+    'STATEN ISLAND': ['10301', '10304', '10305', '10306', '10308', '10312', '10314']
+}
+
+CHILDCARE_TYPES = ['Child Care - Pre School', 'Child Care - Infants/Toddlers', 'School Based Child Care', 'Camp']
+AGE_RANGES = ['2 YEARS - 5 YEARS', '0 YEARS - 2 YEARS', '3 YEARS - 5 YEARS', '5 YEARS - 12 YEARS']
+RESULTS = ['Compliance Inspection', 'Reinspection Required', 'Reinspection Not Required']
+VIOLATION_CATEGORIES = ['GENERAL', 'CRITICAL', 'PUBLIC HEALTH HAZARD']
+VIOLATION_STATUSES = ['OPEN', 'CORRECTED', 'N/A']
+STREETS = ['BROADWAY', 'AMSTERDAM AVENUE', 'FLATBUSH AVENUE', 'QUEENS BOULEVARD', 'GRAND CONCOURSE',
+           'VICTORY BOULEVARD', 'ATLANTIC AVENUE', 'LENOX AVENUE', 'NOSTRAND AVENUE', 'MAIN STREET']
+NAME_WORDS = ['Little', 'Bright', 'Stars', 'Kids', 'Learning', 'Garden', 'Academy', 'Rainbow', 'Sunshine', 'Tots']
+
+# Inspection rows per permit
+INSPECTIONS_PER_PERMIT = (1, 8)
+
+def generate_inspection_rows(rows: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Seeded synthetic inspection rows, in :id order"""
+    rng = random.Random(seed)
+    result = []
+    permit = 0
+    while len(result) < rows:
+        borough = rng.choice(list(BOROUGH_ZIPS))
+        center = {
+            'centername': f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} Center {permit}",
+            'legalname': f"{rng.choice(NAME_WORDS)} Child Care LLC",
+            'building': str(rng.randint(1, 2500)),
+            'street': rng.choice(STREETS),
+            'borough': borough,
+            'zipcode': rng.choice(BOROUGH_ZIPS[borough]),
+            'phone': f"{rng.choice(['212', '718', '347', '646'])}{rng.randint(2000000, 9999999)}",
+            'permitnumber': str(10000 + permit),
+            'permitexp': f"20{rng.randint(25, 28)}-{rng.randint(1, 12):02d}-01T00:00:00.000",
+            'status': 'Permitted',
+            'agerange': rng.choice(AGE_RANGES),
+            'maximumcapacity': str(rng.randint(8, 180)),
+            'dc_id': f"DC{permit:07d}",
+            'programtype': 'PRESCHOOL',
+            'facilitytype': 'GDC',
+            'childcaretype': rng.choice(CHILDCARE_TYPES),
+            'url': f"www.center{permit}.example.org" if rng.random() < 0.3 else None
+        }
+        for _ in range(rng.randint(*INSPECTIONS_PER_PERMIT)):
+            if len(result) >= rows:
+                break
+            row = dict(center)
+            row.update({
+                'inspectiondate': f"20{rng.randint(20, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00.000",
+                'inspectionsummaryresult': rng.choice(RESULTS),
+                'violationcategory': rng.choice(VIOLATION_CATEGORIES) if rng.random() < 0.7 else None,
+                'healthcodesubsection': f"47.{rng.randint(11, 81)}" if rng.random() < 0.7 else None,
+                'violationstatus': rng.choice(VIOLATION_STATUSES),
+                ':id': f"row-{len(result):08d}",
+                ':updated_at': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00.000Z"
+            })
+            result.append({k: v for k, v in row.items() if v is not None})
+        permit += 1
+    return result
+
+class SoqlError(ValueError):
+    """A query the stand-in does not understand"""
+
+_CLAUSE_COMPARE = re.compile(r"^\s*([:\w]+)\s*(=|>=|<=|>|<)\s*'([^']*)'\s*$")
+_CLAUSE_IN = re.compile(r"^\s*([:\w]+)\s+in\s*\((.*)\)\s*$", re.IGNORECASE)
+_COUNT = re.compile(r"^\s*count\(\*\)(?:\s+as\s+(\w+))?\s*$", re.IGNORECASE)
+
+_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b
+}
+
+def parse_where(where: str) -> Callable[[Dict[str, Any]], bool]:
+    """Row predicate for a $where of =, >, <, >=, <= and in clauses joined by AND"""
+    tests = []
+    for clause in re.split(r"\s+AND\s+", where.strip(), flags=re.IGNORECASE):
+        match = _CLAUSE_IN.match(clause)
+        if match:
+            column, values = match.group(1), set(re.findall(r"'([^']*)'", match.group(2)))
+            tests.append(lambda row, c=column, v=values: row.get(c) in v)
+            continue
+        match = _CLAUSE_COMPARE.match(clause)
+        if match:
+            column, op, value = match.groups()
+            tests.append(lambda row, c=column, o=_OPERATORS[op], v=value: c in row and o(row[c], v))
+            continue
+        raise SoqlError(f"Unsupported $where clause: {clause}")
+    return lambda row: all(test(row) for test in tests)
+
+def run_query(rows: List[Dict[str, Any]], params: Dict[str, str],
+              cache: Optional[Dict[Any, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Answer a SoQL query against the rows, as the Socrata API would
+
+    Filtered and ordered rows are kept in cache, when given, so paging
+    through one query filters the rows only once.
+    """
+    key = (params.get('$where', ''), params.get('$order', ''))
+    if cache is not None and key in cache:
+        rows = cache[key]
+    else:
+        if params.get('$where'):
+            matches = parse_where(params['$where'])
+            rows = [row for row in rows if matches(row)]
+        if params.get('$order'):
+            column, _, direction = params['$order'].strip().partition(' ')
+            rows = sorted(rows, key=lambda row: row.get(column, ''), reverse=direction.strip().upper() == 'DESC')
+        if cache is not None:
+            cache[key] = rows
+
+    select = params.get('$select', '')
+    count = _COUNT.match(select)
+    if count:
+        return [{count.group(1) or 'count': str(len(rows))}]
+
+    offset = int(params.get('$offset', 0))
+    rows = rows[offset:offset + int(params.get('$limit', 1000))]
+
+    if select:
+        columns = [c.strip() for c in select.split(',')]
+        return [{c: row[c] for c in columns if c in row} for row in rows]
+    # Like Socrata, system fields only come back when selected
+    return [{k: v for k, v in row.items() if not k.startswith(':')} for row in rows]
+
+class SyntheticSocrataServer:
+    """Stand-in Socrata server on a background thread; use as a context manager"""
+
+    def __init__(self, rows: int = 100000, seed: int = 0, latency_ms: float = 0.0,
+                 app_token: Optional[str] = None, host: str = '127.0.0.1', port: int = 0):
+        self.rows = generate_inspection_rows(rows, seed)
+        self.latency_ms = latency_ms
+        self.app_token = app_token
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._cache = {}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{RESOURCE_PATH}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Any):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json;charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+
+                url = urlparse(self.path)
+                if url.path != RESOURCE_PATH:
+                    return self._send(404, {'code': 'not_found', 'message': f"No dataset at {url.path}"})
+                if server.app_token and self.headers.get('X-App-Token') != server.app_token:
+                    return self._send(403, {'code': 'invalid_app_token', 'message': 'Missing or invalid app token'})
+
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    self._send(200, run_query(server.rows, params, server._cache))
+                except (SoqlError, ValueError) as e:
+                    self._send(400, {'code': 'query.compiler.malformed', 'message': str(e)})
+
+        return Handler
+
+    def start(self) -> 'SyntheticSocrataServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve synthetic NYC inspection rows through a Socrata-like API')
+    parser.add_argument('--rows', type=int, default=100000, help='Inspection rows to generate')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--port', type=int, default=8800, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every request')
+    parser.add_argument('--app-token', help='Reject requests without this X-App-Token')
+    args = parser.parse_args()
+
+    server = SyntheticSocrataServer(args.rows, args.seed, args.latency_ms, args.app_token, port=args.port)
+    print(f"Serving {len(server.rows):,} synthetic rows at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
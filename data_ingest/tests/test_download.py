@@ -0,0 +1,135 @@
+"""
+download_pdf against a local http.server: resume, ignored Range, 304, and
+re-download of a damaged cached copy
+"""
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import download
+
+BODY = bytes(range(256)) * 4096    # 1 MiB
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+class PdfServer:
+    """Serves BODY, recording request headers; behaviour is set per test"""
+
+    def __init__(self):
+        self.requests = []
+        self.disconnect_after = None    # bytes sent before dropping the first full response
+        self.honor_range = True
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                server.respond(self)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/report.pdf"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def respond(self, handler):
+        headers = handler.headers
+        if headers.get('If-None-Match') == ETAG:
+            handler.send_response(304)
+            handler.send_header('ETag', ETAG)
+            handler.end_headers()
+            return
+
+        range_header = headers.get('Range')
+        if range_header and self.honor_range and headers.get('If-Range') in (ETAG, LAST_MODIFIED):
+            start = int(range_header.split('=')[1].rstrip('-'))
+            handler.send_response(206)
+            handler.send_header('Content-Range', f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+            body = BODY[start:]
+        else:
+            handler.send_response(200)
+            body = BODY
+
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('ETag', ETAG)
+        handler.send_header('Last-Modified', LAST_MODIFIED)
+        handler.end_headers()
+
+        if self.disconnect_after is not None and body is BODY:
+            handler.wfile.write(body[:self.disconnect_after])
+            handler.wfile.flush()
+            self.disconnect_after = None
+            handler.close_connection = True
+            return
+        handler.wfile.write(body)
+
+@pytest.fixture
+def server():
+    pdf_server = PdfServer()
+    pdf_server.thread.start()
+    yield pdf_server
+    pdf_server.httpd.shutdown()
+    pdf_server.httpd.server_close()
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(download.time, 'sleep', lambda seconds: None)
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_resumes_after_mid_stream_disconnect(server, tmp_path):
+    server.disconnect_after = 300_000
+
+    path = download.download_pdf(server.url, cache_dir=str(tmp_path), chunk_size=64 * 1024)
+
+    assert read(path) == BODY
+    assert len(server.requests) == 2
+    # Only whole chunks reach the .part file, so the resume point is at or before the cut
+    offset = int(server.requests[1]['Range'].split('=')[1].rstrip('-'))
+    assert 0 < offset <= 300_000
+    assert server.requests[1]['If-Range'] == ETAG
+    meta = download.read_meta(download.Path(path + '.meta'))
+    assert meta['sha256'] == hashlib.sha256(BODY).hexdigest()
+    assert meta['size'] == str(len(BODY))
+
+def test_restarts_when_server_ignores_range(server, tmp_path):
+    server.disconnect_after = 300_000
+    server.honor_range = False
+
+    path = download.download_pdf(server.url, cache_dir=str(tmp_path), chunk_size=64 * 1024)
+
+    assert read(path) == BODY
+    assert len(server.requests) == 2
+    assert 'Range' in server.requests[1]
+
+def test_not_modified_keeps_intact_cache(server, tmp_path):
+    path = download.download_pdf(server.url, cache_dir=str(tmp_path))
+    server.requests.clear()
+
+    assert download.download_pdf(server.url, cache_dir=str(tmp_path)) == path
+
+    assert len(server.requests) == 1
+    assert server.requests[0]['If-None-Match'] == ETAG
+    assert read(path) == BODY
+
+def test_corrupted_cache_is_downloaded_again(server, tmp_path):
+    path = download.download_pdf(server.url, cache_dir=str(tmp_path))
+    damaged = bytearray(BODY)
+    damaged[1000] ^= 0xFF
+    with open(path, 'wb') as f:
+        f.write(damaged)
+    server.requests.clear()
+
+    download.download_pdf(server.url, cache_dir=str(tmp_path))
+
+    assert len(server.requests) == 1
+    assert 'If-None-Match' not in server.requests[0]
+    assert read(path) == BODY
@@ -0,0 +1,87 @@
+"""
+download_permit_histories against a local synthetic_socrata.py server: an
+incremental run collapses each changed permit over its whole history
+"""
+
+import json
+from collections import defaultdict
+
+import pytest
+
+from download_nyc import (DOWNTOWN_MANHATTAN_ZIPS, INSPECTION_COLUMNS, download_manhattan_providers_to_json,
+                          download_permit_histories)
+from normalize_nyc import collapse_inspections
+from synthetic_socrata import SyntheticSocrataServer
+
+BASELINE = '2025-01-01T00:00:00.000Z'
+WATERMARK = '2025-03-01T00:00:00.000Z'
+CORRECTED = '2025-06-01T00:00:00.000Z'
+LATER = '2025-09-01T00:00:00.000Z'
+
+@pytest.fixture
+def server():
+    server = SyntheticSocrataServer(rows=3000, seed=1)
+    for row in server.rows:
+        row[':updated_at'] = BASELINE
+    with server:
+        yield server
+
+def downtown_permits(rows):
+    """Rows of each downtown Manhattan permit with at least three inspection dates, oldest first"""
+    permits = defaultdict(list)
+    for row in rows:
+        if row['borough'] == 'MANHATTAN' and row['zipcode'] in DOWNTOWN_MANHATTAN_ZIPS:
+            permits[row['permitnumber']].append(row)
+    return [sorted(rows, key=lambda r: r['inspectiondate']) for rows in permits.values()
+            if len({r['inspectiondate'] for r in rows}) >= 3]
+
+def inspections(rows):
+    """The rows' inspection columns, in a comparable order"""
+    return sorted(tuple(row.get(c) or '' for c in INSPECTION_COLUMNS) for row in rows)
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_corrected_older_inspection_does_not_replace_latest(server, tmp_path):
+    history = downtown_permits(server.rows)[0]
+    oldest, latest = history[0], history[-1]
+    oldest.update({'centername': 'Corrected Old Name', ':updated_at': CORRECTED})
+
+    delta_file = tmp_path / 'delta.json'
+    assert download_manhattan_providers_to_json(str(delta_file), since=WATERMARK, endpoint=server.url) == 1
+    delta = read_json(delta_file)
+    # On its own the delta would collapse to the corrected older row
+    assert collapse_inspections(delta)[0][0]['centername'] == 'Corrected Old Name'
+
+    # Changed after the delta was taken; left for the next run
+    later = dict(latest, inspectiondate='2026-01-01T00:00:00.000', **{':id': 'row-later', ':updated_at': LATER})
+    server.rows.append(later)
+
+    history_file = tmp_path / 'history.json'
+    count = download_permit_histories(delta, str(history_file), endpoint=server.url)
+    rows = read_json(history_file)
+
+    assert count == len(rows) == len(history)
+    assert inspections(rows) == inspections(history)
+    providers, _ = collapse_inspections(rows)
+    assert len(providers) == 1
+    assert providers[0]['inspectiondate'] == latest['inspectiondate']
+    assert providers[0]['centername'] == latest['centername']
+
+def test_rows_without_permit_number_are_fetched_by_dc_id(server, tmp_path):
+    with_dc_id, with_permit = downtown_permits(server.rows)[:2]
+    # Another permit's rows share the DC ID but are keyed by their permit number
+    for row in with_dc_id:
+        del row['permitnumber']
+    for row in with_permit:
+        row['dc_id'] = with_dc_id[0]['dc_id']
+    unkeyed = {'centername': 'No Keys Center', 'inspectiondate': '2025-02-02T00:00:00.000', ':updated_at': CORRECTED}
+
+    history_file = tmp_path / 'history.json'
+    download_permit_histories([dict(with_dc_id[0], **{':updated_at': CORRECTED}), unkeyed], str(history_file),
+                              endpoint=server.url, batch_size=1)
+    rows = read_json(history_file)
+
+    assert inspections(r for r in rows if 'dc_id' in r) == inspections(with_dc_id)
+    assert unkeyed in rows
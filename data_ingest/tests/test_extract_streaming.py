@@ -0,0 +1,53 @@
+"""
+iter_providers_from_pdf keeps memory flat as the page count grows
+
+Each page count is extracted in a fresh interpreter and its peak RSS compared,
+so the imports and pdfplumber's own working set cancel out. The default sizes
+keep the run to a few minutes; set STREAMING_TEST_PAGES=50,500 for the
+full-size check.
+"""
+
+import os
+import subprocess
+import sys
+
+from synthetic_pdf import build_synthetic_pdf
+
+PAGE_COUNTS = [int(n) for n in os.getenv('STREAMING_TEST_PAGES', '20,100').split(',')]
+
+# Allowed growth in peak RSS from the smallest to the largest PDF; keeping every
+# row of an extra 80 pages alone costs about 12 MB
+MAX_GROWTH_BYTES = 8 * 1024 * 1024
+
+DATA_INGEST_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+from extract import iter_providers_from_pdf
+rows = 0
+for _ in iter_providers_from_pdf(sys.argv[2], page_cache_dir=None, use_layout_profile=False):
+    rows += 1
+print(rows, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+"""
+
+def start_measurement(pdf_path):
+    return subprocess.Popen([sys.executable, '-c', MEASURE, DATA_INGEST_DIR, pdf_path],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+def test_peak_memory_does_not_grow_with_page_count(tmp_path):
+    pdfs = [build_synthetic_pdf(pages, output_dir=str(tmp_path)) for pages in PAGE_COUNTS]
+
+    # Run the sizes side by side; each has its own interpreter
+    processes = [start_measurement(pdf_path) for pdf_path, _ in pdfs]
+    peaks = []
+    for process, (_, providers) in zip(processes, pdfs):
+        stdout, stderr = process.communicate()
+        assert process.returncode == 0, stderr
+        rows, peak = map(int, stdout.strip().splitlines()[-1].split())
+        assert rows == len(providers)
+        peaks.append(peak)
+
+    growth = peaks[-1] - peaks[0]
+    assert growth < MAX_GROWTH_BYTES, \
+        f"Peak RSS grew {growth / 1e6:.1f} MB from {PAGE_COUNTS[0]} to {PAGE_COUNTS[-1]} pages: {peaks}"
@@ -0,0 +1,18 @@
+"""open_pdf_fingerprint hashes the open PDF the same way whatever it was opened from"""
+
+from layout_profile import open_pdf_fingerprint, pdf_fingerprint
+from pdf_source import open_pdf
+from synthetic_pdf import build_synthetic_pdf
+
+def test_fingerprint_matches_for_bytes_file_and_mmap(tmp_path):
+    pdf_path, _ = build_synthetic_pdf(2, output_dir=str(tmp_path))
+    expected = pdf_fingerprint(pdf_path)
+    with open(pdf_path, 'rb') as f:
+        data = f.read()
+
+    for source, mmap_threshold in [(data, None), (pdf_path, None), (pdf_path, 0)]:
+        with open_pdf(source, mmap_threshold=mmap_threshold) as pdf:
+            len(pdf.pages)
+            assert open_pdf_fingerprint(pdf) == expected
+            # Hashing must not disturb pdfminer's position in a file stream
+            assert pdf.pages[1].extract_text()
@@ -59,6 +59,18 @@ class DatabaseUpserter:
         ALTER TABLE providers DROP CONSTRAINT IF EXISTS chk_geocode_status;
         ALTER TABLE providers ADD CONSTRAINT chk_geocode_status 
           CHECK (geocode_status IN ('OK', 'PARTIAL', 'NONE') OR geocode_status IS NULL);
+        
+        -- Inspection history, one row per inspection and violation cited
+        CREATE TABLE IF NOT EXISTS provider_inspections (
+          license_number TEXT NOT NULL,
+          inspection_date DATE NOT NULL,
+          health_code_subsection TEXT NOT NULL DEFAULT '',
+          violation_category TEXT NOT NULL DEFAULT '',
+          violation_status TEXT NOT NULL DEFAULT '',
+          result TEXT NOT NULL DEFAULT '',
+          source VARCHAR(64) NOT NULL,
+          PRIMARY KEY (license_number, inspection_date, health_code_subsection, violation_category)
+        );
         """
         
         try:
@@ -239,6 +251,43 @@ class DatabaseUpserter:
             'errors': error_count
         }
     
+    def write_inspections(self, inspections: List[Dict[str, Any]], source: str = 'NYC_DOHMH',
+                          page_size: int = 1000) -> int:
+        """
+        Bulk-write inspection history rows, a page of rows per statement
+        
+        Inspections already stored take the latest violation status and result.
+        
+        Returns:
+            Number of inspection rows written
+        """
+        rows = [
+            (i['license_number'], i['inspection_date'], i.get('health_code_subsection', ''),
+             i.get('violation_category', ''), i.get('violation_status', ''), i.get('result', ''), source)
+            for i in inspections
+        ]
+        if not rows:
+            return 0
+        
+        print(f"Writing {len(rows)} inspection history rows")
+        
+        try:
+            with self.connection.cursor() as cursor:
+                psycopg2.extras.execute_values(cursor, """
+                    INSERT INTO provider_inspections (license_number, inspection_date, health_code_subsection,
+                                                      violation_category, violation_status, result, source)
+                    VALUES %s
+                    ON CONFLICT (license_number, inspection_date, health_code_subsection, violation_category)
+                    DO UPDATE SET violation_status = EXCLUDED.violation_status, result = EXCLUDED.result
+                """, rows, page_size=page_size)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            print(f"Failed to write inspection history, rolling back: {e}")
+            raise
+        
+        return len(rows)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
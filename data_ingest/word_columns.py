@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Word-coordinate column engine for fixed-column PDF listings
+
+Instead of pdfplumber's table finder, learn the column x-boundaries once from
+the header row and bucket every page's words into rows and columns by position.
+"""
+
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+
+# Words in a header band; a line needs several of these to count as the header
+HEADER_KEYWORDS = ['county', 'license', 'provider', 'name', 'address', 'city', 'zip', 'phone', 'email', 'ages', 'capacity']
+MIN_HEADER_KEYWORDS = 3
+
+# Words whose tops differ by less than this are on the same line
+LINE_TOLERANCE = 2.0
+
+# Header words closer than this horizontally belong to the same header cell
+HEADER_WORD_GAP = 3.0
+
+def group_words_into_lines(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group words into lines by their top coordinate, each line sorted left to right"""
+    lines = []
+    current = []
+    current_top = None
+
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if current and abs(word['top'] - current_top) > LINE_TOLERANCE:
+            lines.append(sorted(current, key=lambda w: w['x0']))
+            current = []
+        if not current:
+            current_top = word['top']
+        current.append(word)
+
+    if current:
+        lines.append(sorted(current, key=lambda w: w['x0']))
+
+    return lines
+
+def _is_header_line(line: List[Dict[str, Any]]) -> bool:
+    text = ' '.join(w['text'] for w in line).lower()
+    return sum(1 for keyword in HEADER_KEYWORDS if keyword in text) >= MIN_HEADER_KEYWORDS
+
+def find_header_band(lines: List[List[Dict[str, Any]]]) -> Optional[Tuple[int, int]]:
+    """
+    Locate the (possibly multi-line) header row
+
+    Returns:
+        (first line index, last line index) of the header band, or None
+    """
+    for idx, line in enumerate(lines):
+        if not _is_header_line(line):
+            continue
+
+        # Multi-line header cells are set tighter than data rows; grow the band
+        # while neighbouring lines sit within about one text height
+        height = max(w['bottom'] - w['top'] for w in line)
+        first = last = idx
+        while first > 0 and lines[first][0]['top'] - lines[first - 1][0]['top'] <= height * 1.2:
+            first -= 1
+        while last + 1 < len(lines) and lines[last + 1][0]['top'] - lines[last][0]['top'] <= height * 1.2:
+            last += 1
+
+        return first, last
+
+    return None
+
+def _header_cells(band_words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge header words that overlap horizontally into header cells"""
+    cells = []
+    for word in sorted(band_words, key=lambda w: w['x0']):
+        if cells and word['x0'] <= cells[-1]['x1'] + HEADER_WORD_GAP:
+            cells[-1]['x1'] = max(cells[-1]['x1'], word['x1'])
+            cells[-1]['words'].append(word)
+        else:
+            cells.append({'x0': word['x0'], 'x1': word['x1'], 'words': [word]})
+
+    for cell in cells:
+        ordered = sorted(cell['words'], key=lambda w: (round(w['top']), w['x0']))
+        cell['text'] = ' '.join(w['text'] for w in ordered)
+        cell['center'] = (cell['x0'] + cell['x1']) / 2
+
+    return cells
+
+def _gutter_between(left: float, right: float, data_words: List[Dict[str, Any]]) -> float:
+    """
+    Pick the x position between two header centers that the fewest data words cross
+
+    Header labels are often centered while values are left-aligned, so the
+    boundary is placed in the widest run of whitespace shared by all data rows.
+    """
+    spans = sorted((max(w['x0'], left), min(w['x1'], right))
+                   for w in data_words if w['x1'] > left and w['x0'] < right)
+
+    best_start, best_width = None, 0.0
+    cursor = left
+    for x0, x1 in spans:
+        if x0 - cursor > best_width:
+            best_start, best_width = cursor, x0 - cursor
+        cursor = max(cursor, x1)
+    if right - cursor > best_width:
+        best_start, best_width = cursor, right - cursor
+
+    if best_start is None:
+        return (left + right) / 2
+
+    return best_start + best_width / 2
+
+def learn_column_layout(page) -> Optional[Dict[str, Any]]:
+    """
+    Learn column boundaries from a page that contains the header row
+
+    Returns:
+        Layout dictionary with 'headers' (header text per column) and 'boundaries'
+        (x positions separating adjacent columns), or None if no header is found
+    """
+    lines = group_words_into_lines(page.extract_words())
+    band = find_header_band(lines)
+    if band is None:
+        return None
+
+    first, last = band
+    band_words = [w for line in lines[first:last + 1] for w in line]
+    data_words = [w for line in lines[last + 1:] for w in line]
+
+    cells = _header_cells(band_words)
+    if len(cells) < 2:
+        return None
+
+    boundaries = [
+        round(_gutter_between(cells[i]['center'], cells[i + 1]['center'], data_words), 2)
+        for i in range(len(cells) - 1)
+    ]
+
+    return {
+        'headers': [cell['text'] for cell in cells],
+        'boundaries': boundaries
+    }
+
+def learn_column_layout_from_pdf(pdf) -> Optional[Dict[str, Any]]:
+    """Scan pages in order and learn the layout from the first header page"""
+    for page in pdf.pages:
+        layout = learn_column_layout(page)
+        page.close()
+        if layout:
+            print(f"Word columns: learned {len(layout['headers'])} columns from page {page.page_number}")
+            return layout
+
+    print("Word columns: no header row found")
+    return None
+
+def extract_table_from_words(page, layout: Dict[str, Any]) -> List[List[str]]:
+    """
+    Bucket a page's words into a table using a learned column layout
+
+    A line whose first column is empty continues the previous row (wrapped
+    cells), matching how the table finder joins multi-line cell text.
+
+    Returns:
+        Table whose first row is the learned header and remaining rows are data
+    """
+    boundaries = layout['boundaries']
+    column_count = len(boundaries) + 1
+
+    lines = group_words_into_lines(page.extract_words())
+
+    band = find_header_band(lines)
+    if band is not None:
+        lines = lines[band[1] + 1:]
+
+    rows = []
+    for line in lines:
+        cells = [[] for _ in range(column_count)]
+        for word in line:
+            cells[bisect_right(boundaries, word['x0'])].append(word['text'])
+
+        if cells[0] or not rows:
+            rows.append([' '.join(cell) for cell in cells])
+        else:
+            previous = rows[-1]
+            for idx, cell in enumerate(cells):
+                if cell:
+                    previous[idx] = f"{previous[idx]} {' '.join(cell)}".strip()
+
+    return [list(layout['headers'])] + rows